@@ -5,22 +5,14 @@ Interactive dashboard for government experts
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import json
-from datetime import datetime
-
-# Page configuration
-st.set_page_config(
-    page_title="Rwanda Export Strategy",
-    page_icon="🇷🇼",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from insights_snapshot import get_store
 
 # Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -47,29 +39,172 @@ st.markdown("""
         font-weight: bold;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+def configure_page():
+    """Page configuration and custom CSS (must run first on every script run)"""
+    st.set_page_config(
+        page_title="Rwanda Export Strategy",
+        page_icon="🇷🇼",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Load data function
-@st.cache_data
+@st.cache_resource
+def get_snapshot_store():
+    """Process-wide insights snapshot, hot-swapped by a background watcher when new artifacts land"""
+    store = get_store('data/insights')
+    store.start_watcher()
+    return store
+
+# Snapshot pinned for the current script run, so every page reads one version
+_snapshot = None
+
+def current_snapshot():
+    """Snapshot used by this run"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = get_snapshot_store().current()
+    return _snapshot
+
 def load_insights():
-    """Load insights from JSON file"""
-    try:
-        with open('data/insights/export_insights.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+    """Load insights from the current snapshot"""
+    insights = current_snapshot().insights
+    if insights is None:
         st.error("❌ Insights file not found. Please run the analysis notebook first.")
-        return None
+    return insights
 
-@st.cache_data
 def load_csv_data(filename):
-    """Load CSV data files"""
-    try:
-        return pd.read_csv(filename)
-    except FileNotFoundError:
-        return None
+    """Load CSV data files from the current snapshot"""
+    return current_snapshot().table(filename)
+
+def show_figure(name, width=None, **filters):
+    """Render a shared dashboard figure from the figure cache"""
+    # Plotly is only imported by the first page that draws a chart
+    from dashboard_figures import get_figure_cache
+    fig = get_figure_cache('data/insights/figures').get(name, current_snapshot(), **filters)
+    if fig is not None:
+        st.plotly_chart(fig, width=width or "stretch")
+
+def show_memory_usage():
+    """Memory of this server process: private heap vs. shared, memory-mapped tables"""
+    from arrow_store import get_arrow_store, process_memory_mb
+
+    store = get_arrow_store()
+    report = store.memory_report() if store else {'process_mb': process_memory_mb(), 'mapped_mb': 0, 'tables': {}}
+    memory = report['process_mb']
+    if memory['rss'] is None:
+        return
+    text = f"Server memory: {memory['rss']:.0f} MB"
+    if memory['anon'] is not None:
+        text += f" ({memory['anon']:.0f} MB private, {memory['file']:.0f} MB shared)"
+    if report['tables']:
+        text += f" · {len(report['tables'])} mapped tables, {report['mapped_mb']:.1f} MB"
+    st.sidebar.caption(text)
+
+def show_data_refresh(container, expanded=False):
+    """Admin action: rebuild the insights in a background process while the current bundle stays live"""
+    from insights_pipeline import launch_background, pipeline_running
+
+    with container.expander("⚙️ Data Refresh", expanded=expanded):
+        password = os.environ.get('DASHBOARD_ADMIN_PASSWORD')
+        if password and st.text_input("Admin password", type="password", key="admin_password") != password:
+            st.caption("Enter the admin password to rebuild the insights.")
+            return
+        running = pipeline_running()
+        if st.button("🔄 Rebuild insights", disabled=running, key="pipeline_start"):
+            running = launch_background() is not None or pipeline_running()
+        if running:
+            show_pipeline_progress()
+        else:
+            show_pipeline_result()
+
+@st.fragment(run_every=2)
+def show_pipeline_progress():
+    """Progress of the running pipeline, polled without rerunning the page"""
+    from insights_pipeline import pipeline_running, read_status
+
+    status = read_status()
+    if status is not None and pipeline_running():
+        st.progress(status['step'] / status['total_steps'],
+                    text=f"{status['message']} ({status['step']}/{status['total_steps']})")
+        st.caption("The dashboard keeps serving the current data until the new bundle is published.")
+    else:
+        # Finished: swap in the new snapshot now rather than at the watcher's next poll
+        get_snapshot_store().refresh()
+        st.rerun()
+
+def show_pipeline_result():
+    """Outcome of the last pipeline run"""
+    from insights_pipeline import read_status
+
+    status = read_status()
+    if status is None:
+        st.caption("Insights were last built by the analysis notebook.")
+    elif status['state'] == 'succeeded':
+        st.caption(f"Last rebuild: {status['finished_at'][:16].replace('T', ' ')} · version {status['version']}")
+    elif status['state'] == 'failed':
+        st.error(f"Last rebuild failed at '{status['stage']}': {status['error']}")
+    else:
+        st.warning("The last rebuild stopped before finishing. The published data is unchanged.")
+
+def show_paged_table(name, key, file_name):
+    """Server-side searched, filtered, sorted and paginated table; only the visible page is sent"""
+    from paged_table import get_paged_table
+    table = get_paged_table(current_snapshot(), name)
+    if table is None:
+        return
+    
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        search = st.text_input("🔍 Search", key=f"{key}_search")
+    with col2:
+        sort_by = st.selectbox("Sort by", ["(none)"] + table.columns, key=f"{key}_sort")
+    with col3:
+        ascending = st.radio("Order", ["Asc", "Desc"], horizontal=True, key=f"{key}_order") == "Asc"
+    with col4:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], key=f"{key}_page_size")
+    
+    col1, col2, col3 = st.columns([2, 3, 3])
+    categorical = [c for c in table.columns if not pd.api.types.is_numeric_dtype(table.frame[c])]
+    with col1:
+        filter_column = st.selectbox("Filter column", ["(none)"] + categorical, key=f"{key}_filter_column")
+    with col2:
+        filter_values = st.multiselect(
+            "Values", sorted(table.frame[filter_column].dropna().astype(str).unique()) if filter_column != "(none)" else [],
+            key=f"{key}_filter_values"
+        )
+    with col3:
+        columns = st.multiselect("Columns", table.columns, default=table.columns, key=f"{key}_columns")
+    
+    filters = {filter_column: filter_values} if filter_column != "(none)" and filter_values else {}
+    positions = table.select(search, filters, None if sort_by == "(none)" else sort_by, ascending)
+    
+    page_count = max(1, -(-len(positions) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"{key}_page")
+    
+    window, _ = table.page(positions, page, page_size, columns or None)
+    st.dataframe(window, width="stretch", hide_index=True)
+    first = (page - 1) * page_size + 1 if len(positions) else 0
+    st.caption(f"Rows {first:,}-{min(page * page_size, len(positions)):,} of {len(positions):,} "
+               f"(page {page} of {page_count}, {len(table):,} rows in total)")
+    
+    st.download_button(
+        "⬇️ Download CSV",
+        lambda: table.csv_stream(positions, columns or None),
+        file_name,
+        "text/csv",
+        key=f"{key}_download"
+    )
 
 # Main dashboard
 def main():
+    configure_page()
+    
     # Header
     st.markdown('<h1 class="main-header">🇷🇼 Rwanda Export Strategy Dashboard</h1>', unsafe_allow_html=True)
     st.markdown("### Data-Driven Insights for Export Growth & Policy Development")
@@ -78,7 +213,8 @@ def main():
     insights = load_insights()
     
     if insights is None:
-        st.warning("⚠️ Please generate insights by running the analysis notebook first.")
+        st.warning("⚠️ Please generate insights by running the analysis notebook first, or rebuild them here.")
+        show_data_refresh(st, expanded=True)
         st.stop()
     
     # Sidebar navigation
@@ -89,7 +225,8 @@ def main():
     has_predictions = 'predictions' in insights and insights['predictions']
     
     pages = ["📊 Executive Summary", "🎯 Top Opportunities", "🌍 Strategic Markets", 
-             "📜 Policy Recommendations", "👥 Youth & SME Opportunities", "📈 Detailed Analytics"]
+             "📜 Policy Recommendations", "👥 Youth & SME Opportunities", "🔎 Market Explorer",
+             "📈 Detailed Analytics"]
     
     if has_predictions:
         pages.insert(3, "🔮 Predictive Forecasts")  # Add predictions page
@@ -98,8 +235,11 @@ def main():
     
     # Display metadata
     st.sidebar.markdown("---")
-    st.sidebar.markdown(f"**Report Period:** {insights['metadata']['report_period']}")
+    st.sidebar.markdown(f"**Report Period:** {insights['metadata'].get('report_period') or 'N/A'}")
     st.sidebar.markdown(f"**Generated:** {insights['metadata']['generated_at'][:10]}")
+    st.sidebar.caption(f"Data version: {current_snapshot().version}")
+    show_memory_usage()
+    show_data_refresh(st.sidebar)
     
     if has_predictions:
         st.sidebar.success("🔮 Predictions Available!")
@@ -117,6 +257,8 @@ def main():
         show_policy_recommendations(insights)
     elif page == "👥 Youth & SME Opportunities":
         show_youth_sme_opportunities(insights)
+    elif page == "🔎 Market Explorer":
+        show_market_explorer(insights)
     elif page == "📈 Detailed Analytics":
         show_detailed_analytics(insights)
 
@@ -159,8 +301,11 @@ def show_executive_summary(insights):
         
         with col2:
             seasonal = trends.get('seasonal_patterns', {})
-            st.info(f"**Peak Quarter:** {seasonal.get('peak_quarter', 'N/A')}")
+            st.info(f"**Peak Quarter:** {seasonal.get('peak_quarter') or 'N/A'}")
             st.info(f"**Volatility Index:** {trends.get('volatility_index', 'N/A')}")
+        
+        if seasonal.get('peak_sectors'):
+            st.caption(f"Seasonally strongest sectors: {', '.join(seasonal['peak_sectors'])}")
     
     # Top 3 opportunities highlight
     st.markdown("---")
@@ -187,34 +332,11 @@ def show_top_opportunities(insights):
     
     if opp_df is not None:
         # Opportunity score chart
-        fig = px.bar(
-            opp_df.head(10),
-            x='opportunity_score',
-            y='commodity',
-            orientation='h',
-            title="Top 10 Opportunities by Score",
-            labels={'opportunity_score': 'Opportunity Score', 'commodity': 'Commodity'},
-            color='opportunity_score',
-            color_continuous_scale='Viridis'
-        )
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('opportunity_score_bar', top_n=10)
         
         # Opportunity matrix scatter
         st.subheader("📊 Opportunity Matrix: Growth vs Market Share")
-        fig2 = px.scatter(
-            opp_df,
-            x='market_share',
-            y='growth_rate',
-            size='opportunity_score',
-            color='risk_level',
-            hover_data=['commodity'],
-            title="Growth Rate vs Market Share (Bubble size = Opportunity Score)",
-            labels={'market_share': 'Market Share (%)', 'growth_rate': 'Growth Rate (%)'},
-            color_discrete_map={'LOW': 'green', 'MEDIUM': 'orange', 'HIGH': 'red'}
-        )
-        fig2.update_layout(height=500)
-        st.plotly_chart(fig2, use_container_width=True)
+        show_figure('opportunity_matrix_scatter')
         
         # Detailed table
         st.subheader("📋 Detailed Opportunity Analysis")
@@ -245,16 +367,7 @@ def show_strategic_markets(insights):
             df = pd.DataFrame(tier1)
             
             # Visualization
-            fig = px.bar(
-                df,
-                x='growth_rate',
-                y='country',
-                orientation='h',
-                color='value_2022_millions',
-                title="Tier 1 Markets: Growth Rate & Value",
-                labels={'growth_rate': 'Growth Rate (%)', 'country': 'Country', 'value_2022_millions': '2022 Value ($M)'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure('tier1_growth_bar')
             
             # Table
             st.dataframe(df, use_container_width=True)
@@ -278,15 +391,7 @@ def show_strategic_markets(insights):
         if tier3:
             df = pd.DataFrame(tier3)
             
-            fig = px.bar(
-                df,
-                x='growth_rate',
-                y='country',
-                orientation='h',
-                title="Tier 3 Markets: Growth Potential",
-                labels={'growth_rate': 'Growth Rate (%)', 'country': 'Country'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure('tier3_growth_bar')
             
             st.dataframe(df, use_container_width=True)
 
@@ -319,7 +424,7 @@ def show_predictive_forecasts(insights):
         st.metric(
             "Predicted 2025 Exports",
             f"${predicted_2025:.1f}M",
-            help="Total forecasted export value for 2025"
+            help="Total forecasted export value for 2025 (the reconciled world forecast when available)"
         )
     
     with col3:
@@ -339,6 +444,22 @@ def show_predictive_forecasts(insights):
             help="Average prediction confidence across all countries"
         )
     
+    reconciliation = predictions.get('reconciliation')
+    if reconciliation:
+        st.caption(
+            f"Partner, region and world forecasts reconciled ({reconciliation['method']}) so partners add up "
+            f"to their region and the world; before reconciliation the world forecast and the partner sum "
+            f"differed by {reconciliation['base_coherence_gap_2025_percent']:+.1f}%."
+        )
+        show_figure('forecast_world_band')
+        with st.expander("Reconciled forecasts by region"):
+            regions = pd.DataFrame([reconciliation['world']] + reconciliation['regions'])
+            st.dataframe(
+                regions[['node', 'current_2022_millions', 'base_2025_millions', 'reconciled_2023_millions',
+                         'reconciled_2024_millions', 'reconciled_2025_millions']],
+                width="stretch"
+            )
+    
     st.markdown("---")
     
     # Tabs for different views
@@ -359,62 +480,27 @@ def show_predictive_forecasts(insights):
             df = pd.DataFrame(top_forecasts)
             
             # Bar chart: Current vs Predicted
-            fig = go.Figure()
-            
-            fig.add_trace(go.Bar(
-                name='Current 2022',
-                x=df['country'],
-                y=df['current_2022_millions'],
-                marker_color='lightblue'
-            ))
-            
-            fig.add_trace(go.Bar(
-                name='Predicted 2025',
-                x=df['country'],
-                y=df['predicted_2025_millions'],
-                marker_color='darkblue'
-            ))
-            
-            fig.update_layout(
-                title="Current (2022) vs Predicted (2025) Export Values",
-                xaxis_title="Country",
-                yaxis_title="Export Value ($ Millions)",
-                barmode='group',
-                height=500
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure('forecast_current_vs_predicted')
             
             # Growth rate visualization
-            fig2 = px.bar(
-                df,
-                x='growth_percent',
-                y='country',
-                orientation='h',
-                color='confidence_score',
-                color_continuous_scale='RdYlGn',
-                title="Predicted Growth Rate by Country (2022-2025)",
-                labels={
-                    'growth_percent': 'Growth %',
-                    'country': 'Country',
-                    'confidence_score': 'Confidence'
-                }
-            )
-            fig2.update_layout(height=600)
-            st.plotly_chart(fig2, use_container_width=True)
+            show_figure('forecast_growth_bar')
             
             # Detailed table
             st.subheader("📋 Detailed Forecast Data")
             
-            display_df = df[[
-                'rank', 'country', 'current_2022_millions', 'predicted_2025_millions',
-                'growth_percent', 'cagr_2022_2025', 'confidence_score', 'recommendation'
-            ]].copy()
-            
-            display_df.columns = [
-                'Rank', 'Country', 'Current 2022 ($M)', 'Predicted 2025 ($M)',
-                'Growth %', 'CAGR %', 'Confidence %', 'Recommendation'
-            ]
+            columns = {
+                'rank': 'Rank',
+                'country': 'Country',
+                'current_2022_millions': 'Current 2022 ($M)',
+                'predicted_2025_millions': 'Predicted 2025 ($M)',
+                'predicted_2025_p10_millions': 'P10 2025 ($M)',
+                'predicted_2025_p90_millions': 'P90 2025 ($M)',
+                'growth_percent': 'Growth %',
+                'cagr_2022_2025': 'CAGR %',
+                'confidence_score': 'Confidence %',
+                'recommendation': 'Recommendation'
+            }
+            display_df = df[[c for c in columns if c in df.columns]].rename(columns=columns)
             
             st.dataframe(
                 display_df.style.background_gradient(subset=['Growth %'], cmap='RdYlGn')
@@ -443,27 +529,18 @@ def show_predictive_forecasts(insights):
             df = pd.DataFrame(high_growth)
             
             # Scatter plot
-            fig = px.scatter(
-                df,
-                x='growth_percent',
-                y='predicted_2025_millions',
-                size='confidence_score',
-                color='growth_percent',
-                hover_name='country',
-                color_continuous_scale='Viridis',
-                title="Growth vs Value Matrix (bubble size = confidence)",
-                labels={
-                    'growth_percent': 'Predicted Growth %',
-                    'predicted_2025_millions': 'Predicted 2025 Value ($M)',
-                    'confidence_score': 'Confidence'
-                }
-            )
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure('forecast_high_growth_scatter')
             
             # Table
-            display_df = df.copy()
-            display_df.columns = ['Country', 'Predicted 2025 ($M)', 'Growth %', 'Confidence %']
+            columns = {
+                'country': 'Country',
+                'predicted_2025_millions': 'Predicted 2025 ($M)',
+                'predicted_2025_p10_millions': 'P10 2025 ($M)',
+                'predicted_2025_p90_millions': 'P90 2025 ($M)',
+                'growth_percent': 'Growth %',
+                'confidence_score': 'Confidence %'
+            }
+            display_df = df[[c for c in columns if c in df.columns]].rename(columns=columns)
             
             st.dataframe(
                 display_df.style.background_gradient(subset=['Growth %'], cmap='Greens'),
@@ -485,36 +562,18 @@ def show_predictive_forecasts(insights):
             df = pd.DataFrame(emerging)
             
             # Visualization
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatter(
-                x=df['current_2022_millions'],
-                y=df['predicted_2025_millions'],
-                mode='markers+text',
-                marker=dict(
-                    size=df['growth_percent']/5,
-                    color=df['growth_percent'],
-                    colorscale='Plasma',
-                    showscale=True,
-                    colorbar=dict(title="Growth %")
-                ),
-                text=df['country'],
-                textposition="top center",
-                hovertemplate='<b>%{text}</b><br>Current: $%{x:.1f}M<br>Predicted: $%{y:.1f}M<extra></extra>'
-            ))
-            
-            fig.update_layout(
-                title="Emerging Markets: Current vs Predicted Values",
-                xaxis_title="Current 2022 ($M)",
-                yaxis_title="Predicted 2025 ($M)",
-                height=500
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure('forecast_emerging_scatter')
             
             # Table
-            display_df = df.copy()
-            display_df.columns = ['Country', 'Current 2022 ($M)', 'Predicted 2025 ($M)', 'Growth %']
+            columns = {
+                'country': 'Country',
+                'current_2022_millions': 'Current 2022 ($M)',
+                'predicted_2025_millions': 'Predicted 2025 ($M)',
+                'predicted_2025_p10_millions': 'P10 2025 ($M)',
+                'predicted_2025_p90_millions': 'P90 2025 ($M)',
+                'growth_percent': 'Growth %'
+            }
+            display_df = df[[c for c in columns if c in df.columns]].rename(columns=columns)
             
             st.dataframe(
                 display_df.style.background_gradient(subset=['Growth %'], cmap='Oranges'),
@@ -573,30 +632,7 @@ def show_predictive_forecasts(insights):
             st.markdown("---")
             
             # Resource allocation pie chart
-            total_value = (
-                tier_a.get('total_value_2025', 0) + 
-                tier_b.get('total_value_2025', 0) + 
-                tier_c.get('total_value_2025', 0)
-            )
-            
-            if total_value > 0:
-                fig = go.Figure(data=[go.Pie(
-                    labels=['Tier A - Priority', 'Tier B - Growth', 'Tier C - Emerging'],
-                    values=[
-                        tier_a.get('total_value_2025', 0),
-                        tier_b.get('total_value_2025', 0),
-                        tier_c.get('total_value_2025', 0)
-                    ],
-                    marker_colors=['#DC2626', '#F59E0B', '#10B981'],
-                    hole=0.4
-                )])
-                
-                fig.update_layout(
-                    title="Recommended Resource Allocation by Tier (2025 Value)",
-                    height=400
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+            show_figure('forecast_tier_allocation_pie')
             
             # Strategic recommendations
             st.subheader("📋 Strategic Action Plan")
@@ -723,14 +759,7 @@ def show_policy_recommendations(insights):
     st.markdown("---")
     st.subheader("📊 Policy Priority Distribution")
     
-    priority_counts = pd.DataFrame(policies)['priority'].value_counts()
-    fig = px.pie(
-        values=priority_counts.values,
-        names=priority_counts.index,
-        title="Policy Recommendations by Priority",
-        color_discrete_map={'CRITICAL': '#B91C1C', 'HIGH': '#DC2626', 'MEDIUM': '#F59E0B', 'LOW': '#10B981'}
-    )
-    st.plotly_chart(fig, width="stretch")
+    show_figure('policy_priority_pie', width="stretch")
     
     
 
@@ -775,64 +804,109 @@ def show_youth_sme_opportunities(insights):
     st.markdown("---")
     st.subheader("📊 Investment vs Revenue Potential Matrix")
     
-    df = pd.DataFrame(opportunities)
+    show_figure('youth_sme_investment_scatter')
+
+
+EXPLORER_DIMENSIONS = [('region', 'Region'), ('year', 'Year'), ('value_band', 'Value Band'), ('partner', 'Partner')]
+
+def chart_selection(key, horizontal=False):
+    """Labels of the bars selected in a plotly chart (from its on_select state)"""
+    state = st.session_state.get(key) or {}
+    points = state.get('selection', {}).get('points', [])
+    return [str(p['customdata'][0]) if p.get('customdata') else str(p.get('y' if horizontal else 'x'))
+            for p in points]
+
+def show_market_explorer(insights):
+    """Cross-filtering explorer over the WITS partner data"""
+    from dashboard_figures import explorer_bar, trend_lines
+    from partner_index import get_partner_index
     
-    # Create investment level mapping
-    investment_map = {
-        'Very Low ($2K-$10K)': 1,
-        'Low ($5K-$30K)': 2,
-        'Low-Medium ($5K-$50K)': 3,
-        'Medium ($20K-$100K)': 4,
-        'Medium-High ($50K-$200K)': 5
-    }
+    st.header("🔎 Market Explorer")
+    st.markdown("""
+    Rwanda's exports by partner, region and year (WITS, 2018-2022). Select bars in any chart or use
+    the filters; each chart is filtered by the selections made in all the others.
+    """)
+    
+    try:
+        index = get_partner_index()
+    except FileNotFoundError:
+        st.warning("WITS partner data not found. Run scripts/combine_wits_partner_data.py first.")
+        return
     
-    df['investment_score'] = df['investment_required'].map(investment_map)
-    
-    fig = px.scatter(
-        df,
-        x='investment_score',
-        y='sector',
-        size=[5]*len(df),
-        color='potential_revenue',
-        title="Youth & SME Opportunities: Investment Level by Sector",
-        labels={'investment_score': 'Investment Level', 'sector': 'Sector'},
-        hover_data=['opportunity']
+    # Linked filters: widget picks plus bars selected in the charts
+    selections = {}
+    filter_cols = st.columns(len(EXPLORER_DIMENSIONS))
+    for (dim, label), col in zip(EXPLORER_DIMENSIONS, filter_cols):
+        with col:
+            picked = st.multiselect(label, index.labels[dim], key=f"explorer_{dim}_filter")
+        selected = chart_selection(f"explorer_{dim}_chart", horizontal=(dim == 'partner'))
+        selections[dim] = sorted(set(picked) | set(selected))
+    
+    summary = index.summary(selections)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Export Value", f"${summary['value']:,.1f}M")
+    col2.metric("Partners", summary['partners'])
+    col3.metric("Partner-Years", summary['rows'])
+    
+    col1, col2 = st.columns(2)
+    for dim, title, col in [('region', "Exports by Region", col1), ('year', "Exports by Year", col2)]:
+        with col:
+            st.plotly_chart(
+                explorer_bar(index.facet(dim, selections), title, selections[dim]),
+                width="stretch", on_select="rerun", selection_mode=("points", "box"),
+                key=f"explorer_{dim}_chart"
+            )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            explorer_bar(index.facet('value_band', selections), "Exports by Value Band", selections['value_band']),
+            width="stretch", on_select="rerun", selection_mode=("points", "box"),
+            key="explorer_value_band_chart"
+        )
+    with col2:
+        st.plotly_chart(
+            explorer_bar(index.facet('partner', selections), "Top 20 Partners", selections['partner'],
+                         horizontal=True, top_n=20),
+            width="stretch", on_select="rerun", selection_mode=("points", "box"),
+            key="explorer_partner_chart"
+        )
+    
+    # Partner trends over the selected period (downsampled server-side for long histories)
+    st.subheader("📈 Partner Export Trends")
+    years = index.labels['year']
+    start, end = st.select_slider("Period", options=years, value=(years[0], years[-1]), key="explorer_trend_range")
+    partners = selections['partner'] or index.facet('partner', selections).nlargest(10, 'value')['label'].tolist()
+    history = index.frame.iloc[index.rows({**selections, 'year': [], 'partner': partners})]
+    st.plotly_chart(
+        trend_lines(history, 'Year', 'Export_Value_Millions', 'Partner Name',
+                    "Export Value by Partner", x_range=(int(start), int(end))),
+        width="stretch"
+    )
+    
+    # Matching partner-years
+    rows = index.frame.iloc[index.rows(selections)]
+    st.subheader(f"📋 Matching Partner-Years ({len(rows):,})")
+    st.dataframe(
+        rows[['Partner Name', 'Region', 'Year', 'Export_Value_Millions', 'YoY_Growth_Rate']]
+            .sort_values('Export_Value_Millions', ascending=False).head(100),
+        width="stretch", hide_index=True
     )
-    st.plotly_chart(fig, use_container_width=True)
 
 
 def show_detailed_analytics(insights):
     """Detailed analytics page"""
     st.header("📈 Detailed Analytics")
     
-    # Load all CSV files
-    opportunities_df = load_csv_data('data/insights/export_insights_opportunities.csv')
-    matrix_df = load_csv_data('data/insights/export_insights_opportunity_matrix.csv')
-    
-    if opportunities_df is not None:
+    if current_snapshot().table('export_insights_opportunities.csv') is not None:
         st.subheader("📦 Current Export Commodities")
         
         # Value distribution
-        fig = px.pie(
-            opportunities_df,
-            values='current_value_millions',
-            names='commodity',
-            title="Export Value Distribution (Top Commodities)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('commodity_value_pie')
         
         # Growth vs Value scatter
         st.subheader("📊 Growth vs Current Value Analysis")
-        fig2 = px.scatter(
-            opportunities_df,
-            x='current_value_millions',
-            y='yoy_growth_percent',
-            size='market_share_percent',
-            hover_data=['commodity'],
-            title="YoY Growth vs Current Export Value",
-            labels={'current_value_millions': 'Current Value ($M)', 'yoy_growth_percent': 'YoY Growth (%)'}
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+        show_figure('commodity_growth_scatter')
     
     # Raw data tables
     st.markdown("---")
@@ -841,24 +915,10 @@ def show_detailed_analytics(insights):
     tab1, tab2 = st.tabs(["Opportunities Data", "Opportunity Matrix"])
     
     with tab1:
-        if opportunities_df is not None:
-            st.dataframe(opportunities_df, use_container_width=True)
-            st.download_button(
-                "⬇️ Download CSV",
-                opportunities_df.to_csv(index=False),
-                "opportunities_data.csv",
-                "text/csv"
-            )
+        show_paged_table('export_insights_opportunities.csv', 'opportunities', "opportunities_data.csv")
     
     with tab2:
-        if matrix_df is not None:
-            st.dataframe(matrix_df, use_container_width=True)
-            st.download_button(
-                "⬇️ Download CSV",
-                matrix_df.to_csv(index=False),
-                "opportunity_matrix.csv",
-                "text/csv"
-            )
+        show_paged_table('export_insights_opportunity_matrix.csv', 'matrix', "opportunity_matrix.csv")
 
 
 # Footer
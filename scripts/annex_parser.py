@@ -0,0 +1,278 @@
+"""
+Rwanda Export Annex Parser
+Reads the NISR quarterly trade report annex (the .xlsx workbook or its per-sheet CSV exports) directly:
+skips title and blank rows, detects header blocks and period columns, forward-fills merged category
+cells and emits typed wide tables, parsing the sheets in parallel
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import openpyxl
+except ImportError:  # optional: only needed for the .xlsx workbook, CSV sheet exports parse without it
+    openpyxl = None
+
+ANNEX_WORKBOOK = 'data/raw/2024Q3_Trade_report_annexTables_0.xlsx'
+
+# Known annex sheets: table name, names for label columns the sheet leaves blank, and the
+# analysis-ready CSV the table feeds (see trade_tables.QUARTERLY_TABLES)
+ANNEX_SHEETS = {
+    'Total trade with the World': {
+        'name': 'total_trade',
+        'label_names': ['Trade_Type', 'Partner'],
+        'output': 'data/processed/analysis_ready_total_trade_world_updated.csv'
+    }
+}
+
+# 2024Q3, 2024 Q3, 2024-Q3, Q3 2024, Q3-2024 (case-insensitive)
+_PERIOD_PATTERNS = [
+    re.compile(r'^\s*(?P<year>\d{4})\s*[-_/ ]?\s*[Qq](?P<quarter>[1-4])\s*$'),
+    re.compile(r'^\s*[Qq](?P<quarter>[1-4])\s*[-_/ ]?\s*(?P<year>\d{4})\s*$')
+]
+_MISSING_MARKERS = {'', '-', '--', '—', '–', '..', '...', 'n/a', 'na', 'nan', 'none', 'x'}
+
+
+def normalize_period(cell):
+    """'YYYYQn' for a cell naming a quarter in any of the annex spellings, else None"""
+    if cell is None or (isinstance(cell, float) and np.isnan(cell)):
+        return None
+    text = str(cell)
+    for pattern in _PERIOD_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            return f"{match.group('year')}Q{match.group('quarter')}"
+    return None
+
+
+def parse_numbers(values):
+    """
+    Annex cells to float: thousands separators and padding removed, '(12.5)' read as -12.5,
+    dash/'..' placeholders read as NaN
+    """
+    text = pd.Series(values, dtype=object).astype(str).str.strip()
+    text = text.where(~text.str.lower().isin(_MISSING_MARKERS), '')
+    negative = text.str.match(r'^\(.*\)$')
+    text = text.str.replace(r'[,\s%()]', '', regex=True)
+    numbers = pd.to_numeric(text, errors='coerce').to_numpy(dtype=float)
+    return np.where(negative.to_numpy(), -numbers, numbers)
+
+
+def _clean_cell(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    return str(value).strip()
+
+
+def _slug(text):
+    return re.sub(r'[^0-9a-z]+', '_', text.lower()).strip('_')
+
+
+def find_header_rows(grid, min_periods=2):
+    """Row positions holding at least min_periods period labels (the header of a table block)"""
+    periods = grid.map(normalize_period).notna()
+    return list(np.flatnonzero(periods.sum(axis=1).to_numpy() >= min_periods))
+
+
+def parse_sheet(grid, sheet_name='', label_names=None):
+    """
+    Typed tables found in one sheet grid (a DataFrame of raw cells, no header)
+
+    Every header row (a row with period labels) opens a block that runs to the next header row.
+    Label columns are the columns left of the first period column; blank label headers take
+    label_names (else Label_<n>), every label column but the last is forward-filled (merged
+    category cells), period and other value columns become float, and rows without a single
+    period value (notes, blank spacers) are dropped. Returns [(title, DataFrame)].
+    """
+    grid = grid.map(_clean_cell)
+    grid = grid.loc[(grid != '').any(axis=1), (grid != '').any(axis=0)].reset_index(drop=True)
+    grid.columns = range(grid.shape[1])
+    headers = find_header_rows(grid)
+
+    tables = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1] if i + 1 < len(headers) else len(grid)
+        header_cells = grid.iloc[header].tolist()
+        period_positions = [j for j, cell in enumerate(header_cells) if normalize_period(cell)]
+        first_period = period_positions[0]
+
+        # Title: text rows between the previous block and this header
+        start = headers[i - 1] + 1 if i else 0
+        title_rows = grid.iloc[start:header]
+        titles = [' '.join(c for c in row if c) for row in title_rows.itertuples(index=False)
+                  if sum(bool(c) for c in row) == 1]
+        title = titles[-1] if titles else sheet_name
+
+        body = grid.iloc[header + 1:end]
+        label_positions = list(range(first_period))
+        # Leading columns that are blank in both header and body carry nothing
+        label_positions = [j for j in label_positions if header_cells[j] or (body[j] != '').any()]
+        names = iter(label_names or [])
+        columns = {}
+        for n, j in enumerate(label_positions, 1):
+            columns[j] = header_cells[j] or next(names, f"Label_{n}")
+        for j, cell in enumerate(header_cells[first_period:], first_period):
+            if cell:
+                columns[j] = normalize_period(cell) or cell
+
+        frame = body[list(columns)].rename(columns=columns).reset_index(drop=True)
+        labels = [columns[j] for j in label_positions]
+        values = [name for name in frame.columns if name not in labels]
+        for name in values:
+            frame[name] = parse_numbers(frame[name])
+        for name in labels[:-1]:
+            frame[name] = frame[name].replace('', np.nan).ffill()
+        frame = frame[frame[[c for c in values if normalize_period(c)]].notna().any(axis=1)]
+        if frame.empty:
+            continue
+        tables.append((title, frame.reset_index(drop=True)))
+    return tables
+
+
+def annex_sources(path=ANNEX_WORKBOOK):
+    """
+    [(sheet name, source)] for an annex workbook: its sheets when the .xlsx exists (needs
+    openpyxl), else its '<workbook>.xlsx - <sheet>.csv' exports next to it
+    """
+    path = Path(path)
+    if path.suffix == '.csv':
+        return [(path.stem.split(' - ', 1)[-1], str(path))]
+    if path.exists():
+        if openpyxl is None:
+            raise ImportError("Reading the annex workbook requires openpyxl: pip install openpyxl "
+                              "(or parse its '<workbook>.xlsx - <sheet>.csv' exports)")
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        sheets = list(workbook.sheetnames)
+        workbook.close()
+        return [(sheet, str(path)) for sheet in sheets]
+    exports = sorted(path.parent.glob(f"{path.name} - *.csv"))
+    if not exports:
+        raise FileNotFoundError(f"No annex workbook or sheet exports found for {path}")
+    return [(p.name[len(path.name) + 3:-4], str(p)) for p in exports]
+
+
+def read_sheet_grid(sheet, source):
+    """Raw cell grid of one sheet (no header handling, every cell as text)"""
+    if source.endswith('.csv'):
+        return pd.read_csv(source, header=None, dtype=str, keep_default_na=False, skip_blank_lines=False)
+    return pd.read_excel(source, sheet_name=sheet, header=None, dtype=str, engine='openpyxl')
+
+
+def _parse_source(sheet, source):
+    """Worker entry point: read and parse one sheet"""
+    spec = ANNEX_SHEETS.get(sheet, {})
+    tables = parse_sheet(read_sheet_grid(sheet, source), sheet, spec.get('label_names'))
+    base = spec.get('name') or _slug(sheet)
+    return [(base if n == 0 else f"{base}_{n + 1}", sheet, title, frame)
+            for n, (title, frame) in enumerate(tables)]
+
+
+def parse_annex(path=ANNEX_WORKBOOK, workers=None):
+    """
+    Parse every sheet of an annex workbook in parallel
+
+    Returns {table name: DataFrame}; a sheet holding several table blocks yields
+    <name>, <name>_2, ... Each frame's attrs carry its sheet and title.
+    """
+    sources = annex_sources(path)
+    workers = workers or min(len(sources), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_source, *zip(*sources)))
+    else:
+        results = [_parse_source(sheet, source) for sheet, source in sources]
+
+    tables = {}
+    for parsed in results:
+        for name, sheet, title, frame in parsed:
+            frame.attrs.update(sheet=sheet, title=title)
+            tables[name] = frame
+    return tables
+
+
+def keep_stored_periods(frame, path, labels):
+    """
+    Parsed table plus the periods only the stored table at path has
+
+    Quarters appended later by release ingestion are not in the original annex workbook, so
+    re-parsing it keeps them (and rows that only the later release added) instead of dropping
+    them. Periods present in both come from the parsed table.
+    """
+    try:
+        stored = pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return frame
+    later = [col for col in stored.columns if normalize_period(col) and col not in frame.columns]
+    if not later or any(col not in stored.columns or col not in frame.columns for col in labels):
+        return frame
+    later_values = stored[labels + later].copy()
+    later_values[labels] = later_values[labels].astype(str).apply(lambda col: col.str.strip())
+    merged = frame.merge(later_values, on=labels, how='left')
+    # Rows only the stored table has go last, so the annex's own row order is kept
+    known = pd.MultiIndex.from_frame(frame[labels])
+    extra_rows = later_values[~pd.MultiIndex.from_frame(later_values[labels]).isin(known)]
+    if not extra_rows.empty:
+        merged = pd.concat([merged, extra_rows], ignore_index=True)
+    periods = sorted(col for col in merged.columns if normalize_period(col))
+    merged = merged[labels + periods + [col for col in merged.columns if col not in labels and col not in periods]]
+    merged.attrs.update(frame.attrs)
+    return merged
+
+
+def write_tables(tables, directory='data/processed'):
+    """
+    Write parsed tables: known sheets to their analysis-ready path (keeping later ingested
+    periods, see keep_stored_periods), others as annex_<name>.csv
+    """
+    specs = {spec['name']: spec for spec in ANNEX_SHEETS.values() if spec.get('output')}
+    written = {}
+    for name, frame in tables.items():
+        spec = specs.get(name)
+        path = Path(spec['output'] if spec else Path(directory) / f"annex_{name}.csv")
+        if spec:
+            frame = keep_stored_periods(frame, path, spec['label_names'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        frame.to_csv(tmp_path, index=False)
+        tmp_path.replace(path)
+        written[name] = str(path)
+    return written
+
+
+def main():
+    """Parse the annex workbook and write its tables"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parse the NISR trade report annex tables')
+    parser.add_argument('path', nargs='?', default=ANNEX_WORKBOOK,
+                        help='Annex workbook (.xlsx) or one of its sheet CSV exports')
+    parser.add_argument('--output', default='data/processed', help='Directory for sheets without a registered output')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per sheet)')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what was parsed')
+    args = parser.parse_args()
+
+    print("📑 NISR ANNEX TABLE PARSER")
+    print("=" * 60)
+    start = time.perf_counter()
+    tables = parse_annex(args.path, args.workers)
+    elapsed = time.perf_counter() - start
+
+    for name, frame in tables.items():
+        periods = [c for c in frame.columns if normalize_period(c)]
+        span = f"{periods[0]}-{periods[-1]}" if periods else 'no periods'
+        print(f"   • {name:<24} {len(frame):>4} rows  {span}  ({frame.attrs['title']})")
+    print(f"\n✅ {len(tables)} tables parsed in {elapsed:.2f}s")
+
+    if not args.dry_run:
+        for name, path in write_tables(tables, args.output).items():
+            print(f"   💾 {name} -> {path}")
+
+
+if __name__ == "__main__":
+    main()
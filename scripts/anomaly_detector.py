@@ -0,0 +1,234 @@
+"""
+Rwanda Export Anomaly Detector
+Scores every partner, commodity, bloc and continent quarterly series at once with robust
+statistics and keeps the scores incrementally: only newly appended quarters are scored
+"""
+
+import json
+import os
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from trade_tables import QUARTERLY_TABLES, label_columns, load_quarterly_table, period_columns
+
+# MAD -> standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+SCORE_COLUMNS = ['series_id', 'table', 'label', 'period', 'value', 'expected_value',
+                 'rolling_z', 'seasonal_z', 'score', 'direction', 'flagged']
+
+
+def build_series_matrix(tables):
+    """
+    Stack every row of every wide table into one (series x period) matrix
+
+    Returns (series DataFrame with series_id/table/label, list of periods, values ndarray).
+    Tables with fewer periods are NaN-padded onto the union of periods.
+    """
+    periods = sorted({p for df in tables.values() for p in period_columns(df)})
+    series_frames = []
+    blocks = []
+
+    for name, df in tables.items():
+        labels = [col for col in label_columns(name) if col in df.columns] if name in QUARTERLY_TABLES \
+            else [col for col in df.columns if col not in period_columns(df)]
+        label = pd.Series(df.index.astype(str), index=df.index)
+        for i, col in enumerate(labels):
+            text = df[col].fillna('').astype(str).str.strip()
+            label = text if i == 0 else label + ' | ' + text
+        series_frames.append(pd.DataFrame({
+            'series_id': name + ':' + label,
+            'table': name,
+            'label': label
+        }))
+        blocks.append(df.reindex(columns=periods).to_numpy(dtype=float))
+
+    series = pd.concat(series_frames, ignore_index=True)
+    values = np.vstack(blocks) if blocks else np.empty((0, len(periods)))
+    return series, periods, values
+
+
+def _trailing_windows(values, window):
+    """(n, T, window) view where [:, t] holds the `window` values strictly before column t"""
+    padded = np.concatenate([np.full((values.shape[0], window), np.nan), values], axis=1)
+    return sliding_window_view(padded, window, axis=1)[:, :values.shape[1]]
+
+
+def _robust_z(current, history, min_history, rel_floor, abs_floor):
+    """Robust z-score of current against trailing history (median / MAD with floors)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        median = np.nanmedian(history, axis=-1)
+        mad = np.nanmedian(np.abs(history - median[..., None]), axis=-1)
+    scale = np.maximum(MAD_SCALE * mad, np.maximum(rel_floor * np.abs(median), abs_floor))
+    z = (current - median) / scale
+    enough = np.sum(~np.isnan(history), axis=-1) >= min_history
+    return np.where(enough, z, np.nan), median
+
+
+def robust_scores(values, targets, window=4, seasonal_lag=4, seasonal_window=8,
+                  min_history=3, rel_floor=0.05, abs_floor=0.1):
+    """
+    Score the target columns of a (series x period) matrix
+
+    rolling_z  : value vs the median/MAD of the previous `window` quarters
+    seasonal_z : same-quarter log change (t vs t-lag) vs the median/MAD of the
+                 previous `seasonal_window` same-quarter changes
+    Returns (rolling_z, seasonal_z, expected_value), each shaped (series, len(targets)).
+    """
+    targets = np.asarray(targets, dtype=int)
+    current = values[:, targets]
+
+    rolling_history = _trailing_windows(values, window)[:, targets]
+    rolling_z, expected = _robust_z(current, rolling_history, min_history, rel_floor, abs_floor)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.full(values.shape, np.nan)
+        positive = (values[:, seasonal_lag:] > 0) & (values[:, :-seasonal_lag] > 0)
+        ratios[:, seasonal_lag:] = np.where(
+            positive, np.log(values[:, seasonal_lag:] / values[:, :-seasonal_lag]), np.nan
+        )
+    seasonal_history = _trailing_windows(ratios, seasonal_window)[:, targets]
+    seasonal_z, _ = _robust_z(ratios[:, targets], seasonal_history, min_history, 0.0, 0.05)
+
+    return rolling_z, seasonal_z, expected
+
+
+class AnomalyDetector:
+    """Incremental robust anomaly scoring over all wide quarterly tables"""
+
+    def __init__(self, root='data/anomalies', threshold=3.5, window=4, seasonal_window=8):
+        self.root = Path(root)
+        self.threshold = threshold
+        self.window = window
+        self.seasonal_window = seasonal_window
+        self.scores_path = self.root / 'scores.csv'
+        self.manifest_path = self.root / 'manifest.json'
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {}
+
+    def scores(self):
+        """All stored scores"""
+        try:
+            return pd.read_csv(self.scores_path)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    def update(self, tables=None, full=False):
+        """
+        Score quarters appended since the last update (or everything with full=True)
+
+        Parameters:
+        -----------
+        tables : dict, optional
+            {table_name: wide DataFrame}; defaults to every registered quarterly table
+
+        Returns the newly scored rows.
+        """
+        if tables is None:
+            tables = {name: load_quarterly_table(name) for name in QUARTERLY_TABLES}
+
+        series, periods, values = build_series_matrix(tables)
+        watermarks = {} if full else {name: self.manifest.get(name, {}).get('watermark') for name in tables}
+
+        # A cell is new when its period is past its own table's watermark
+        period_array = np.array(periods)
+        table_marks = series['table'].map(lambda t: watermarks.get(t) or '').to_numpy()
+        is_new = period_array[None, :] > table_marks[:, None]
+        targets = np.flatnonzero(is_new.any(axis=0))
+
+        new_rows = pd.DataFrame(columns=SCORE_COLUMNS)
+        if len(targets):
+            rolling_z, seasonal_z, expected = robust_scores(
+                values, targets, window=self.window, seasonal_window=self.seasonal_window
+            )
+            score = np.fmax(np.abs(rolling_z), np.abs(seasonal_z))
+            rows, cols = np.nonzero(is_new[:, targets] & ~np.isnan(values[:, targets]))
+            direction_z = np.where(np.isnan(rolling_z), seasonal_z, rolling_z)[rows, cols]
+
+            new_rows = pd.DataFrame({
+                'series_id': series['series_id'].to_numpy()[rows],
+                'table': series['table'].to_numpy()[rows],
+                'label': series['label'].to_numpy()[rows],
+                'period': period_array[targets][cols],
+                'value': values[rows, targets[cols]],
+                'expected_value': expected[rows, cols].round(2),
+                'rolling_z': rolling_z[rows, cols].round(2),
+                'seasonal_z': seasonal_z[rows, cols].round(2),
+                'score': score[rows, cols].round(2),
+                'direction': np.where(direction_z >= 0, 'spike', 'drop'),
+                'flagged': score[rows, cols] >= self.threshold
+            })
+
+        stored = pd.DataFrame(columns=SCORE_COLUMNS) if full else self.scores()
+        if not new_rows.empty:
+            stored = stored[~stored.set_index(['series_id', 'period']).index.isin(
+                new_rows.set_index(['series_id', 'period']).index)]
+            stored = pd.concat([df for df in (stored, new_rows) if not df.empty], ignore_index=True)
+        self._save(stored, tables)
+        return new_rows
+
+    def flagged(self, period=None):
+        """Flagged anomalies, strongest first (optionally for a single period)"""
+        scores = self.scores()
+        flagged = scores[scores['flagged'].astype(bool)]
+        if period is not None:
+            flagged = flagged[flagged['period'] == period]
+        return flagged.sort_values(['period', 'score'], ascending=[False, False]).reset_index(drop=True)
+
+    def _save(self, scores, tables):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.scores_path.with_suffix('.csv.tmp')
+        scores.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.scores_path)
+
+        for name, df in tables.items():
+            periods = period_columns(df)
+            if periods:
+                self.manifest[name] = {'watermark': periods[-1], 'scored_at': datetime.now().isoformat()}
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+
+
+def main():
+    """Score newly appended quarters and list the latest anomalies"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Incremental anomaly detection over quarterly trade series')
+    parser.add_argument('--root', default='data/anomalies', help='Directory holding stored scores')
+    parser.add_argument('--full', action='store_true', help='Rescore all history')
+    parser.add_argument('--threshold', type=float, default=3.5, help='Robust z-score flag threshold')
+    args = parser.parse_args()
+
+    print("🚨 QUARTERLY TRADE ANOMALY DETECTION")
+    print("=" * 60)
+
+    detector = AnomalyDetector(args.root, threshold=args.threshold)
+    start = time.perf_counter()
+    new_rows = detector.update(full=args.full)
+    elapsed = time.perf_counter() - start
+
+    print(f"   • Scored {len(new_rows):,} new series-quarters in {elapsed:.2f}s")
+    if new_rows.empty:
+        print("   • No new quarters since the last run")
+        return
+
+    latest = new_rows['period'].max()
+    flagged = detector.flagged(latest)
+    print(f"\n🔎 ANOMALIES FLAGGED IN {latest}: {len(flagged)}")
+    for _, row in flagged.head(20).iterrows():
+        print(f"   • {row['label'][:45]:<45} {row['direction']:<5} ${row['value']:.1f}M "
+              f"(expected ~${row['expected_value']:.1f}M, score {row['score']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
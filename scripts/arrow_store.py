@@ -0,0 +1,205 @@
+"""
+Rwanda Export Arrow Store
+CSV tables converted once to single-batch Arrow IPC (Feather v2) files and memory-mapped read-only
+per process, so sessions share zero-copy views of the same pages instead of private copies
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: readers fall back to pandas.read_csv
+    pa = None
+
+ARROW_DIR = 'data/arrow'
+# Shallow copies of the mapped views are only safe where copy-on-write is always on (pandas 3)
+COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3
+
+
+def arrow_available():
+    return pa is not None
+
+
+def read_csv_frame(path):
+    """pandas.read_csv that maps an empty file to an empty frame"""
+    try:
+        return pd.read_csv(path)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+def write_arrow(frame, path):
+    """
+    Write a DataFrame as an uncompressed Arrow IPC file with a single record batch
+
+    Uncompressed, unchunked columns are what lets readers map the file and build pandas
+    columns directly on its pages.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(frame, preserve_index=False).combine_chunks()
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(1, table.num_rows))
+    tmp_path.replace(path)
+
+
+def process_memory_mb():
+    """
+    Resident memory of this process split into anonymous (private heap) and file-backed
+    (mapped files, shared through the page cache) in MB
+    """
+    memory = {'rss': None, 'anon': None, 'file': None}
+    fields = {'VmRSS:': 'rss', 'RssAnon:': 'anon', 'RssFile:': 'file'}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                key = fields.get(line.split(':')[0] + ':')
+                if key:
+                    memory[key] = int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory['rss'] = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return memory
+
+
+def mapped_resident_mb(paths):
+    """Resident MB of the mappings of the given files (None where /proc/self/smaps is unavailable)"""
+    wanted = {str(Path(p).resolve()) for p in paths}
+    resident = {}
+    current = None
+    try:
+        with open('/proc/self/smaps', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if '-' in parts[0] and len(parts) >= 5:
+                    current = parts[-1] if len(parts) >= 6 and parts[-1] in wanted else None
+                elif current and parts[0] == 'Rss:':
+                    resident[current] = resident.get(current, 0) + int(parts[1]) / 1024
+    except FileNotFoundError:
+        return None
+    return resident
+
+
+class MappedTable:
+    """An Arrow IPC file mapped read-only, with a pandas view built on the mapped buffers"""
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.source = pa.memory_map(str(self.path), 'r')
+        self.table = pa.ipc.open_file(self.source).read_all()
+        self.nbytes = self.source.size()
+        # split_blocks keeps one block per column, so numeric columns without nulls
+        # reference the mapped pages instead of being consolidated into a copy
+        self._frame = self.table.to_pandas(split_blocks=True)
+
+    def frame(self):
+        """
+        Copy of the shared view that callers may add columns to or modify
+
+        Under pandas 3 copy-on-write a shallow copy is enough: a write copies the column first.
+        Older pandas writes through shallow copies (into other sessions' frames, or onto the
+        read-only map), so there the view is copied in full.
+        """
+        return self._frame.copy(deep=not COPY_ON_WRITE)
+
+
+class ArrowTableStore:
+    """Arrow copies of CSV sources, converted when stale and mapped once per process"""
+
+    def __init__(self, directory=ARROW_DIR):
+        self.directory = Path(directory)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, source):
+        """Arrow file of a CSV source (<directory>/<source folder>/<stem>.arrow)"""
+        source = Path(source)
+        return self.directory / source.parent.name / f"{source.stem}.arrow"
+
+    def convert(self, source, force=False):
+        """
+        Write the Arrow copy of a CSV if it is missing or was converted from another version
+
+        The size and mtime of the CSV it was converted from are kept next to the copy, so any
+        change reconverts it, including CSVs published by rename that keep an older mtime.
+        """
+        target = self.path_for(source)
+        stat = Path(source).stat()
+        signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        marker = target.with_suffix('.source.json')
+        if not force and target.exists():
+            try:
+                with open(marker, 'r') as f:
+                    if json.load(f) == signature:
+                        return target
+            except (FileNotFoundError, ValueError):
+                pass
+        write_arrow(read_csv_frame(source), target)
+        tmp_path = marker.with_name(f"{marker.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(signature, f)
+        tmp_path.replace(marker)
+        return target
+
+    def frame(self, source):
+        """DataFrame view of a CSV source, served from its mapped Arrow copy"""
+        path = self.convert(source)
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry is None or entry[0] != (stat.st_size, stat.st_mtime_ns):
+                # A replaced file gets a new mapping; views of the old one stay valid
+                entry = ((stat.st_size, stat.st_mtime_ns), MappedTable(path))
+                self._tables[key] = entry
+            return entry[1].frame()
+
+    def memory_report(self):
+        """Process memory plus the size and resident part of every mapped table"""
+        with self._lock:
+            tables = {Path(key).relative_to(self.directory.resolve()).as_posix(): table
+                      for key, (_, table) in self._tables.items()}
+        resident = mapped_resident_mb([table.path for table in tables.values()]) or {}
+        return {
+            'process_mb': process_memory_mb(),
+            'mapped_mb': sum(table.nbytes for table in tables.values()) / 1e6,
+            'tables': {
+                name: {'size_mb': table.nbytes / 1e6, 'resident_mb': resident.get(str(table.path))}
+                for name, table in tables.items()
+            }
+        }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_arrow_store(directory=ARROW_DIR):
+    """Process-wide ArrowTableStore (None when pyarrow is not installed)"""
+    if pa is None:
+        return None
+    key = str(Path(directory).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ArrowTableStore(directory)
+        return _stores[key]
+
+
+def read_table(source, directory=ARROW_DIR):
+    """A CSV as a DataFrame: a mapped Arrow view when pyarrow is available, else read_csv"""
+    store = get_arrow_store(directory)
+    if store is None:
+        return read_csv_frame(source)
+    try:
+        return store.frame(source)
+    except PermissionError:
+        # Read-only deployment without a prebuilt Arrow copy
+        return read_csv_frame(source)
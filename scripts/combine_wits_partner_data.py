@@ -8,8 +8,57 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
-def load_and_combine_wits_data():
-    """Load and combine all WITS partner data files"""
+from data_validation import WITS_FILE_SCHEMA, ValidationReport, validate_frame
+from materialized_aggregates import MaterializedAggregateStore
+
+def assign_region(country):
+    """Assign a WITS partner name to its region (regional aggregates fall into Other/Regional Grouping)"""
+    africa_countries = ['Algeria', 'Angola', 'Benin', 'Botswana', 'Burkina Faso', 'Burundi', 'Cameroon', 
+                      'Cape Verde', 'Central African Republic', 'Chad', 'Comoros', 'Congo, Rep.', 
+                      'Congo, Dem. Rep.', 'Cote d\'Ivoire', 'Djibouti', 'Egypt, Arab Rep.', 'Equatorial Guinea',
+                      'Eritrea', 'Eswatini', 'Ethiopia(excludes Eritrea)', 'Gabon', 'Gambia, The', 'Ghana',
+                      'Guinea', 'Kenya', 'Lesotho', 'Liberia', 'Libya', 'Madagascar', 'Malawi', 'Mali',
+                      'Mauritania', 'Mauritius', 'Morocco', 'Mozambique', 'Namibia', 'Niger', 'Nigeria',
+                      'Sao Tome and Principe', 'Senegal', 'Seychelles', 'Sierra Leone', 'Somalia',
+                      'South Africa', 'South Sudan', 'Sudan', 'Tanzania', 'Togo', 'Tunisia', 'Uganda',
+                      'Zambia', 'Zimbabwe']
+    
+    europe_countries = ['Albania', 'Andorra', 'Austria', 'Belarus', 'Belgium', 'Bosnia and Herzegovina',
+                      'Bulgaria', 'Croatia', 'Cyprus', 'Czech Republic', 'Denmark', 'Estonia', 'Finland',
+                      'France', 'Germany', 'Greece', 'Hungary', 'Iceland', 'Ireland', 'Italy', 'Latvia',
+                      'Lithuania', 'Luxembourg', 'Malta', 'Moldova', 'Montenegro', 'Netherlands', 'North Macedonia',
+                      'Norway', 'Poland', 'Portugal', 'Romania', 'Russian Federation', 'Serbia, FR(Serbia/Montenegro)',
+                      'Slovak Republic', 'Slovenia', 'Spain', 'Sweden', 'Switzerland', 'Ukraine', 'United Kingdom']
+    
+    asia_countries = ['Afghanistan', 'Armenia', 'Azerbaijan', 'Bahrain', 'Bangladesh', 'Bhutan', 'Brunei',
+                     'Cambodia', 'China', 'Georgia', 'Hong Kong, China', 'India', 'Indonesia', 'Iran, Islamic Rep.',
+                     'Iraq', 'Israel', 'Japan', 'Jordan', 'Kazakhstan', 'Korea, Rep.', 'Korea, Dem. Rep.',
+                     'Kuwait', 'Kyrgyz Republic', 'Lao PDR', 'Lebanon', 'Macao', 'Malaysia', 'Mongolia',
+                     'Myanmar', 'Nepal', 'Oman', 'Pakistan', 'Philippines', 'Qatar', 'Saudi Arabia',
+                     'Singapore', 'Sri Lanka', 'Syrian Arab Republic', 'Tajikistan', 'Thailand', 'Turkey',
+                     'Turkmenistan', 'United Arab Emirates', 'Uzbekistan', 'Vietnam', 'Yemen']
+    
+    americas_countries = ['Argentina', 'Bolivia', 'Brazil', 'Canada', 'Chile', 'Colombia', 'Costa Rica',
+                        'Cuba', 'Ecuador', 'El Salvador', 'Guatemala', 'Honduras', 'Jamaica', 'Mexico',
+                        'Nicaragua', 'Panama', 'Paraguay', 'Peru', 'United States', 'Uruguay', 'Venezuela']
+    
+    oceania_countries = ['Australia', 'Fiji', 'New Zealand', 'Papua New Guinea']
+    
+    if country in africa_countries:
+        return 'Africa'
+    elif country in europe_countries:
+        return 'Europe & Central Asia'
+    elif country in asia_countries:
+        return 'Asia & Middle East'
+    elif country in americas_countries:
+        return 'Americas'
+    elif country in oceania_countries:
+        return 'Oceania'
+    else:
+        return 'Other/Regional Grouping'
+
+def load_and_combine_wits_data(directory='.'):
+    """Load and combine all WITS partner data files found in directory"""
     
     print("🔄 COMBINING RWANDA WITS PARTNER DATA (2018-2022)")
     print("=" * 60)
@@ -24,11 +73,21 @@ def load_and_combine_wits_data():
     }
     
     combined_data = []
+    report = ValidationReport()
     
     for year, filename in files.items():
         try:
             print(f"📂 Loading {filename}...")
-            df = pd.read_csv(filename)
+            df = pd.read_csv(Path(directory) / filename)
+            
+            # Structural problems fail the whole combination instead of silently dropping a year
+            file_report = validate_frame(df, WITS_FILE_SCHEMA)
+            for issue in file_report.issues:
+                report.add(filename, issue['check'], issue['message'], issue['severity'], issue['rows'])
+            report.checks += file_report.checks
+            if not file_report.ok:
+                print(f"   ❌ {filename} failed validation")
+                continue
             
             # Verify year column matches expected year
             df['Year'] = year  # Ensure consistency
@@ -44,9 +103,12 @@ def load_and_combine_wits_data():
             
         except FileNotFoundError:
             print(f"   ❌ {filename} not found")
-        except Exception as e:
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            report.add(filename, 'readable', f"{type(e).__name__}: {e}")
             print(f"   ❌ Error loading {filename}: {e}")
     
+    report.raise_for_errors()
+    
     if not combined_data:
         print("❌ No data files could be loaded")
         return None
@@ -72,53 +134,7 @@ def load_and_combine_wits_data():
     combined_df['Export_Value_USD'] = combined_df['Export (US$ Thousand)'] * 1000  # Convert to actual USD
     combined_df['Export_Value_Millions'] = combined_df['Export (US$ Thousand)'] / 1000  # Convert to millions
     
-    # Create regional groupings
-    def assign_region(country):
-        """Assign countries to regions"""
-        africa_countries = ['Algeria', 'Angola', 'Benin', 'Botswana', 'Burkina Faso', 'Burundi', 'Cameroon', 
-                          'Cape Verde', 'Central African Republic', 'Chad', 'Comoros', 'Congo, Rep.', 
-                          'Congo, Dem. Rep.', 'Cote d\'Ivoire', 'Djibouti', 'Egypt, Arab Rep.', 'Equatorial Guinea',
-                          'Eritrea', 'Eswatini', 'Ethiopia(excludes Eritrea)', 'Gabon', 'Gambia, The', 'Ghana',
-                          'Guinea', 'Kenya', 'Lesotho', 'Liberia', 'Libya', 'Madagascar', 'Malawi', 'Mali',
-                          'Mauritania', 'Mauritius', 'Morocco', 'Mozambique', 'Namibia', 'Niger', 'Nigeria',
-                          'Sao Tome and Principe', 'Senegal', 'Seychelles', 'Sierra Leone', 'Somalia',
-                          'South Africa', 'South Sudan', 'Sudan', 'Tanzania', 'Togo', 'Tunisia', 'Uganda',
-                          'Zambia', 'Zimbabwe']
-        
-        europe_countries = ['Albania', 'Andorra', 'Austria', 'Belarus', 'Belgium', 'Bosnia and Herzegovina',
-                          'Bulgaria', 'Croatia', 'Cyprus', 'Czech Republic', 'Denmark', 'Estonia', 'Finland',
-                          'France', 'Germany', 'Greece', 'Hungary', 'Iceland', 'Ireland', 'Italy', 'Latvia',
-                          'Lithuania', 'Luxembourg', 'Malta', 'Moldova', 'Montenegro', 'Netherlands', 'North Macedonia',
-                          'Norway', 'Poland', 'Portugal', 'Romania', 'Russian Federation', 'Serbia, FR(Serbia/Montenegro)',
-                          'Slovak Republic', 'Slovenia', 'Spain', 'Sweden', 'Switzerland', 'Ukraine', 'United Kingdom']
-        
-        asia_countries = ['Afghanistan', 'Armenia', 'Azerbaijan', 'Bahrain', 'Bangladesh', 'Bhutan', 'Brunei',
-                         'Cambodia', 'China', 'Georgia', 'Hong Kong, China', 'India', 'Indonesia', 'Iran, Islamic Rep.',
-                         'Iraq', 'Israel', 'Japan', 'Jordan', 'Kazakhstan', 'Korea, Rep.', 'Korea, Dem. Rep.',
-                         'Kuwait', 'Kyrgyz Republic', 'Lao PDR', 'Lebanon', 'Macao', 'Malaysia', 'Mongolia',
-                         'Myanmar', 'Nepal', 'Oman', 'Pakistan', 'Philippines', 'Qatar', 'Saudi Arabia',
-                         'Singapore', 'Sri Lanka', 'Syrian Arab Republic', 'Tajikistan', 'Thailand', 'Turkey',
-                         'Turkmenistan', 'United Arab Emirates', 'Uzbekistan', 'Vietnam', 'Yemen']
-        
-        americas_countries = ['Argentina', 'Bolivia', 'Brazil', 'Canada', 'Chile', 'Colombia', 'Costa Rica',
-                            'Cuba', 'Ecuador', 'El Salvador', 'Guatemala', 'Honduras', 'Jamaica', 'Mexico',
-                            'Nicaragua', 'Panama', 'Paraguay', 'Peru', 'United States', 'Uruguay', 'Venezuela']
-        
-        oceania_countries = ['Australia', 'Fiji', 'New Zealand', 'Papua New Guinea']
-        
-        if country in africa_countries:
-            return 'Africa'
-        elif country in europe_countries:
-            return 'Europe & Central Asia'
-        elif country in asia_countries:
-            return 'Asia & Middle East'
-        elif country in americas_countries:
-            return 'Americas'
-        elif country in oceania_countries:
-            return 'Oceania'
-        else:
-            return 'Other/Regional Grouping'
-    
+    # Regional groupings (see assign_region)
     combined_df['Region'] = combined_df['Partner Name'].apply(assign_region)
     
     # Add growth calculations year-over-year
@@ -148,8 +164,8 @@ def load_and_combine_wits_data():
     
     return combined_df
 
-def save_combined_data(df):
-    """Save the combined dataset in multiple formats"""
+def save_combined_data(df, directory='.'):
+    """Save the combined dataset in multiple formats into directory"""
     
     if df is None:
         return
@@ -157,26 +173,24 @@ def save_combined_data(df):
     print(f"\n💾 SAVING COMBINED DATASET...")
     
     # Main combined file
+    directory = Path(directory)
     output_file = "rwanda_export_partners_2018_2022_combined.csv"
-    df.to_csv(output_file, index=False)
+    df.to_csv(directory / output_file, index=False)
     print(f"   ✅ Main dataset: {output_file}")
     
+    # Yearly and regional summaries are materialized aggregates: only years whose rows
+    # were added or revised are recomputed, unchanged years are reused as stored
+    store = MaterializedAggregateStore()
+    store.refresh(['wits_yearly', 'wits_regional'], frames={'wits_yearly': df, 'wits_regional': df})
+    
     # Summary by year
-    yearly_summary = df.groupby('Year').agg({
-        'Export_Value_Millions': ['sum', 'count'],
-        'Partner Name': 'nunique',
-        'No Of exported HS6 digit Products': 'sum'
-    }).round(2)
-    yearly_summary.columns = ['Total_Exports_M', 'Export_Transactions', 'Unique_Partners', 'Total_Products']
-    yearly_summary.to_csv("rwanda_exports_yearly_summary_2018_2022.csv")
+    yearly_summary = store.get('wits_yearly').set_index('Year')
+    yearly_summary.to_csv(directory / "rwanda_exports_yearly_summary_2018_2022.csv")
     print(f"   ✅ Yearly summary: rwanda_exports_yearly_summary_2018_2022.csv")
     
     # Regional analysis
-    regional_summary = df.groupby(['Region', 'Year']).agg({
-        'Export_Value_Millions': 'sum',
-        'Partner Name': 'nunique'
-    }).round(2)
-    regional_summary.to_csv("rwanda_exports_regional_analysis_2018_2022.csv")
+    regional_summary = store.get('wits_regional').set_index(['Region', 'Year'])
+    regional_summary.to_csv(directory / "rwanda_exports_regional_analysis_2018_2022.csv")
     print(f"   ✅ Regional analysis: rwanda_exports_regional_analysis_2018_2022.csv")
     
     # Growth analysis (countries with data in multiple years)
@@ -188,7 +202,7 @@ def save_combined_data(df):
         }).round(2)
         growth_summary.columns = ['Avg_Growth_Rate', 'Growth_Volatility', 'Years_of_Data', 'First_Year_Value', 'Last_Year_Value']
         growth_summary = growth_summary[growth_summary['Years_of_Data'] >= 2]  # Only countries with 2+ years
-        growth_summary.to_csv("rwanda_exports_growth_analysis_2018_2022.csv")
+        growth_summary.to_csv(directory / "rwanda_exports_growth_analysis_2018_2022.csv")
         print(f"   ✅ Growth analysis: rwanda_exports_growth_analysis_2018_2022.csv")
 
 def main():
@@ -0,0 +1,522 @@
+"""
+Rwanda Export Dashboard Figures
+Shared Plotly figure builders plus a cache of built figures keyed on insights version,
+figure name and filter state (in memory, and as JSON next to the insights bundle)
+"""
+
+import inspect
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from downsampling import downsample_frame
+
+FIGURES = {}
+
+
+def figure(name):
+    """Register a figure builder: builder(snapshot, **filters) -> Figure or None"""
+    def register(builder):
+        FIGURES[name] = builder
+        return builder
+    return register
+
+
+# ---------------------------------------------------------------- Top Opportunities
+
+@figure('opportunity_score_bar')
+def opportunity_score_bar(snapshot, top_n=10):
+    opp_df = snapshot.table('export_insights_opportunity_matrix.csv')
+    if opp_df is None:
+        return None
+    fig = px.bar(
+        opp_df.head(top_n),
+        x='opportunity_score',
+        y='commodity',
+        orientation='h',
+        title=f"Top {top_n} Opportunities by Score",
+        labels={'opportunity_score': 'Opportunity Score', 'commodity': 'Commodity'},
+        color='opportunity_score',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+@figure('opportunity_matrix_scatter')
+def opportunity_matrix_scatter(snapshot):
+    opp_df = snapshot.table('export_insights_opportunity_matrix.csv')
+    if opp_df is None:
+        return None
+    fig = px.scatter(
+        opp_df,
+        x='market_share',
+        y='growth_rate',
+        size='opportunity_score',
+        color='risk_level',
+        hover_data=['commodity'],
+        title="Growth Rate vs Market Share (Bubble size = Opportunity Score)",
+        labels={'market_share': 'Market Share (%)', 'growth_rate': 'Growth Rate (%)'},
+        color_discrete_map={'LOW': 'green', 'MEDIUM': 'orange', 'HIGH': 'red'}
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# ---------------------------------------------------------------- Strategic Markets
+
+@figure('tier1_growth_bar')
+def tier1_growth_bar(snapshot):
+    tier1 = snapshot.insights.get('strategic_markets', {}).get('tier1_powerhouses', [])
+    if not tier1:
+        return None
+    return px.bar(
+        pd.DataFrame(tier1),
+        x='growth_rate',
+        y='country',
+        orientation='h',
+        color='value_2022_millions',
+        title="Tier 1 Markets: Growth Rate & Value",
+        labels={'growth_rate': 'Growth Rate (%)', 'country': 'Country', 'value_2022_millions': '2022 Value ($M)'}
+    )
+
+
+@figure('tier3_growth_bar')
+def tier3_growth_bar(snapshot):
+    tier3 = snapshot.insights.get('strategic_markets', {}).get('tier3_untapped', [])
+    if not tier3:
+        return None
+    return px.bar(
+        pd.DataFrame(tier3),
+        x='growth_rate',
+        y='country',
+        orientation='h',
+        title="Tier 3 Markets: Growth Potential",
+        labels={'growth_rate': 'Growth Rate (%)', 'country': 'Country'}
+    )
+
+
+# ---------------------------------------------------------------- Predictive Forecasts
+
+@figure('forecast_current_vs_predicted')
+def forecast_current_vs_predicted(snapshot):
+    top_forecasts = snapshot.insights.get('predictions', {}).get('top_forecasts', [])
+    if not top_forecasts:
+        return None
+    df = pd.DataFrame(top_forecasts)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Current 2022',
+        x=df['country'],
+        y=df['current_2022_millions'],
+        marker_color='lightblue'
+    ))
+    # P10-P90 bootstrap interval as error bars when the forecasts carry one
+    error_y = None
+    if {'predicted_2025_p10_millions', 'predicted_2025_p90_millions'} <= set(df.columns):
+        error_y = dict(
+            type='data',
+            symmetric=False,
+            array=df['predicted_2025_p90_millions'] - df['predicted_2025_millions'],
+            arrayminus=df['predicted_2025_millions'] - df['predicted_2025_p10_millions'],
+            color='gray'
+        )
+    fig.add_trace(go.Bar(
+        name='Predicted 2025',
+        x=df['country'],
+        y=df['predicted_2025_millions'],
+        marker_color='darkblue',
+        error_y=error_y
+    ))
+    fig.update_layout(
+        title="Current (2022) vs Predicted (2025) Export Values" + (" (P10-P90 range)" if error_y else ""),
+        xaxis_title="Country",
+        yaxis_title="Export Value ($ Millions)",
+        barmode='group',
+        height=500
+    )
+    return fig
+
+
+@figure('forecast_world_band')
+def forecast_world_band(snapshot):
+    reconciliation = snapshot.insights.get('predictions', {}).get('reconciliation', {})
+    world = reconciliation.get('world', {})
+    years = [2023, 2024, 2025]
+    if not all(f'reconciled_{year}_p90_millions' in world for year in years):
+        return None
+    x = [2022] + years
+    current = world['current_2022_millions']
+    upper = [current] + [world[f'reconciled_{year}_p90_millions'] for year in years]
+    lower = [current] + [world[f'reconciled_{year}_p10_millions'] for year in years]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=x, y=upper, mode='lines', line=dict(width=0), showlegend=False,
+                             hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=x, y=lower, mode='lines', line=dict(width=0), fill='tonexty',
+                             fillcolor='rgba(30, 64, 175, 0.2)', name='P10-P90'))
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=[current] + [world[f'reconciled_{year}_millions'] for year in years],
+        mode='lines+markers',
+        line=dict(color='darkblue'),
+        name='Reconciled forecast'
+    ))
+    fig.update_layout(
+        title="Total Exports to the World: Reconciled Forecast with P10-P90 Band",
+        xaxis=dict(title="Year", tickmode='array', tickvals=x),
+        yaxis_title="Export Value ($ Millions)",
+        height=400
+    )
+    return fig
+
+
+@figure('forecast_growth_bar')
+def forecast_growth_bar(snapshot):
+    top_forecasts = snapshot.insights.get('predictions', {}).get('top_forecasts', [])
+    if not top_forecasts:
+        return None
+    fig = px.bar(
+        pd.DataFrame(top_forecasts),
+        x='growth_percent',
+        y='country',
+        orientation='h',
+        color='confidence_score',
+        color_continuous_scale='RdYlGn',
+        title="Predicted Growth Rate by Country (2022-2025)",
+        labels={
+            'growth_percent': 'Growth %',
+            'country': 'Country',
+            'confidence_score': 'Confidence'
+        }
+    )
+    fig.update_layout(height=600)
+    return fig
+
+
+@figure('forecast_high_growth_scatter')
+def forecast_high_growth_scatter(snapshot):
+    high_growth = snapshot.insights.get('predictions', {}).get('high_growth_markets', [])
+    if not high_growth:
+        return None
+    fig = px.scatter(
+        pd.DataFrame(high_growth),
+        x='growth_percent',
+        y='predicted_2025_millions',
+        size='confidence_score',
+        color='growth_percent',
+        hover_name='country',
+        color_continuous_scale='Viridis',
+        title="Growth vs Value Matrix (bubble size = confidence)",
+        labels={
+            'growth_percent': 'Predicted Growth %',
+            'predicted_2025_millions': 'Predicted 2025 Value ($M)',
+            'confidence_score': 'Confidence'
+        }
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+@figure('forecast_emerging_scatter')
+def forecast_emerging_scatter(snapshot):
+    emerging = snapshot.insights.get('predictions', {}).get('emerging_opportunities', [])
+    if not emerging:
+        return None
+    df = pd.DataFrame(emerging)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df['current_2022_millions'],
+        y=df['predicted_2025_millions'],
+        mode='markers+text',
+        marker=dict(
+            size=df['growth_percent']/5,
+            color=df['growth_percent'],
+            colorscale='Plasma',
+            showscale=True,
+            colorbar=dict(title="Growth %")
+        ),
+        text=df['country'],
+        textposition="top center",
+        hovertemplate='<b>%{text}</b><br>Current: $%{x:.1f}M<br>Predicted: $%{y:.1f}M<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Emerging Markets: Current vs Predicted Values",
+        xaxis_title="Current 2022 ($M)",
+        yaxis_title="Predicted 2025 ($M)",
+        height=500
+    )
+    return fig
+
+
+@figure('forecast_tier_allocation_pie')
+def forecast_tier_allocation_pie(snapshot):
+    tiers = snapshot.insights.get('predictions', {}).get('tier_classifications', {})
+    values = [
+        tiers.get('tier_a_priority', {}).get('total_value_2025', 0),
+        tiers.get('tier_b_growth', {}).get('total_value_2025', 0),
+        tiers.get('tier_c_emerging', {}).get('total_value_2025', 0)
+    ]
+    if sum(values) <= 0:
+        return None
+    fig = go.Figure(data=[go.Pie(
+        labels=['Tier A - Priority', 'Tier B - Growth', 'Tier C - Emerging'],
+        values=values,
+        marker_colors=['#DC2626', '#F59E0B', '#10B981'],
+        hole=0.4
+    )])
+    fig.update_layout(
+        title="Recommended Resource Allocation by Tier (2025 Value)",
+        height=400
+    )
+    return fig
+
+
+# ---------------------------------------------------------------- Policy / Youth & SME
+
+@figure('policy_priority_pie')
+def policy_priority_pie(snapshot):
+    policies = snapshot.insights.get('policy_recommendations', [])
+    if not policies:
+        return None
+    priority_counts = pd.DataFrame(policies)['priority'].value_counts()
+    return px.pie(
+        values=priority_counts.values,
+        names=priority_counts.index,
+        title="Policy Recommendations by Priority",
+        color_discrete_map={'CRITICAL': '#B91C1C', 'HIGH': '#DC2626', 'MEDIUM': '#F59E0B', 'LOW': '#10B981'}
+    )
+
+
+@figure('youth_sme_investment_scatter')
+def youth_sme_investment_scatter(snapshot):
+    opportunities = snapshot.insights.get('youth_sme_opportunities', [])
+    if not opportunities:
+        return None
+    df = pd.DataFrame(opportunities)
+
+    # Create investment level mapping
+    investment_map = {
+        'Very Low ($2K-$10K)': 1,
+        'Low ($5K-$30K)': 2,
+        'Low-Medium ($5K-$50K)': 3,
+        'Medium ($20K-$100K)': 4,
+        'Medium-High ($50K-$200K)': 5
+    }
+    df['investment_score'] = df['investment_required'].map(investment_map)
+
+    return px.scatter(
+        df,
+        x='investment_score',
+        y='sector',
+        size=[5]*len(df),
+        color='potential_revenue',
+        title="Youth & SME Opportunities: Investment Level by Sector",
+        labels={'investment_score': 'Investment Level', 'sector': 'Sector'},
+        hover_data=['opportunity']
+    )
+
+
+# ---------------------------------------------------------------- Detailed Analytics
+
+@figure('commodity_value_pie')
+def commodity_value_pie(snapshot):
+    opportunities_df = snapshot.table('export_insights_opportunities.csv')
+    if opportunities_df is None:
+        return None
+    return px.pie(
+        opportunities_df,
+        values='current_value_millions',
+        names='commodity',
+        title="Export Value Distribution (Top Commodities)"
+    )
+
+
+@figure('commodity_growth_scatter')
+def commodity_growth_scatter(snapshot):
+    opportunities_df = snapshot.table('export_insights_opportunities.csv')
+    if opportunities_df is None:
+        return None
+    return px.scatter(
+        opportunities_df,
+        x='current_value_millions',
+        y='yoy_growth_percent',
+        size='market_share_percent',
+        hover_data=['commodity'],
+        title="YoY Growth vs Current Export Value",
+        labels={'current_value_millions': 'Current Value ($M)', 'yoy_growth_percent': 'YoY Growth (%)'}
+    )
+
+
+def explorer_bar(facet, title, selected=(), horizontal=False, top_n=None):
+    """
+    Bar chart of one explorer facet (label/value columns); selected labels are highlighted
+    and every bar carries its label as customdata for selection events
+    """
+    if top_n:
+        facet = facet[facet['value'] > 0].nlargest(top_n, 'value').iloc[::-1]
+    colors = ['#1E3A8A' if not selected or label in selected else '#CBD5E1' for label in facet['label']]
+    bar = go.Bar(
+        x=facet['value'] if horizontal else facet['label'],
+        y=facet['label'] if horizontal else facet['value'],
+        orientation='h' if horizontal else 'v',
+        customdata=facet[['label']].to_numpy(),
+        marker_color=colors,
+        hovertemplate='<b>%{customdata[0]}</b><br>$%{' + ('x' if horizontal else 'y') + ':,.1f}M<extra></extra>'
+    )
+    fig = go.Figure(bar)
+    fig.update_layout(
+        title=title,
+        height=max(350, 22 * len(facet)) if horizontal else 350,
+        margin=dict(l=10, r=10, t=50, b=10),
+        xaxis_type='category' if not horizontal else None,
+        yaxis_type='category' if horizontal else None,
+        clickmode='event+select',
+        dragmode='select'
+    )
+    return fig
+
+
+def trend_lines(frame, x, y, group, title, x_range=None, total_points=4000, method='lttb'):
+    """
+    Line per group of a long-format frame, downsampled server-side to a shared point budget;
+    x_range restricts (and so re-details) the series to a zoom window
+    """
+    series = downsample_frame(frame, x, y, group, total_points=total_points, method=method, x_range=x_range)
+    fig = go.Figure()
+    for name, (xs, ys) in series.items():
+        fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines+markers' if len(xs) <= 60 else 'lines', name=str(name)))
+
+    shown = sum(len(xs) for xs, _ in series.values())
+    total = int(frame[y].notna().sum() if x_range is None else (frame[x].between(*x_range) & frame[y].notna()).sum())
+    fig.update_layout(
+        title=title if shown >= total else f"{title} ({shown:,} of {total:,} points shown)",
+        yaxis_title="Export Value ($ Millions)",
+        height=450,
+        hovermode='x unified'
+    )
+    return fig
+
+
+def _explicit_filters(name, filters):
+    """
+    Filters that differ from the builder's defaults
+
+    show_figure('x', top_n=10) and show_figure('x') then share the precomputed default figure
+    instead of looking for a file export never writes.
+    """
+    parameters = inspect.signature(FIGURES[name]).parameters
+    return {k: v for k, v in filters.items()
+            if k not in parameters or parameters[k].default is inspect.Parameter.empty
+            or parameters[k].default != v}
+
+
+def _filter_key(filters):
+    """Stable, file-name safe key for a filter state"""
+    return '__'.join(f"{k}-{filters[k]}" for k in sorted(filters)).replace('/', '_').replace(' ', '_')
+
+
+class FigureCache:
+    """Built figures keyed on (insights version, figure name, filter state)"""
+
+    def __init__(self, directory='data/insights/figures', max_entries=256):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, version, name, filters):
+        key = _filter_key(filters)
+        return self.directory / version / (f"{name}__{key}.json" if key else f"{name}.json")
+
+    def get(self, name, snapshot, **filters):
+        """
+        Figure for the snapshot version: from memory, then from the JSON written at
+        export time, and only then built (and stored) from the data
+        """
+        filters = _explicit_filters(name, filters)
+        key = (snapshot.version, name, _filter_key(filters))
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                return self._figures[key]
+
+        path = self.path(snapshot.version, name, filters)
+        try:
+            with open(path, 'r') as f:
+                spec = f.read()
+            fig = None if spec == 'null' else pio.from_json(spec)
+        except FileNotFoundError:
+            fig = FIGURES[name](snapshot, **filters)
+            self._write(path, fig)
+
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def build_all(self, snapshot, keep_versions=2):
+        """Build and store every registered figure (default filters) for a snapshot"""
+        for name, builder in FIGURES.items():
+            self._write(self.path(snapshot.version, name, {}), builder(snapshot))
+        self._prune(keep_versions, current=snapshot.version)
+        return len(FIGURES)
+
+    def warm(self, snapshot):
+        """Load or build every registered figure (default filters) into memory"""
+        for name in FIGURES:
+            self.get(name, snapshot)
+        return len(FIGURES)
+
+    def _write(self, path, fig):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write('null' if fig is None else pio.to_json(fig, validate=False))
+            tmp_path.replace(path)
+        except OSError:
+            # Read-only deployments still serve figures from memory
+            pass
+
+    def _prune(self, keep_versions, current):
+        versions = sorted((p for p in self.directory.iterdir() if p.is_dir() and p.name != current),
+                          key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in versions[max(keep_versions - 1, 0):]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_figure_cache(directory='data/insights/figures'):
+    """Process-wide FigureCache for a figures directory"""
+    key = str(Path(directory).resolve())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = FigureCache(directory)
+        return _caches[key]
+
+
+def precompute_figures(directory='data/insights'):
+    """Build every figure for the bundle currently published in the directory"""
+    from insights_snapshot import SnapshotStore
+
+    snapshot = SnapshotStore(directory).current()
+    count = FigureCache(Path(directory) / 'figures').build_all(snapshot)
+    print(f"✅ {count} dashboard figures precomputed for insights version {snapshot.version}")
+    return snapshot.version
+
+
+if __name__ == "__main__":
+    precompute_figures()
@@ -0,0 +1,129 @@
+"""
+Rwanda Export Dashboard Launcher
+Starts the Streamlit dashboard with the insights snapshot and figure cache warmed at server
+start, and profiles the cold-start import path
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DASHBOARD_PATH = REPO_ROOT / 'dashboard_app.py'
+
+# Modules on the dashboard's startup path, cheapest first
+STARTUP_MODULES = ['streamlit', 'pandas', 'insights_snapshot', 'dashboard_figures']
+
+IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+class StartupTimer:
+    """Wall-clock timings of named startup phases"""
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        print("⏱️  STARTUP PHASES")
+        for name, seconds in self.phases:
+            print(f"   • {name:<32} {seconds * 1000:8.1f} ms")
+        print(f"   • {'total':<32} {sum(s for _, s in self.phases) * 1000:8.1f} ms")
+
+
+def profile_imports(modules=None, top_n=15):
+    """
+    Import-time profile of the startup modules in a fresh interpreter (python -X importtime)
+
+    Returns [(module, self_ms, cumulative_ms)] for the top_n top-level imports by cumulative time.
+    """
+    modules = modules or STARTUP_MODULES
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(REPO_ROOT / 'scripts'), os.environ.get('PYTHONPATH', '')]))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '; '.join(f'import {m}' for m in modules)],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=env
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        # Only direct imports (no indentation), nested ones are included in their parent
+        if match and match.group(3) == ' ':
+            timings.append((match.group(4), int(match.group(1)) / 1000, int(match.group(2)) / 1000))
+    return sorted(timings, key=lambda t: t[2], reverse=True)[:top_n]
+
+
+def warm_caches(insights_dir='data/insights', timer=None):
+    """Load the insights snapshot and every figure into the process-wide caches"""
+    timer = timer or StartupTimer()
+
+    with timer.phase('import insights_snapshot'):
+        from insights_snapshot import get_store
+    with timer.phase('load insights snapshot'):
+        store = get_store(insights_dir)
+        snapshot = store.current()
+        store.start_watcher()
+    with timer.phase('import dashboard_figures (plotly)'):
+        from dashboard_figures import get_figure_cache
+    with timer.phase('load/build figures'):
+        count = get_figure_cache(os.path.join(insights_dir, 'figures')).warm(snapshot)
+
+    print(f"✅ Caches warm: insights version {snapshot.version}, {len(snapshot.tables)} tables, {count} figures")
+    from arrow_store import get_arrow_store
+    store = get_arrow_store()
+    if store is not None:
+        report = store.memory_report()
+        memory = report['process_mb']
+        print(f"   • Memory: {memory['rss']:.0f} MB resident, {report['mapped_mb']:.1f} MB in "
+              f"{len(report['tables'])} memory-mapped tables")
+    return snapshot
+
+
+def main():
+    """Warm caches in-process, then serve the dashboard from the same process"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Start the export dashboard with warm caches')
+    parser.add_argument('--port', type=int, default=None, help='Server port (Streamlit default otherwise)')
+    parser.add_argument('--no-warm', action='store_true', help='Skip cache warm-up')
+    parser.add_argument('--profile-imports', action='store_true',
+                        help='Print the import-time profile of the startup path and exit')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+    if args.profile_imports:
+        print("🔬 IMPORT-TIME PROFILE (fresh interpreter)")
+        print("=" * 60)
+        for module, self_ms, cumulative_ms in profile_imports():
+            print(f"   • {module:<40} {cumulative_ms:8.1f} ms cumulative ({self_ms:.1f} ms self)")
+        return
+
+    print("🚀 STARTING RWANDA EXPORT DASHBOARD")
+    print("=" * 60)
+    timer = StartupTimer()
+    with timer.phase('import streamlit'):
+        from streamlit.web import bootstrap
+    if not args.no_warm:
+        warm_caches(timer=timer)
+    timer.report()
+
+    flag_options = {'server.port': args.port} if args.port else {}
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(str(DASHBOARD_PATH), False, [], flag_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Rwanda Export Dashboard Load Test
+Simulates concurrent dashboard sessions with a headless websocket client against a real server
+(pages from the sidebar menu, priority and sector filters) and records per-page latency
+percentiles and server RSS
+"""
+
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LAUNCHER_PATH = REPO_ROOT / 'scripts' / 'dashboard_launcher.py'
+PERCENTILES = [50, 90, 95, 99]
+
+NAVIGATION_LABEL = "Select View"
+
+# Widget interactions per page: (widget label, options to pick from; None = the widget's own)
+PAGE_FILTERS = {
+    "📜 Policy Recommendations": ("Filter by Priority", ["HIGH", "MEDIUM", "LOW", "All"]),
+    "👥 Youth & SME Opportunities": ("Filter by Sector", None)
+}
+
+
+def process_rss_mb(pid):
+    """Resident set size of a process in MB (None where /proc is unavailable)"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return None
+
+
+class RssSampler:
+    """Background sampler of a process's RSS"""
+
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def _sample(self):
+        rss = process_rss_mb(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class DashboardServer:
+    """The dashboard served by the launcher in a child process (caches warmed as in production)"""
+
+    def __init__(self, port=8599, warm=True, startup_timeout=120):
+        self.port = port
+        self.warm = warm
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    @property
+    def url(self):
+        return f"ws://localhost:{self.port}/_stcore/stream"
+
+    def __enter__(self):
+        command = [sys.executable, str(LAUNCHER_PATH), '--port', str(self.port)]
+        if not self.warm:
+            command.append('--no-warm')
+        env = dict(os.environ, STREAMLIT_SERVER_HEADLESS='true')
+        self.process = subprocess.Popen(command, cwd=REPO_ROOT, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Dashboard server exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://localhost:{self.port}/_stcore/health", timeout=1):
+                    return self
+            except OSError:
+                time.sleep(0.5)
+        self.__exit__()
+        raise TimeoutError(f"Dashboard server did not start within {self.startup_timeout}s")
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class HeadlessSession:
+    """One browser session speaking the Streamlit websocket protocol"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.widget_ids = {}
+        self.widget_options = {}
+        self.widget_states = {}
+
+    async def rerun(self, timeout):
+        """
+        Request a script run with the current widget values and wait until it finishes
+
+        Returns (seconds, exception messages rendered by the script).
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+
+        start = time.perf_counter()
+        await self.websocket.send(message.SerializeToString())
+        exceptions = []
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await asyncio.wait_for(self.websocket.recv(), timeout))
+            kind = reply.WhichOneof('type')
+            if kind == 'delta' and reply.delta.WhichOneof('type') == 'new_element':
+                element = reply.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type in ('radio', 'selectbox'):
+                    widget = getattr(element, element_type)
+                    self.widget_ids[widget.label] = widget.id
+                    self.widget_options[widget.label] = list(widget.options)
+                elif element_type == 'exception':
+                    exceptions.append(element.exception.message)
+            elif kind == 'script_finished':
+                return time.perf_counter() - start, exceptions
+
+    def set_value(self, label, value):
+        """Set a radio/selectbox by label (sent with every following rerun)"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState()
+        state.id = self.widget_ids[label]
+        state.string_value = value
+        self.widget_states[label] = state
+
+
+async def run_session(url, session_id, iterations, timeout, seed, records, errors):
+    """One simulated user: open the app, then visit every page and change its filters"""
+    import websockets
+
+    rng = random.Random(seed + session_id)
+
+    async def timed(session, page, action):
+        try:
+            seconds, exceptions = await session.rerun(timeout)
+        except (asyncio.TimeoutError, websockets.ConnectionClosed) as e:
+            seconds, exceptions = timeout, [repr(e)]
+        for message in exceptions:
+            errors.append({'session': session_id, 'page': page, 'action': action, 'error': message})
+        records.append({'session': session_id, 'page': page, 'action': action,
+                        'ms': seconds * 1000, 'failed': bool(exceptions)})
+
+    async with websockets.connect(url, subprotocols=['streamlit'], max_size=None) as websocket:
+        session = HeadlessSession(websocket)
+        await timed(session, '(initial load)', 'open')
+        pages = session.widget_options.get(NAVIGATION_LABEL, [])
+
+        for _ in range(iterations):
+            for page in rng.sample(pages, len(pages)):
+                session.set_value(NAVIGATION_LABEL, page)
+                await timed(session, page, 'navigate')
+                if page in PAGE_FILTERS:
+                    label, options = PAGE_FILTERS[page]
+                    if label not in session.widget_ids:
+                        continue
+                    session.set_value(label, rng.choice(options or session.widget_options[label]))
+                    await timed(session, page, 'filter')
+
+
+def summarize(records):
+    """Latency percentiles (ms) per page and action"""
+    groups = {}
+    for record in records:
+        groups.setdefault(f"{record['page']} [{record['action']}]", []).append(record)
+
+    summary = {}
+    for key, items in sorted(groups.items()):
+        ms = np.array([r['ms'] for r in items])
+        summary[key] = {
+            'count': len(items),
+            'failed': sum(r['failed'] for r in items),
+            'mean_ms': round(float(ms.mean()), 1),
+            **{f'p{q}_ms': round(float(v), 1) for q, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))},
+            'max_ms': round(float(ms.max()), 1)
+        }
+    return summary
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=REPO_ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_load_test(sessions=8, iterations=2, timeout=60, seed=42, port=8599, warm=True):
+    """
+    Start the dashboard server and run `sessions` concurrent simulated users for `iterations`
+    passes over all pages
+
+    Returns the results dictionary (configuration, environment, latency summary, server RSS).
+    """
+    import streamlit
+
+    records, errors = [], []
+
+    async def run_all(url):
+        await asyncio.gather(*(run_session(url, i, iterations, timeout, seed, records, errors)
+                               for i in range(sessions)))
+
+    with DashboardServer(port, warm) as server:
+        rss_start = process_rss_mb(server.process.pid)
+        start = time.perf_counter()
+        with RssSampler(server.process.pid) as rss:
+            asyncio.run(run_all(server.url))
+        duration = time.perf_counter() - start
+
+    all_ms = np.array([r['ms'] for r in records]) if records else np.zeros(1)
+    rss_samples = rss.samples or [None]
+    return {
+        'run_at': datetime.now().isoformat(),
+        'config': {'sessions': sessions, 'iterations': iterations, 'timeout_s': timeout, 'seed': seed,
+                   'warm_start': warm},
+        'environment': {
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'streamlit': streamlit.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'totals': {
+            'interactions': len(records),
+            'failed': sum(r['failed'] for r in records),
+            'duration_s': round(duration, 2),
+            'throughput_per_s': round(len(records) / duration, 2) if duration else None,
+            **{f'p{q}_ms': round(float(v), 1) for q, v in zip(PERCENTILES, np.percentile(all_ms, PERCENTILES))}
+        },
+        'server_rss_mb': {
+            'start': rss_start and round(rss_start, 1),
+            'peak': rss.samples and round(max(rss.samples), 1),
+            'end': rss_samples[-1] and round(rss_samples[-1], 1)
+        },
+        'pages': summarize(records),
+        'errors': errors[:50]
+    }
+
+
+def compare(current, baseline):
+    """Print p50/p95 changes per page against a baseline results file"""
+    print(f"\n📊 COMPARISON WITH BASELINE ({baseline['run_at'][:19]}, commit {baseline['environment'].get('git_commit')})")
+    for key, stats in current['pages'].items():
+        base = baseline['pages'].get(key)
+        if base is None:
+            print(f"   • {key:<55} new")
+            continue
+        deltas = []
+        for metric in ('p50_ms', 'p95_ms'):
+            change = (stats[metric] - base[metric]) / base[metric] * 100 if base[metric] else 0
+            deltas.append(f"{metric[:3]} {base[metric]:7.0f} -> {stats[metric]:7.0f} ms ({change:+5.1f}%)")
+        print(f"   • {key:<55} " + ' | '.join(deltas))
+    before, after = baseline['server_rss_mb']['peak'], current['server_rss_mb']['peak']
+    if before and after:
+        print(f"   • {'peak server RSS':<55} {before:.0f} -> {after:.0f} MB")
+
+
+def main():
+    """Run the load test, write a results JSON and optionally compare it with a baseline"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Concurrent-session load test for the dashboard')
+    parser.add_argument('--sessions', type=int, default=8, help='Concurrent simulated users')
+    parser.add_argument('--iterations', type=int, default=2, help='Passes over all pages per user')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-interaction timeout (seconds)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for page order and filter choices')
+    parser.add_argument('--port', type=int, default=8599, help='Port for the test server')
+    parser.add_argument('--no-warm', action='store_true', help='Start the server without cache warm-up')
+    parser.add_argument('--output', default=None, help='Results JSON (default: data/loadtest/loadtest_<time>.json)')
+    parser.add_argument('--baseline', default=None, help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    print("🏋️  DASHBOARD LOAD TEST")
+    print("=" * 60)
+    print(f"   • {args.sessions} concurrent sessions x {args.iterations} passes")
+
+    results = run_load_test(args.sessions, args.iterations, args.timeout, args.seed, args.port, not args.no_warm)
+
+    totals = results['totals']
+    rss = results['server_rss_mb']
+    print(f"   • {totals['interactions']} interactions in {totals['duration_s']}s "
+          f"({totals['throughput_per_s']}/s), {totals['failed']} failed")
+    print(f"   • Latency p50 {totals['p50_ms']:.0f} ms | p95 {totals['p95_ms']:.0f} ms | p99 {totals['p99_ms']:.0f} ms")
+    if rss['peak']:
+        print(f"   • Server RSS start {rss['start']:.0f} MB | peak {rss['peak']:.0f} MB | end {rss['end']:.0f} MB")
+    print()
+    for key, stats in results['pages'].items():
+        print(f"   {key:<55} n={stats['count']:<4} p50 {stats['p50_ms']:7.0f} ms | p95 {stats['p95_ms']:7.0f} ms")
+
+    output = Path(args.output or f"data/loadtest/loadtest_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+Rwanda Export Data Validation
+Declarative, vectorized checks of the input tables (columns, types, ranges, period coverage, share
+totals and WORLD reconciliation) that run before the expensive stages and fail with a structured report
+"""
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from trade_tables import QUARTERLY_TABLES, WITS_PARTNERS_PATH, next_period, period_columns
+
+GROWTH_ANALYSIS_PATH = 'data/wits/rwanda_exports_growth_analysis_2018_2022.csv'
+
+# Flow of each commodity/partner table in the continents table (its WORLD row is the control total)
+WORLD_FLOWS = {'exports_commodity': 'Exports', 'reexports_commodity': 'Re-Exports', 'export_country': 'Exports'}
+
+
+class DataValidationError(ValueError):
+    """Raised when validation finds errors; carries the full report"""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(report.summary())
+
+    def __reduce__(self):
+        # Rebuilt from the report when sent back from a worker process
+        return type(self), (self.report,)
+
+
+class ValidationReport:
+    """Issues found by the checks, each tagged with table, check name and severity"""
+
+    def __init__(self):
+        self.issues = []
+        self.checks = 0
+        self.seconds = 0.0
+
+    def add(self, table, check, message, severity='error', rows=None):
+        self.issues.append({'table': table, 'check': check, 'severity': severity,
+                            'message': message, 'rows': rows})
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue['severity'] == 'error']
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue['severity'] == 'warning']
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {'ok': self.ok, 'checks': self.checks, 'errors': len(self.errors),
+                'warnings': len(self.warnings), 'issues': self.issues}
+
+    def summary(self):
+        lines = [f"{self.checks} checks: {len(self.errors)} errors, {len(self.warnings)} warnings"]
+        for issue in self.issues:
+            lines.append(f"[{issue['severity']}] {issue['table']} / {issue['check']}: {issue['message']}")
+        return '\n'.join(lines)
+
+    def raise_for_errors(self):
+        if not self.ok:
+            raise DataValidationError(self)
+        return self
+
+
+class TableSchema:
+    """Expected shape of one table"""
+
+    def __init__(self, name, columns=(), numeric=(), ranges=None, unique=None, periods=False):
+        """
+        Parameters:
+        -----------
+        columns : list
+            Required columns
+        numeric : list
+            Columns whose non-empty cells must parse as numbers (thousands separators allowed)
+        ranges : dict, optional
+            {column: (low, high)} inclusive bounds, None for an open side
+        unique : list, optional
+            Columns that identify a row
+        periods : bool
+            The table is wide: it needs YYYYQn columns forming consecutive quarters, all numeric
+        """
+        self.name = name
+        self.columns = list(columns)
+        self.numeric = list(numeric)
+        self.ranges = ranges or {}
+        self.unique = list(unique or [])
+        self.periods = periods
+
+    def validate(self, frame, report):
+        """Add this table's issues to the report; returns False when required columns are missing"""
+        report.checks += 1
+        missing = [col for col in self.columns if col not in frame.columns]
+        if missing:
+            report.add(self.name, 'columns', f"missing columns {missing}")
+            return False
+
+        numeric = [col for col in self.numeric if col in frame.columns]
+        if self.periods:
+            periods = period_columns(frame)
+            report.checks += 1
+            if not periods:
+                report.add(self.name, 'periods', "no YYYYQn period columns")
+            else:
+                expected = [periods[0]]
+                while len(expected) < len(periods):
+                    expected.append(next_period(expected[-1]))
+                gaps = sorted(set(expected) - set(periods))
+                if gaps:
+                    report.add(self.name, 'periods', f"missing quarters {gaps}")
+            numeric += periods
+
+        if numeric:
+            report.checks += 1
+            values, present = parse_block(frame, numeric)
+            bad = present & np.isnan(values)
+            if bad.any():
+                columns = [col for col, flag in zip(numeric, bad.any(axis=0)) if flag]
+                report.add(self.name, 'numeric', f"non-numeric values in {columns}", rows=int(bad.any(axis=1).sum()))
+
+        for column, (low, high) in self.ranges.items():
+            if column not in frame.columns:
+                continue
+            report.checks += 1
+            values = parse_block(frame, [column])[0][:, 0]
+            outside = np.zeros(len(values), dtype=bool)
+            if low is not None:
+                outside |= values < low
+            if high is not None:
+                outside |= values > high
+            if outside.any():
+                report.add(self.name, 'range', f"{column} outside [{low}, {high}]", rows=int(outside.sum()))
+
+        if self.unique:
+            report.checks += 1
+            duplicated = frame.duplicated(self.unique, keep=False)
+            if duplicated.any():
+                report.add(self.name, 'unique', f"duplicated {self.unique} rows", rows=int(duplicated.sum()))
+        return True
+
+
+QUARTERLY_SCHEMAS = {
+    name: TableSchema(name, columns=spec['label_columns'], periods=True,
+                      numeric=['Share_Percent_Q3', 'Change_Q3_Q2_Percent', 'Change_Q3_Q3_Percent'],
+                      ranges={'Share_Percent_Q3': (0, 100)}, unique=spec['label_columns'])
+    for name, spec in QUARTERLY_TABLES.items()
+}
+
+WITS_SCHEMA = TableSchema(
+    'wits_partners',
+    columns=['Partner Name', 'Year', 'Export (US$ Thousand)'],
+    numeric=['Year', 'Export (US$ Thousand)', 'Export Partner Share (%)'],
+    ranges={'Year': (1990, 2100), 'Export (US$ Thousand)': (0, None), 'Export Partner Share (%)': (0, 100)},
+    unique=['Partner Name', 'Year']
+)
+
+# A single yearly WITS-Partner_<year> export, before it is combined
+WITS_FILE_SCHEMA = TableSchema(
+    'wits_partner_file',
+    columns=['Partner Name', 'Export (US$ Thousand)', 'Export Partner Share (%)',
+             'Export Share in Total Products (%)', 'No Of exported HS6 digit Products'],
+    numeric=['Export (US$ Thousand)', 'Export Partner Share (%)'],
+    ranges={'Export (US$ Thousand)': (0, None)},
+    unique=['Partner Name']
+)
+
+GROWTH_SCHEMA = TableSchema(
+    'growth_analysis',
+    columns=['Partner Name', 'Avg_Growth_Rate', 'Growth_Volatility', 'Years_of_Data',
+             'First_Year_Value', 'Last_Year_Value'],
+    numeric=['Avg_Growth_Rate', 'Growth_Volatility', 'Years_of_Data', 'Last_Year_Value'],
+    ranges={'Years_of_Data': (0, None), 'Growth_Volatility': (0, None)},
+    unique=['Partner Name']
+)
+
+OPPORTUNITY_SCHEMA = TableSchema(
+    'opportunity_analysis',
+    columns=['SITC_Code', 'Commodity_Description', 'Opportunity_Score', 'YoY_Growth', 'Volatility', 'Market_Share'],
+    numeric=['Opportunity_Score', 'YoY_Growth', 'Volatility', 'Market_Share'],
+    ranges={'Opportunity_Score': (0, 100)}
+)
+
+# Cleaned commodity table handed to the insights extractor (numeric periods, description labels)
+COMMODITY_SCHEMA = TableSchema(
+    'commodities',
+    columns=['Commodity_Description'],
+    periods=True
+)
+
+
+def parse_block(frame, columns):
+    """
+    Parse a block of cells to float in one pass over the flattened cells
+
+    Returns (values, present): values is NaN where a cell is empty or not a number, present
+    marks the non-empty cells. Numeric columns are taken as they are.
+    """
+    block = frame[columns]
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+        values = block.to_numpy(dtype=float)
+        return values, ~np.isnan(values)
+    cells = block.to_numpy(dtype=object).ravel()
+    text = pd.Series(cells, dtype=object).astype(str).str.replace(',', '', regex=False).str.strip()
+    present = pd.notna(cells) & (text != '').to_numpy() & (text.str.lower() != 'nan').to_numpy()
+    values = pd.to_numeric(text, errors='coerce').to_numpy(dtype=float)
+    return values.reshape(block.shape), present.reshape(block.shape)
+
+
+def validate_frame(frame, schema):
+    """Report for a single frame against a schema"""
+    start = time.perf_counter()
+    report = ValidationReport()
+    schema.validate(frame, report)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def check_period_consistency(tables, report):
+    """Every quarterly table must end at the same latest quarter"""
+    report.checks += 1
+    latest = {name: period_columns(df)[-1] for name, df in tables.items() if period_columns(df)}
+    if len(set(latest.values())) > 1:
+        newest = max(latest.values())
+        behind = sorted(name for name, period in latest.items() if period != newest)
+        report.add('quarterly', 'latest_period', f"tables behind {newest}: {behind}")
+
+
+def check_share_totals(tables, report, tolerance=0.5):
+    """Commodity shares must sum to ~100%; partner shares (top partners only) must not exceed it"""
+    for name in ('exports_commodity', 'reexports_commodity', 'export_country'):
+        df = tables.get(name)
+        if df is None or 'Share_Percent_Q3' not in df:
+            continue
+        report.checks += 1
+        total = df['Share_Percent_Q3'].sum()
+        if name == 'export_country':
+            if total > 100 + tolerance:
+                report.add(name, 'share_total', f"Share_Percent_Q3 sums to {total:.2f}% (> 100%)")
+        elif abs(total - 100) > tolerance:
+            report.add(name, 'share_total', f"Share_Percent_Q3 sums to {total:.2f}%, expected 100 ± {tolerance}")
+
+
+def check_world_reconciliation(tables, report, tolerance=0.5):
+    """
+    Control totals against the WORLD rows of the continents table, per period (US$ M):
+    continents add up to WORLD, commodity tables add up to their flow's WORLD, partner table
+    stays within it, and the total trade table matches WORLD with its Total Trade and
+    Trade Balance rows consistent with the flows
+    """
+    continents = tables.get('continents')
+    if continents is None:
+        return
+    periods = period_columns(continents)
+    is_world = continents['Continent'].astype(str).str.strip() == 'WORLD'
+    world = continents[is_world].set_index('Flow_Type')[periods].astype(float)
+
+    def compare(table, check, actual, expected, upper_only=False, severity='error'):
+        report.checks += 1
+        diff = actual.reindex(periods).to_numpy(dtype=float) - expected.reindex(periods).to_numpy(dtype=float)
+        bad = (diff > tolerance) if upper_only else (np.abs(diff) > tolerance)
+        bad &= ~np.isnan(diff)
+        if bad.any():
+            worst = int(np.nanargmax(np.abs(np.where(bad, diff, 0))))
+            report.add(table, check, f"off by {diff[worst]:+.2f} in {periods[worst]} "
+                                     f"({int(bad.sum())} of {len(periods)} quarters beyond ±{tolerance})",
+                       severity, rows=int(bad.sum()))
+
+    parts = continents[~is_world].groupby('Flow_Type')[periods].sum()
+    for flow in world.index.intersection(parts.index):
+        compare('continents', f"{flow} continents vs WORLD", parts.loc[flow], world.loc[flow])
+
+    for name, flow in WORLD_FLOWS.items():
+        df = tables.get(name)
+        if df is None or flow not in world.index:
+            continue
+        compare(name, f"sum vs {flow} WORLD", df.reindex(columns=periods).sum(), world.loc[flow],
+                upper_only=(name == 'export_country'))
+
+    total = tables.get('total_trade')
+    if total is not None and {'Trade_Type', 'Partner'} <= set(total.columns):
+        total = total.assign(Partner=total['Partner'].astype(str).str.strip(),
+                             Trade_Type=total['Trade_Type'].astype(str).str.strip())
+        rows = total[total['Partner'] == 'WORLD'].set_index('Trade_Type')
+        rows = rows.reindex(columns=periods).astype(float)
+        for flow in world.index.intersection(rows.index):
+            compare('total_trade', f"{flow} vs continents WORLD", rows.loc[flow], world.loc[flow])
+
+        # The identities hold for every partner (WORLD and the EAC rows alike); a broken WORLD
+        # row fails validation, a broken partner row (e.g. a Total Trade row copied from another
+        # flow in the annex) is reported as a warning
+        flows = ['Exports', 'Imports', 'Re-Exports']
+        for partner, partner_rows in total.groupby('Partner', sort=False):
+            rows = partner_rows.set_index('Trade_Type').reindex(columns=periods).astype(float)
+            if not set(flows) <= set(rows.index):
+                continue
+            suffix, severity = ('', 'error') if partner == 'WORLD' else (f" ({partner})", 'warning')
+            if 'Total Trade' in rows.index:
+                compare('total_trade', f"Total Trade = exports + imports + re-exports{suffix}",
+                        rows.loc['Total Trade'], rows.loc[flows].sum(), severity=severity)
+            if 'Trade Balance' in rows.index:
+                compare('total_trade', f"Trade Balance = exports + re-exports - imports{suffix}",
+                        rows.loc['Trade Balance'], rows.loc['Exports'] + rows.loc['Re-Exports'] - rows.loc['Imports'],
+                        severity=severity)
+
+
+def check_hierarchy(tables, wits_df, report, tolerance=0.5):
+    """
+    Partner hierarchy checks (warnings): countries adding up to more than a published bloc or
+    continent, and WITS partner rows that are totals of other rows (summing them double counts)
+    """
+    # Imported here: trade_hierarchy reads assign_region from the WITS combiner, which validates with this module
+    from trade_hierarchy import find_aggregate_rows, nisr_consistency, wits_wide
+
+    if {'export_country', 'regional_blocks', 'continents'} <= set(tables):
+        report.checks += 1
+        consistency = nisr_consistency(tables, tolerance=tolerance)
+        exceeded = consistency[consistency['Status'] == 'exceeds published']
+        for (check, group), rows in exceeded.groupby(['Check', 'Group'], sort=False):
+            worst = rows.loc[rows['Difference'].idxmax()]
+            report.add('export_country', 'hierarchy', f"{check}: {group} members exceed the published total by "
+                       f"{worst['Difference']:.2f} in {worst['Period']}", 'warning', rows=len(rows))
+
+    if wits_df is not None and {'Partner Name', 'Year', 'Export (US$ Thousand)'} <= set(wits_df.columns):
+        report.checks += 1
+        aggregates = find_aggregate_rows(wits_wide(wits_df), 'Partner Name')
+        if not aggregates.empty:
+            names = ', '.join(aggregates['Partner Name'])
+            report.add('wits_partners', 'double_counting',
+                       f"{len(aggregates)} rows aggregate other partners ({names}): "
+                       f"{aggregates.attrs['double_counted_percent']}% of the summed exports", 'warning',
+                       rows=len(aggregates))
+
+
+def strip_known_quirks(name, frame, report):
+    """
+    Drop the raw-file quirks clean_quarterly_table already handles (repeated header rows,
+    footnote rows without period values, exact duplicate rows), reporting them as warnings
+
+    Returns the remaining rows with numeric period columns; cells that do not parse become NaN
+    and are reported by the schema's numeric check, which runs on the raw frame.
+    """
+    periods = period_columns(frame)
+    if not periods:
+        return frame
+    values, _ = parse_block(frame, periods)
+    no_values = np.isnan(values).all(axis=1)
+    repeated_header = (frame[periods].to_numpy(dtype=object) == np.array(periods, dtype=object)).all(axis=1)
+    duplicated = frame.duplicated().to_numpy() & ~no_values
+    for mask, what in ((repeated_header, 'repeated header'), (no_values & ~repeated_header, 'footnote/blank'),
+                       (duplicated, 'exact duplicate')):
+        if mask.any():
+            report.add(name, 'raw_rows', f"{int(mask.sum())} {what} rows dropped", severity='warning',
+                       rows=int(mask.sum()))
+    keep = ~(no_values | repeated_header | duplicated)
+    frame = frame[keep].copy()
+    frame[periods] = values[keep]
+    return frame
+
+
+def _read_raw(path):
+    try:
+        return pd.read_csv(path)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+def validate_inputs(tables=None, wits_df=None, growth_df=None, tolerance=0.5, fail_fast=False):
+    """
+    Validate every pipeline input and return the report
+
+    Parameters:
+    -----------
+    tables : dict, optional
+        {name: raw wide DataFrame}; defaults to the registered quarterly CSVs as stored on disk
+    wits_df, growth_df : DataFrame, optional
+        Combined WITS partners and growth analysis (read from data/wits by default)
+    fail_fast : bool
+        Stop after the first table with errors instead of collecting every issue
+    """
+    start = time.perf_counter()
+    report = ValidationReport()
+    if tables is None:
+        tables = {name: _read_raw(spec['path']) for name, spec in QUARTERLY_TABLES.items()}
+    if wits_df is None:
+        wits_df = pd.read_csv(WITS_PARTNERS_PATH)
+    if growth_df is None:
+        growth_df = pd.read_csv(GROWTH_ANALYSIS_PATH)
+
+    usable = {}
+    for name, frame in tables.items():
+        cleaned = strip_known_quirks(name, frame, report)
+        if QUARTERLY_SCHEMAS[name].validate(frame.loc[cleaned.index], report):
+            usable[name] = cleaned
+        if fail_fast and not report.ok:
+            break
+    if not (fail_fast and not report.ok):
+        WITS_SCHEMA.validate(wits_df, report)
+        GROWTH_SCHEMA.validate(growth_df, report)
+    if not (fail_fast and not report.ok):
+        check_period_consistency(usable, report)
+        check_share_totals(usable, report, tolerance)
+        check_world_reconciliation(usable, report, tolerance)
+        check_hierarchy(usable, wits_df, report, tolerance)
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    """Validate the pipeline inputs and print the report"""
+    import argparse
+    import os
+    import sys
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description='Validate the export analysis input tables')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Reconciliation tolerance (US$ M / share points)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    os.chdir(Path(__file__).resolve().parent.parent)
+    report = validate_inputs(tolerance=args.tolerance)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print("🧪 INPUT DATA VALIDATION")
+        print("=" * 60)
+        for issue in report.issues:
+            icon = '❌' if issue['severity'] == 'error' else '⚠️ '
+            print(f"   {icon} {issue['table']} / {issue['check']}: {issue['message']}")
+        status = '✅ All checks passed' if report.ok else '❌ Validation failed'
+        print(f"\n{status}: {report.checks} checks, {len(report.errors)} errors, "
+              f"{len(report.warnings)} warnings in {report.seconds * 1000:.1f} ms")
+    if not report.ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
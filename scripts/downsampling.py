@@ -0,0 +1,120 @@
+"""
+Rwanda Export Time-Series Downsampling
+Visually faithful point reduction for line charts: Largest-Triangle-Three-Buckets (LTTB) and
+min/max bucketing, applied server-side to a (optionally zoomed) x range
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _numeric_x(x):
+    """x as float positions for area/bucket computations (dates -> ns, labels -> index)"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype('int64').to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(x):
+        return x.to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets
+
+    The first and last points are always kept; each bucket in between keeps the point that
+    forms the largest triangle with the previously kept point and the next bucket's average.
+    """
+    n = len(y)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    x = _numeric_x(x)
+    y = np.asarray(y, dtype=float)
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_x, next_y = x[edges[i + 1]:edges[i + 2]].mean(), y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_indices(x, y, n_buckets):
+    """
+    Indices of the minimum and maximum point of each of n_buckets equal-count buckets
+    (plus the first and last point), fully vectorized; y must not contain NaN
+    """
+    n = len(y)
+    if 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(blocks).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = offsets + np.nanargmin(blocks[valid], axis=1)
+    highs = offsets + np.nanargmax(blocks[valid], axis=1)
+    return np.unique(np.r_[0, lows, highs, n - 1])
+
+
+def downsample(x, y, max_points=500, method='lttb', x_range=None):
+    """
+    Reduce one series to at most ~max_points for display
+
+    Parameters:
+    -----------
+    x, y : array-like
+        Series coordinates, sorted by x
+    method : 'lttb' or 'minmax'
+        LTTB keeps the visual shape; min/max keeps every extreme (spikes)
+    x_range : tuple, optional
+        (low, high) zoom window; only points inside it are considered, so zooming in
+        returns more detail for that window
+
+    Returns (x, y) as numpy arrays.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    if x_range is not None:
+        keep &= (x >= x_range[0]) & (x <= x_range[1])
+    x, y = x[keep], y[keep]
+
+    if len(y) <= max_points:
+        return x, y
+    if method == 'minmax':
+        idx = minmax_indices(x, y, max(1, (max_points - 2) // 2))
+    else:
+        idx = lttb_indices(x, y, max_points)
+    return x[idx], y[idx]
+
+
+def downsample_frame(frame, x, y, group, total_points=4000, min_points=50, method='lttb', x_range=None):
+    """
+    Downsample every series of a long-format frame, sharing a total point budget
+
+    Each series gets max(min_points, total_points // n_series) points, so the payload stays
+    bounded when there are hundreds of series as well as when each series is long.
+    Returns {group value: (x, y)} in first-seen order of the groups.
+    """
+    groups = frame.groupby(group, sort=False)
+    per_series = max(min_points, total_points // max(1, groups.ngroups))
+    result = {}
+    for name, series in groups:
+        series = series.sort_values(x)
+        result[name] = downsample(series[x].to_numpy(), series[y].to_numpy(), per_series, method, x_range)
+    return result
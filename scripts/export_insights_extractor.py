@@ -7,6 +7,16 @@ import pandas as pd
 import json
 from datetime import datetime
 
+from dashboard_figures import precompute_figures
+from forecast_reconciliation import coherence_gap
+from data_validation import COMMODITY_SCHEMA, OPPORTUNITY_SCHEMA, validate_frame
+from insights_snapshot import write_manifest
+from reexport_decomposition import decompose_exports, decomposition_totals, latest_decomposition
+from seasonality import decompose_long, decompose_table
+from scenario_engine import (partner_exposure_from_quarterly, partner_exposure_from_wits,
+                             run_market_loss_scenarios)
+from trade_tables import period_columns
+
 class ExportInsightsExtractor:
     """Extract and structure insights from Rwanda export analysis"""
     
@@ -14,7 +24,8 @@ class ExportInsightsExtractor:
         self.insights = {
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
-                'report_period': 'Q3 2024',
+                # Set from the latest quarter of the commodity table (extract_commodity_insights)
+                'report_period': None,
                 'analysis_version': '1.0'
             },
             'top_opportunities': [],
@@ -25,15 +36,17 @@ class ExportInsightsExtractor:
         }
     
     def extract_commodity_insights(self, commodities_df):
-        """Extract top commodity opportunities"""
-        top_5 = commodities_df.nlargest(5, '2024Q3')
+        """Extract top commodity opportunities (by value in the latest quarter)"""
+        latest = period_columns(commodities_df)[-1]
+        self.insights['metadata']['report_period'] = f"Q{latest[-1]} {latest[:4]}"
+        top_5 = commodities_df.nlargest(5, latest)
         
         self.insights['top_opportunities'] = [
             {
                 'rank': idx + 1,
                 'commodity': row['Commodity_Description'],
                 'sitc_code': row['SITC_Code'],
-                'current_value_millions': float(row['2024Q3']),
+                'current_value_millions': float(row[latest]),
                 'market_share_percent': float(row['Share_Percent_Q3']),
                 'yoy_growth_percent': float(row['Change_Q3_Q3_Percent']) if pd.notna(row['Change_Q3_Q3_Percent']) else 0,
                 'recommendation': self._generate_recommendation(row)
@@ -55,6 +68,7 @@ class ExportInsightsExtractor:
                 'growth_rate': float(row['YoY_Growth']) if pd.notna(row['YoY_Growth']) else 0,
                 'volatility': float(row['Volatility']) if pd.notna(row['Volatility']) else 0,
                 'market_share': float(row['Market_Share']) if pd.notna(row['Market_Share']) else 0,
+                'reexport_ratio': float(row['Reexport_Ratio']) if pd.notna(row.get('Reexport_Ratio')) else None,
                 'risk_level': self._assess_risk(row),
                 'action_priority': self._priority_level(row)
             }
@@ -63,14 +77,48 @@ class ExportInsightsExtractor:
         
         return self.insights['opportunity_matrix']
     
-    def extract_market_trends(self, quarterly_data):
-        """Extract market trend patterns"""
+    def extract_market_trends(self, quarterly_data, commodities_df=None, top_n=3):
+        """Extract market trend patterns from a seasonal decomposition of the quarterly series"""
+        total = None
+        if {'Quarter', 'Export_Value'}.issubset(quarterly_data.columns):
+            total = decompose_long(quarterly_data, 'Quarter', 'Export_Value')
+        elif commodities_df is not None:
+            total = decompose_table(commodities_df[period_columns(commodities_df)].sum().to_frame().T, []).iloc[0]
+        
+        strongest = []
+        if commodities_df is not None and period_columns(commodities_df):
+            sectors = decompose_table(commodities_df, ['Commodity_Description'])
+            sectors = sectors[sectors['seasonal_strength'] >= 0.5].sort_values('seasonal_amplitude', ascending=False)
+            strongest = [
+                {
+                    'sector': row['Commodity_Description'],
+                    'peak_quarter': row['peak_quarter'],
+                    'seasonal_strength': float(row['seasonal_strength']),
+                    'seasonal_amplitude_millions': float(row['seasonal_amplitude']),
+                    'trend_direction': row['trend_direction']
+                }
+                for _, row in sectors.head(top_n).iterrows()
+            ]
+        
+        peak_quarter = total['peak_quarter'] if total is not None else None
+        # Short or empty series have no slope / strength (NaN): written as null, not as invalid JSON
         self.insights['market_trends'] = {
-            'total_exports_trend': 'increasing',
-            'growth_rate_avg': float(quarterly_data['QoQ_Growth'].mean()) if 'QoQ_Growth' in quarterly_data else 0,
+            'total_exports_trend': total['trend_direction'] if total is not None else 'unknown',
+            'trend_slope_percent_per_quarter': float(total['trend_slope_percent'])
+                if total is not None and pd.notna(total['trend_slope_percent']) else None,
+            'growth_rate_avg': float(quarterly_data['QoQ_Growth'].mean())
+                if 'QoQ_Growth' in quarterly_data and quarterly_data['QoQ_Growth'].notna().any() else 0,
             'seasonal_patterns': {
-                'peak_quarter': 'Q3',
-                'peak_sectors': ['Food and Live Animals', 'Agricultural Products']
+                'peak_quarter': peak_quarter,
+                'trough_quarter': total['trough_quarter'] if total is not None else None,
+                'seasonal_strength': float(total['seasonal_strength'])
+                    if total is not None and pd.notna(total['seasonal_strength']) else None,
+                'seasonal_indices': {
+                    f'Q{q}': float(total[f'seasonal_index_Q{q}']) for q in range(1, 5)
+                } if total is not None and peak_quarter is not None else {},
+                'peak_sectors': [s['sector'] for s in strongest if s['peak_quarter'] == peak_quarter]
+                                or [s['sector'] for s in strongest],
+                'strongest_seasonal_sectors': strongest
             },
             'volatility_index': self._calculate_volatility(quarterly_data)
         }
@@ -114,6 +162,82 @@ class ExportInsightsExtractor:
         
         return self.insights['strategic_markets']
     
+    def extract_scenario_risk(self, wits_df=None, countries_df=None, n_draws=100_000, seed=42):
+        """Simulate market-loss scenarios over partner shares (WITS and/or quarterly country data)"""
+        self.insights['risk_scenarios'] = {}
+        
+        if wits_df is not None and not wits_df.empty:
+            year = int(wits_df['Year'].max())
+            exposure = partner_exposure_from_wits(wits_df, year)
+            self.insights['risk_scenarios'][f'wits_{year}'] = run_market_loss_scenarios(
+                exposure, n_draws=n_draws, seed=seed
+            )
+        
+        if countries_df is not None and not countries_df.empty:
+            exposure = partner_exposure_from_quarterly(countries_df)
+            period = period_columns(countries_df)[-1]
+            self.insights['risk_scenarios'][f'quarterly_{period}'] = run_market_loss_scenarios(
+                exposure, n_draws=n_draws, seed=seed
+            )
+        
+        return self.insights['risk_scenarios']
+    
+    def extract_anomalies(self, anomalies_df, top_n=25):
+        """Extract flagged anomalies (from AnomalyDetector scores) for the latest scored quarter"""
+        flagged = anomalies_df[anomalies_df['flagged'].astype(bool)]
+        latest = anomalies_df['period'].max() if not anomalies_df.empty else None
+        current = flagged[flagged['period'] == latest].sort_values('score', ascending=False)
+        
+        self.insights['anomalies'] = {
+            'period': latest,
+            'series_scored': int(anomalies_df.loc[anomalies_df['period'] == latest, 'series_id'].nunique()),
+            'flagged_count': len(current),
+            'flagged_by_table': current['table'].value_counts().to_dict(),
+            'flagged': [
+                {
+                    'table': row['table'],
+                    'series': row['label'],
+                    'period': row['period'],
+                    'value': float(row['value']),
+                    'expected_value': float(row['expected_value']),
+                    'direction': row['direction'],
+                    'score': float(row['score'])
+                }
+                for _, row in current.head(top_n).iterrows()
+            ]
+        }
+        
+        return self.insights['anomalies']
+    
+    def extract_reexport_decomposition(self, commodities_df, reexports_df):
+        """Split gross exports into domestic exports and re-exports per commodity for the latest quarter"""
+        decomposition = decompose_exports(commodities_df, reexports_df)
+        latest = latest_decomposition(decomposition)
+        
+        def value(row, column):
+            return float(row[column]) if pd.notna(row[column]) else None
+        
+        self.insights['reexports'] = {
+            'totals': decomposition_totals(decomposition),
+            'commodities': [
+                {
+                    'commodity': row['Commodity_Description'],
+                    'sitc_code': row['SITC_Code'],
+                    'period': row['Period'],
+                    'domestic_millions': value(row, 'Domestic_Exports'),
+                    'reexports_millions': value(row, 'Re_Exports'),
+                    'gross_millions': value(row, 'Gross_Exports'),
+                    'reexport_ratio_percent': value(row, 'Reexport_Ratio_Percent'),
+                    'domestic_yoy_percent': value(row, 'Domestic_YoY_Percent'),
+                    'reexports_yoy_percent': value(row, 'Reexport_YoY_Percent'),
+                    'ratio_yoy_change_pp': value(row, 'Ratio_YoY_Change_pp')
+                }
+                for _, row in latest.iterrows()
+            ]
+        }
+        
+        return self.insights['reexports']
+    
     def generate_policy_recommendations(self):
         """Generate comprehensive, government-ready policy recommendations"""
         self.insights['policy_recommendations'] = [
@@ -369,9 +493,41 @@ class ExportInsightsExtractor:
             }
         ]
         
+        self._apply_scenario_evidence()
         
         return self.insights['policy_recommendations']
     
+    def _apply_scenario_evidence(self):
+        """Replace the static concentration figures with simulated market-loss evidence"""
+        scenarios = self.insights.get('risk_scenarios')
+        if not scenarios:
+            return
+        
+        source, results = next(iter(scenarios.items()))
+        conc = results['concentration']
+        combined = results['scenarios']['combined']
+        partner_loss = results['scenarios']['partner_loss']
+        
+        for policy in self.insights['policy_recommendations']:
+            if policy['category'] != 'Market Diversification and Risk Reduction':
+                continue
+            policy['recommendation'] = (
+                f"Reduce dependency on top 3 markets (currently {conc['top3_share_percent']:.0f}% concentration) "
+                f"through targeted market entry programs"
+            )
+            policy['rationale'] = (
+                f"HHI of {conc['hhi']:.1f} indicates {'high' if conc['hhi'] > 2500 else 'moderate-high'} concentration risk. "
+                f"Over-reliance on few markets exposes Rwanda to political and economic shocks"
+            )
+            policy['data_evidence'] = (
+                f"Top 3 markets account for {conc['top3_share_percent']:.0f}% of exports "
+                f"(largest market {conc['top1_share_percent']:.0f}%); across {results['draws']:,} simulated "
+                f"market-loss scenarios, 5% of outcomes lose more than "
+                f"{combined['loss_percentiles']['p95']:.0f}% of export revenue "
+                f"(${combined['value_at_risk_95_millions']:.0f}M), and partner loss alone puts "
+                f"{partner_loss['loss_percentiles']['p95']:.0f}% at risk ({source.replace('_', ' ')} data)"
+            )
+    
     def generate_youth_sme_opportunities(self):
         """Generate specific opportunities for youth and SMEs"""
         self.insights['youth_sme_opportunities'] = [
@@ -476,61 +632,99 @@ class ExportInsightsExtractor:
         print(f"✅ Insights exported to {filename}")
         return filename
     
-    def export_to_csv_package(self, base_filename='export_insights'):
+    def export_to_csv_package(self, base_filename='export_insights', output_dir='data/insights'):
         """Export insights to multiple CSV files for easy dashboard integration"""
         
         # Top opportunities
         if self.insights.get('top_opportunities'):
             pd.DataFrame(self.insights['top_opportunities']).to_csv(
-                f'data/insights/{base_filename}_opportunities.csv', index=False
+                f'{output_dir}/{base_filename}_opportunities.csv', index=False
             )
         
         # Opportunity matrix
         if self.insights.get('opportunity_matrix'):
             pd.DataFrame(self.insights['opportunity_matrix']).to_csv(
-                f'data/insights/{base_filename}_opportunity_matrix.csv', index=False
+                f'{output_dir}/{base_filename}_opportunity_matrix.csv', index=False
             )
         
         # Policy recommendations
         if self.insights.get('policy_recommendations'):
             pd.DataFrame(self.insights['policy_recommendations']).to_csv(
-                f'data/insights/{base_filename}_policy_recommendations.csv', index=False
+                f'{output_dir}/{base_filename}_policy_recommendations.csv', index=False
             )
         
         # Youth/SME opportunities
         if self.insights.get('youth_sme_opportunities'):
             pd.DataFrame(self.insights['youth_sme_opportunities']).to_csv(
-                f'data/insights/{base_filename}_youth_sme_opportunities.csv', index=False
+                f'{output_dir}/{base_filename}_youth_sme_opportunities.csv', index=False
             )
         
         # Strategic markets
         if self.insights.get('strategic_markets'):
             for tier, markets in self.insights['strategic_markets'].items():
                 pd.DataFrame(markets).to_csv(
-                    f'data/insights/{base_filename}_strategic_{tier}.csv', index=False
+                    f'{output_dir}/{base_filename}_strategic_{tier}.csv', index=False
                 )
         
+        # Market-loss scenarios
+        if self.insights.get('risk_scenarios'):
+            rows = [
+                {
+                    'source': source,
+                    'scenario': name,
+                    'baseline_millions': results['baseline_millions'],
+                    'draws': results['draws'],
+                    'expected_loss_percent': summary['expected_loss_percent'],
+                    **{f'loss_{q}_percent': v for q, v in summary['loss_percentiles'].items()},
+                    'value_at_risk_95_millions': summary['value_at_risk_95_millions'],
+                    'expected_shortfall_95_percent': summary['expected_shortfall_95_percent']
+                }
+                for source, results in self.insights['risk_scenarios'].items()
+                for name, summary in results['scenarios'].items()
+            ]
+            pd.DataFrame(rows).to_csv(
+                f'{output_dir}/{base_filename}_risk_scenarios.csv', index=False
+            )
+        
+        # Anomalies
+        if self.insights.get('anomalies', {}).get('flagged'):
+            pd.DataFrame(self.insights['anomalies']['flagged']).to_csv(
+                f'{output_dir}/{base_filename}_anomalies.csv', index=False
+            )
+        
+        # Re-export decomposition
+        if self.insights.get('reexports', {}).get('commodities'):
+            pd.DataFrame(self.insights['reexports']['commodities']).to_csv(
+                f'{output_dir}/{base_filename}_reexport_decomposition.csv', index=False
+            )
+        
         # Forecast predictions
         if self.insights.get('predictions') and self.insights['predictions'].get('top_forecasts'):
             # Top forecasts
             pd.DataFrame(self.insights['predictions']['top_forecasts']).to_csv(
-                f'data/insights/{base_filename}_forecast_top15.csv', index=False
+                f'{output_dir}/{base_filename}_forecast_top15.csv', index=False
             )
             
             # High growth markets
             if self.insights['predictions'].get('high_growth_markets'):
                 pd.DataFrame(self.insights['predictions']['high_growth_markets']).to_csv(
-                    f'data/insights/{base_filename}_forecast_high_growth.csv', index=False
+                    f'{output_dir}/{base_filename}_forecast_high_growth.csv', index=False
                 )
             
             # Emerging opportunities
             if self.insights['predictions'].get('emerging_opportunities'):
                 pd.DataFrame(self.insights['predictions']['emerging_opportunities']).to_csv(
-                    f'data/insights/{base_filename}_forecast_emerging.csv', index=False
+                    f'{output_dir}/{base_filename}_forecast_emerging.csv', index=False
                 )
         
+        # Reconciled partner / region / world forecasts
+        if self.insights.get('predictions', {}).get('reconciled_nodes'):
+            pd.DataFrame(self.insights['predictions']['reconciled_nodes']).to_csv(
+                f'{output_dir}/{base_filename}_forecast_reconciled.csv', index=False
+            )
+        
         print(f"✅ Insights exported to multiple CSV files: {base_filename}_*.csv")
-        return f'data/insights/{base_filename}_*.csv'
+        return f'{output_dir}/{base_filename}_*.csv'
     
     def extract_forecast_predictions(self, forecast_df):
         """Extract predictive analytics and forecasts"""
@@ -563,6 +757,7 @@ class ExportInsightsExtractor:
                 'predicted_2023_millions': float(row['predicted_2023']),
                 'predicted_2024_millions': float(row['predicted_2024']),
                 'predicted_2025_millions': float(row['predicted_2025']),
+                **self._interval_fields(row),
                 'growth_percent': float(row['predicted_growth_percent']),
                 'cagr_2022_2025': float(row['cagr_2022_2025']),
                 'confidence_score': float(row['confidence_score']),
@@ -582,6 +777,7 @@ class ExportInsightsExtractor:
             {
                 'country': row['country'],
                 'predicted_2025_millions': float(row['predicted_2025']),
+                **self._interval_fields(row, years=(2025,)),
                 'growth_percent': float(row['predicted_growth_percent']),
                 'confidence_score': float(row['confidence_score'])
             }
@@ -599,6 +795,7 @@ class ExportInsightsExtractor:
                 'country': row['country'],
                 'current_2022_millions': float(row['current_2022']),
                 'predicted_2025_millions': float(row['predicted_2025']),
+                **self._interval_fields(row, years=(2025,)),
                 'growth_percent': float(row['predicted_growth_percent'])
             }
             for _, row in emerging.iterrows()
@@ -643,6 +840,61 @@ class ExportInsightsExtractor:
         
         return self.insights['predictions']
     
+    def extract_reconciled_forecasts(self, reconciled_df):
+        """
+        Publish the reconciled partner / region / world forecasts
+
+        The per-partner forecasts do not add up to a forecast of total exports, so the summary
+        totals are replaced with the reconciled world level; the plain partner sum is kept
+        alongside as total_predicted_2025_unreconciled.
+        """
+        if reconciled_df is None or reconciled_df.empty:
+            return
+        
+        world = reconciled_df[reconciled_df['level'] == 'world'].iloc[0]
+        regions = reconciled_df[reconciled_df['level'] == 'region']
+        
+        def node(row):
+            return {
+                'node': row['node'],
+                'level': row['level'],
+                'current_2022_millions': float(row['current_2022']),
+                **{f'{kind}_{year}_millions': float(row[f'{kind}_{year}'])
+                   for kind in ('base', 'reconciled') for year in (2023, 2024, 2025)},
+                **self._interval_fields(row, prefix='reconciled')
+            }
+        
+        self.insights['predictions']['reconciliation'] = {
+            'method': reconciled_df.attrs.get('method'),
+            'shrinkage_intensity': reconciled_df.attrs.get('shrinkage_intensity'),
+            'partners': int((reconciled_df['level'] == 'partner').sum()),
+            'base_coherence_gap_2025_percent': round(coherence_gap(reconciled_df, 'base_2025'), 2),
+            'world': node(world),
+            'regions': [node(row) for _, row in regions.sort_values('reconciled_2025', ascending=False).iterrows()]
+        }
+        # NaN (no base forecast to adjust) is written as null, not as invalid JSON
+        self.insights['predictions']['reconciled_nodes'] = \
+            reconciled_df.astype(object).where(reconciled_df.notna(), None).to_dict('records')
+        
+        summary = self.insights['predictions'].setdefault('summary', {})
+        if 'total_predicted_2025' in summary:
+            summary['total_predicted_2025_unreconciled'] = summary['total_predicted_2025']
+        summary['total_predicted_2025'] = float(world['reconciled_2025'])
+        summary['total_current_2022'] = float(world['current_2022'])
+        summary['overall_growth_percent'] = float((world['reconciled_2025'] / world['current_2022'] - 1) * 100) \
+            if world['current_2022'] > 0 else 0.0
+        summary['reconciled'] = True
+        
+        return self.insights['predictions']['reconciliation']
+    
+    def _interval_fields(self, row, years=(2023, 2024, 2025), prefix='predicted'):
+        """P10 / P50 / P90 (US$ M) of the forecast years a row carries intervals for"""
+        return {
+            f'{prefix}_{year}_p{q}_millions': float(row[f'{prefix}_{year}_p{q}'])
+            for year in years for q in (10, 50, 90)
+            if f'{prefix}_{year}_p{q}' in row.index
+        }
+    
     def _generate_forecast_recommendation(self, row):
         """Generate recommendation based on forecast data"""
         growth = row['predicted_growth_percent']
@@ -683,7 +935,9 @@ class ExportInsightsExtractor:
 
 # Helper function to use in notebook
 def create_insights_export(commodities_df, opportunity_analysis, quarterly_data, 
-                          tier1_markets, tier2_markets, tier3_markets, forecast_df=None):
+                          tier1_markets, tier2_markets, tier3_markets, forecast_df=None,
+                          countries_df=None, wits_df=None, anomalies_df=None, reexports_df=None,
+                          reconciled_df=None, output_dir='data/insights', precompute=True):
     """
     One-function call to extract all insights and export them
     
@@ -691,14 +945,40 @@ def create_insights_export(commodities_df, opportunity_analysis, quarterly_data,
     -----------
     forecast_df : DataFrame, optional
         DataFrame with predictive forecasts (from ML models)
+    countries_df : DataFrame, optional
+        Quarterly exports by destination (2024Q3_ExportCountry.csv) for market-loss scenarios
+    wits_df : DataFrame, optional
+        Combined WITS partner data for market-loss scenarios
+    anomalies_df : DataFrame, optional
+        Anomaly scores (AnomalyDetector().update() / .scores())
+    reexports_df : DataFrame, optional
+        Quarterly re-exports by commodity (2024Q3_ReexportsCommodity.csv) for the
+        domestic / re-export decomposition
+    reconciled_df : DataFrame, optional
+        Partner / region / world forecasts (forecast_reconciliation.reconcile_partner_forecasts);
+        the forecast summary totals then come from the reconciled world level
+    output_dir : str
+        Directory the bundle (JSON, CSVs, manifest) is written to
+    precompute : bool
+        Build the dashboard figures for the bundle (skip when writing to a staging directory)
     """
+    # Missing or malformed columns fail here with a report, not as a KeyError mid-extraction
+    validate_frame(opportunity_analysis, OPPORTUNITY_SCHEMA).raise_for_errors()
+    validate_frame(commodities_df, COMMODITY_SCHEMA).raise_for_errors()
+    
     extractor = ExportInsightsExtractor()
     
     # Extract all insights
     extractor.extract_commodity_insights(commodities_df)
     extractor.extract_opportunity_analysis(opportunity_analysis)
-    extractor.extract_market_trends(quarterly_data)
+    extractor.extract_market_trends(quarterly_data, commodities_df)
     extractor.extract_strategic_markets(tier1_markets, tier2_markets, tier3_markets)
+    if countries_df is not None or wits_df is not None:
+        extractor.extract_scenario_risk(wits_df=wits_df, countries_df=countries_df)
+    if anomalies_df is not None:
+        extractor.extract_anomalies(anomalies_df)
+    if reexports_df is not None:
+        extractor.extract_reexport_decomposition(commodities_df, reexports_df)
     extractor.generate_policy_recommendations()
     extractor.generate_youth_sme_opportunities()
     
@@ -706,10 +986,17 @@ def create_insights_export(commodities_df, opportunity_analysis, quarterly_data,
     if forecast_df is not None and not forecast_df.empty:
         extractor.extract_forecast_predictions(forecast_df)
         print("✅ Predictive forecasts extracted and included!")
+    if reconciled_df is not None and not reconciled_df.empty:
+        extractor.extract_reconciled_forecasts(reconciled_df)
     
     # Export in both formats
-    json_file = extractor.export_to_json()
-    csv_files = extractor.export_to_csv_package()
+    json_file = extractor.export_to_json(f'{output_dir}/export_insights.json')
+    csv_files = extractor.export_to_csv_package(output_dir=output_dir)
+    
+    # Publish: the manifest is written last so the dashboard swaps in complete bundles only
+    write_manifest(output_dir, generated_at=extractor.insights['metadata']['generated_at'])
+    if precompute:
+        precompute_figures(output_dir)
     
     # Print summary
     summary = extractor.get_summary_stats()
@@ -723,4 +1010,19 @@ def create_insights_export(commodities_df, opportunity_analysis, quarterly_data,
         print(f"   • Forecasted Countries: {summary['forecasted_countries']}")
         print(f"   • Predicted 2025 Value: ${summary['predicted_2025_value']:.1f}M")
     
+    if extractor.insights.get('predictions', {}).get('reconciliation'):
+        reconciliation = extractor.insights['predictions']['reconciliation']
+        print(f"   • Reconciled Forecasts ({reconciliation['method']}): {reconciliation['partners']} partners, "
+              f"{len(reconciliation['regions'])} regions, base gap "
+              f"{reconciliation['base_coherence_gap_2025_percent']:+.1f}%")
+    
+    if extractor.insights.get('anomalies'):
+        print(f"   • Anomalies Flagged ({extractor.insights['anomalies']['period']}): "
+              f"{extractor.insights['anomalies']['flagged_count']}")
+    
+    if extractor.insights.get('reexports'):
+        totals = extractor.insights['reexports']['totals']
+        print(f"   • Re-exported Share ({totals['period']}): {totals['reexport_ratio_percent']}% "
+              f"of ${totals['gross_millions']:,.1f}M gross exports")
+    
     return extractor, json_file, csv_files
@@ -0,0 +1,137 @@
+"""
+Rwanda Export Forecast Intervals
+Residual-bootstrap prediction intervals (P10 / P50 / P90) for the partner trend forecasts, every
+series and bootstrap draw computed in one batched pass
+"""
+
+import numpy as np
+import pandas as pd
+
+from forecast_reconciliation import FUTURE_YEARS, trend_operators
+from trade_hierarchy import wits_wide
+
+BOOTSTRAP_DRAWS = 1000
+QUANTILES = (10, 50, 90)
+SEED = 42
+# Series per batch: bounds the (series x draws x years) residual draws held at once
+CHUNK_SIZE = 512
+
+
+def bootstrap_forecasts(history, observed, years, future_years=FUTURE_YEARS, n_draws=BOOTSTRAP_DRAWS,
+                        seed=SEED, joint=False):
+    """
+    Bootstrap forecast samples (series x draws x horizons) for the trend model
+
+    Each draw perturbs the history with resampled residuals, refits it and adds a resampled
+    residual to every horizon, so the spread covers both the fit and next year's noise. The
+    trend operators are linear, so a draw is the point forecast plus the operator applied to
+    its residuals: one batched matrix product for all series and draws. Residuals are centered
+    and scaled by sqrt(n / (n - 2)) for the degrees of freedom the fit used up.
+
+    Parameters:
+    -----------
+    history : array
+        Series x years values (anything in unobserved years is ignored)
+    observed : array
+        Series x years mask of the years each series has data for
+    joint : bool
+        Resample the same years for every series, keeping the cross-series correlation of the
+        residuals (for forecasts that are reconciled or summed afterwards); otherwise each
+        series resamples its own observed years
+    """
+    history = np.asarray(history, dtype=float)
+    observed = np.asarray(observed, dtype=bool)
+    n, T = history.shape
+    H = len(future_years)
+    forecast_op, fitted_op = trend_operators(observed, years, future_years)
+    fitted = np.einsum('nst,nt->ns', fitted_op, history)
+    point = np.einsum('nht,nt->nh', forecast_op, history)
+
+    counts = observed.sum(axis=1)
+    residuals = np.where(observed, history - fitted, 0.0)
+    residuals -= np.where(observed, residuals.sum(axis=1, keepdims=True) / np.maximum(counts, 1)[:, None], 0.0)
+    residuals *= np.sqrt(counts / np.maximum(counts - 2, 1))[:, None] * (counts > 2)[:, None]
+
+    rng = np.random.default_rng(seed)
+    if joint:
+        shared = rng.integers(0, T, size=(n_draws, T + H))
+    else:
+        # Observed years first in every row, so a draw below counts picks an observed year
+        observed_first = np.argsort(~observed, axis=1, kind='stable')
+
+    samples = np.empty((n, n_draws, H))
+    for start in range(0, n, CHUNK_SIZE):
+        rows = slice(start, min(start + CHUNK_SIZE, n))
+        if joint:
+            positions = np.broadcast_to(shared, (rows.stop - rows.start, n_draws, T + H))
+        else:
+            u = rng.random((rows.stop - rows.start, n_draws, T + H))
+            picks = (u * np.maximum(counts[rows], 1)[:, None, None]).astype(int)
+            positions = np.take_along_axis(observed_first[rows, None, :], picks, axis=2)
+        shocks = np.take_along_axis(residuals[rows, None, :], positions, axis=2)
+        refit = shocks[..., :T] @ forecast_op[rows].transpose(0, 2, 1)
+        samples[rows] = np.maximum(point[rows, None, :] + refit + shocks[..., T:], 0)
+    return samples
+
+
+def forecast_quantiles(samples, quantiles=QUANTILES):
+    """Percentiles over the draws: array of quantiles x series x horizons"""
+    return np.percentile(samples, quantiles, axis=1)
+
+
+def interval_columns(samples, prefix, future_years=FUTURE_YEARS, quantiles=QUANTILES):
+    """{'<prefix>_<year>_p<q>': values} for every horizon and quantile"""
+    bands = forecast_quantiles(samples, quantiles)
+    return {f"{prefix}_{year}_p{q}": bands[i, :, j]
+            for j, year in enumerate(future_years) for i, q in enumerate(quantiles)}
+
+
+def partner_intervals(wits_df, partners=None, future_years=FUTURE_YEARS, n_draws=BOOTSTRAP_DRAWS, seed=SEED):
+    """
+    P10 / P50 / P90 of every partner's predicted_<year> (US$ M), indexed by partner name
+
+    Uses the same WITS history and observed years as forecast_partners, so the intervals
+    bracket its point forecasts.
+    """
+    wide = wits_wide(wits_df).set_index('Partner Name')
+    if partners is not None:
+        wide = wide.reindex(pd.Index(partners))
+    values = wide.to_numpy(dtype=float) / 1000
+    observed = ~np.isnan(values)
+    samples = bootstrap_forecasts(np.nan_to_num(values), observed, [int(c) for c in wide.columns],
+                                  future_years, n_draws, seed)
+    return pd.DataFrame(interval_columns(samples, 'predicted', future_years), index=wide.index).round(3)
+
+
+def main():
+    """Print the 2025 intervals of the largest partner forecasts"""
+    import argparse
+    import os
+    import time
+    from pathlib import Path
+
+    from insights_pipeline import forecast_partners
+    from trade_tables import load_wits_partners
+
+    parser = argparse.ArgumentParser(description='Bootstrap prediction intervals for the partner forecasts')
+    parser.add_argument('--draws', type=int, default=BOOTSTRAP_DRAWS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+    os.chdir(Path(__file__).resolve().parent.parent)
+
+    print("🎯 FORECAST INTERVALS")
+    print("=" * 60)
+    forecast_df = forecast_partners(load_wits_partners())
+    start = time.perf_counter()
+    intervals = partner_intervals(load_wits_partners(), forecast_df['country'], n_draws=args.draws, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"   {len(intervals)} partners x {args.draws} draws in {elapsed:.2f}s\n")
+    last = FUTURE_YEARS[-1]
+    for _, row in forecast_df.head(15).iterrows():
+        band = intervals.loc[row['country']]
+        print(f"   • {row['country']:<28} ${row[f'predicted_{last}']:>8,.1f}M  "
+              f"P10–P90 ${band[f'predicted_{last}_p10']:>8,.1f}M – ${band[f'predicted_{last}_p90']:>8,.1f}M")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Rwanda Export Forecast Reconciliation
+Forecasts every level of the partner -> region -> world hierarchy with the partner trend model and
+reconciles them (bottom-up, OLS or MinT with a shrunk residual covariance) so partner forecasts add up
+to their region and the world
+"""
+
+import numpy as np
+import pandas as pd
+
+from combine_wits_partner_data import assign_region
+from memo_cache import memoize
+from trade_hierarchy import find_aggregate_rows, wits_wide
+
+FUTURE_YEARS = (2023, 2024, 2025)
+METHODS = ('bottom_up', 'ols', 'mint_shrink')
+WORLD_NODE = 'World'
+# Memoized forecasts key on their own source only: bump when the trend operators, the
+# reconciliation or the bootstrap intervals change
+MODEL_VERSION = 2
+
+
+def partner_history(wits_df):
+    """
+    Partner x year export matrix (US$ M) of the countries only
+
+    Rows that aggregate other partners (World, the World Bank regions) are dropped: they are
+    levels of the hierarchy, not bottom series. Returns (history, observed): history has 0
+    for years a partner does not appear in, observed marks the years it does.
+    """
+    wide = wits_wide(wits_df)
+    aggregates = find_aggregate_rows(wide, 'Partner Name')
+    wide = wide[~wide['Partner Name'].isin(aggregates['Partner Name'])].set_index('Partner Name')
+    values = wide.to_numpy(dtype=float) / 1000
+    observed = ~np.isnan(values)
+    history = pd.DataFrame(np.nan_to_num(values), index=wide.index, columns=[int(c) for c in wide.columns])
+    return history, observed
+
+
+def summing_matrix(regions):
+    """
+    Summing matrix S (nodes x partners) and node table for partner -> region -> world
+
+    regions is the region of every partner (in partner order). Node order: world, regions,
+    partners, so S @ partner values gives every level at once.
+    """
+    regions = pd.Series(regions)
+    names = sorted(regions.unique())
+    region_rows = (regions.to_numpy()[None, :] == np.array(names)[:, None]).astype(float)
+    S = np.vstack([np.ones((1, len(regions))), region_rows, np.eye(len(regions))])
+    nodes = pd.DataFrame({
+        'level': ['world'] + ['region'] * len(names) + ['partner'] * len(regions),
+        'node': [WORLD_NODE] + names + list(regions.index),
+        'parent': [''] + [WORLD_NODE] * len(names) + list(regions.to_numpy())
+    })
+    return S, nodes
+
+
+def trend_operators(observed, years, future_years=FUTURE_YEARS):
+    """
+    The partner model (mean of a linear and a quadratic trend) as linear maps, one per series
+
+    For fixed observed years the trend fit is linear in the history, so every series gets a
+    forecast operator (horizons x years) and a fitted-value operator (years x years), built
+    with one batched normal-equation solve per degree. Unobserved years get zero weight.
+    Series with fewer than 3 observed years repeat their last value.
+    """
+    observed = np.asarray(observed, dtype=bool)
+    center = np.mean(years)
+    t = np.asarray(years, dtype=float) - center
+    future = np.asarray(future_years, dtype=float) - center
+
+    weights = observed.astype(float)
+    n, T = observed.shape
+    forecast_op = np.zeros((n, len(future), T))
+    fitted_op = np.zeros((n, T, T))
+    enough = observed.sum(axis=1) >= 3
+    for degree in (1, 2):
+        X = np.vander(t, degree + 1, increasing=True)
+        A = np.einsum('nt,tk,tl->nkl', weights, X, X)
+        # Short series get an identity system; their operators are replaced below
+        A[~enough] = np.eye(degree + 1)
+        # Coefficients = solve(A, X' M y): the map from a history to its coefficients
+        to_coefficients = np.linalg.solve(A, X.T[None, :, :] * weights[:, None, :])
+        forecast_op += np.vander(future, degree + 1, increasing=True) @ to_coefficients / 2
+        fitted_op += X @ to_coefficients / 2
+
+    last = np.where(observed.any(axis=1), T - 1 - np.argmax(observed[:, ::-1], axis=1), 0)
+    repeat_last = np.zeros((n, T))
+    repeat_last[np.arange(n), last] = observed.any(axis=1)
+    forecast_op[~enough] = repeat_last[~enough, None, :]
+    fitted_op[~enough] = repeat_last[~enough, None, :]
+    return forecast_op, fitted_op
+
+
+def fit_trend_forecasts(history, observed, years, future_years=FUTURE_YEARS):
+    """
+    Batched version of the partner model, floored at 0
+
+    Every series is fitted on its observed years only. Returns (forecasts: series x horizons,
+    fitted: series x years).
+    """
+    history = np.asarray(history, dtype=float)
+    forecast_op, fitted_op = trend_operators(observed, years, future_years)
+    forecasts = np.maximum(np.einsum('nht,nt->nh', forecast_op, history), 0)
+    return forecasts, np.einsum('nst,nt->ns', fitted_op, history)
+
+
+def shrunk_covariance(residuals):
+    """
+    Residual covariance shrunk toward its diagonal (Schafer-Strimmer intensity), in factored form
+
+    residuals is nodes x observations. With few observations the sample covariance has rank
+    T, so W = diag(diagonal) + factor @ factor.T is returned instead of an n x n matrix; the
+    intensity only needs T x T products. Returns (diagonal, factor, intensity).
+    """
+    n, T = residuals.shape
+    centered = residuals - residuals.mean(axis=1, keepdims=True)
+    variances = (centered ** 2).sum(axis=1) / T
+    std = np.sqrt(variances)[:, None]
+    x = np.divide(centered, std, out=np.zeros_like(centered), where=std > 0)
+    # Sums over i != j of the squared sample correlations and of their estimated variances
+    # (T / (T-1)^3 * sum_t (x_ti x_tj - r_ij)^2), through T x T Gram matrices
+    gram = x.T @ x
+    squared_correlations = ((gram ** 2).sum() - (x ** 2).sum(axis=1) @ (x ** 2).sum(axis=1)) / T ** 2
+    fourth = (x ** 2).sum(axis=0)
+    squared_products = (fourth ** 2).sum() - (x ** 4).sum()
+    correlation_variance = T / (T - 1) ** 3 * (squared_products - T * squared_correlations)
+    intensity = 1.0 if squared_correlations <= 0 else float(np.clip(correlation_variance / squared_correlations, 0, 1))
+    return intensity * variances, np.sqrt((1 - intensity) / T) * centered, intensity
+
+
+def reconcile(base, S, method='mint_shrink', residuals=None):
+    """
+    Coherent forecasts for all horizons at once
+
+    bottom_up keeps the partner forecasts and re-aggregates them; ols (W = I) and
+    mint_shrink (W = the shrunk residual covariance; residuals: nodes x years) project the
+    base forecasts onto the coherent subspace, base - W C' (C W C')^-1 C base with the
+    constraints C = [I, -A] (aggregates minus their members). This equals
+    S (S' W^-1 S)^-1 S' W^-1 base but only solves a system the size of the aggregate levels.
+    Returns (reconciled, details).
+    """
+    n, m = S.shape
+    k = n - m
+    if method == 'bottom_up':
+        return S @ base[k:], {}
+    if method == 'ols':
+        diagonal, factor, details = np.ones(n), np.zeros((n, 0)), {}
+    elif method == 'mint_shrink':
+        if residuals is None:
+            raise ValueError("mint_shrink needs the in-sample residuals of every node")
+        diagonal, factor, intensity = shrunk_covariance(residuals)
+        details = {'shrinkage_intensity': round(intensity, 4)}
+    else:
+        raise ValueError(f"Unknown reconciliation method {method!r} (expected one of {METHODS})")
+
+    # Nodes without residual variance (constant histories) get a small floor so C W C' stays invertible
+    floor = max(diagonal.max(), 1.0) * 1e-6
+    diagonal = np.maximum(diagonal, floor)
+    C = np.hstack([np.eye(k), -S[:k]])
+    W_Ct = diagonal[:, None] * C.T + factor @ (factor.T @ C.T)
+    adjustment = W_Ct @ np.linalg.solve(C @ W_Ct, C @ base)
+    # Exports cannot be negative: clip the partners and re-aggregate, which keeps coherence
+    return S @ np.maximum((base - adjustment)[k:], 0), details
+
+
+@memoize(version=MODEL_VERSION)
+def reconcile_partner_forecasts(wits_df, method='mint_shrink', future_years=FUTURE_YEARS):
+    """
+    Base and reconciled forecasts for every partner, region and the world
+
+    Regions are assign_region's (partners it cannot place form 'Other/Regional Grouping').
+    Every node is forecast with the partner trend model on its own history; the forecasts
+    are then reconciled with the chosen method. Bootstrap samples of the base forecasts
+    (resampling the same years for every node) are reconciled the same way, which gives
+    coherent reconciled_<year>_p10 / _p50 / _p90 intervals. The result has one row per node
+    with its level, parent, current value, base_<year>, reconciled_<year> and interval
+    columns; attrs carry the method and its details.
+    """
+    # forecast_intervals builds on this module's trend operators
+    from forecast_intervals import bootstrap_forecasts, interval_columns
+
+    history, observed = partner_history(wits_df)
+    years = list(history.columns)
+    regions = history.index.to_series().map(assign_region)
+    S, nodes = summing_matrix(regions)
+
+    # Aggregate levels are observed wherever any member is
+    node_history = S @ history.to_numpy()
+    node_observed = (S @ observed.astype(float)) > 0
+    base, fitted = fit_trend_forecasts(node_history, node_observed, years, future_years)
+    residuals = np.where(node_observed, node_history - fitted, 0.0)
+    reconciled, details = reconcile(base, S, method, residuals)
+    samples = bootstrap_forecasts(node_history, node_observed, years, future_years, joint=True)
+    n, n_draws, horizons = samples.shape
+    reconciled_samples, _ = reconcile(samples.reshape(n, -1), S, method, residuals)
+    intervals = interval_columns(reconciled_samples.reshape(n, n_draws, horizons), 'reconciled', future_years)
+
+    result = nodes.copy()
+    result[f'current_{years[-1]}'] = node_history[:, -1]
+    for j, year in enumerate(future_years):
+        result[f'base_{year}'] = base[:, j]
+    for j, year in enumerate(future_years):
+        result[f'reconciled_{year}'] = reconciled[:, j]
+    for column, values in intervals.items():
+        result[column] = values
+    last = future_years[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result[f'adjustment_{last}_percent'] = np.where(
+            base[:, -1] > 0, (reconciled[:, -1] - base[:, -1]) / base[:, -1] * 100, np.nan)
+    numeric = result.columns[3:]
+    result[numeric] = result[numeric].round(3)
+    result.attrs.update(method=method, partners=len(history), regions=int((nodes['level'] == 'region').sum()),
+                        **details)
+    return result
+
+
+def coherence_gap(forecasts, year):
+    """World forecast minus the sum of the partner forecasts (percent of the world) for a column prefix"""
+    world = forecasts.loc[forecasts['level'] == 'world', f'{year}'].iloc[0]
+    partners = forecasts.loc[forecasts['level'] == 'partner', f'{year}'].sum()
+    return float((world - partners) / world * 100) if world else 0.0
+
+
+def main():
+    """Reconcile the WITS partner forecasts and print the world and region levels"""
+    import argparse
+    import os
+    import time
+    from pathlib import Path
+
+    from trade_tables import load_wits_partners
+
+    parser = argparse.ArgumentParser(description='Reconcile partner, region and world export forecasts')
+    parser.add_argument('--method', choices=METHODS, default='mint_shrink')
+    args = parser.parse_args()
+    os.chdir(Path(__file__).resolve().parent.parent)
+
+    print("🧮 FORECAST RECONCILIATION")
+    print("=" * 60)
+    start = time.perf_counter()
+    forecasts = reconcile_partner_forecasts(load_wits_partners(), method=args.method)
+    elapsed = time.perf_counter() - start
+    last = FUTURE_YEARS[-1]
+    print(f"   {forecasts.attrs['partners']} partners, {forecasts.attrs['regions']} regions, "
+          f"method {args.method} ({elapsed:.2f}s)")
+    print(f"   Base forecasts: world {last} differs from the partner sum by "
+          f"{coherence_gap(forecasts, f'base_{last}'):+.1f}%\n")
+    for _, row in forecasts[forecasts['level'] != 'partner'].iterrows():
+        print(f"   • {row['node']:<26} base ${row[f'base_{last}']:>9,.1f}M  "
+              f"reconciled ${row[f'reconciled_{last}']:>9,.1f}M")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""
+Rwanda Export Insights Pipeline
+Headless version of the analysis notebook (import_export1.ipynb): rebuilds the insights bundle in a
+staging directory, publishes it atomically and reports progress to a status file
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from forecast_intervals import partner_intervals
+from forecast_reconciliation import MODEL_VERSION
+from memo_cache import get_memo_cache, memoize
+from reexport_decomposition import DECOMPOSITION_VERSION
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INSIGHTS_DIR = 'data/insights'
+STATUS_PATH = 'data/insights/pipeline_status.json'
+LOCK_PATH = 'data/insights/pipeline.lock'
+LOG_PATH = 'data/insights/pipeline.log'
+GROWTH_ANALYSIS_PATH = 'data/wits/rwanda_exports_growth_analysis_2018_2022.csv'
+
+STAGES = [
+    ('load', 'Loading quarterly tables and WITS partner data'),
+    ('validate', 'Validating input tables'),
+    ('opportunities', 'Scoring commodity opportunities'),
+    ('forecast', 'Forecasting partner demand'),
+    ('reconcile', 'Reconciling partner, region and world forecasts'),
+    ('markets', 'Classifying strategic market tiers'),
+    ('anomalies', 'Scoring new quarters for anomalies'),
+    ('export', 'Extracting insights into a staging bundle'),
+    ('publish', 'Publishing the new bundle'),
+    ('figures', 'Precomputing dashboard figures')
+]
+
+
+@memoize(version=DECOMPOSITION_VERSION)
+def build_opportunity_analysis(commodities_df, reexports_df=None):
+    """
+    Opportunity score per commodity: growth (40%), market share (30%), stability (30%)
+
+    The score is computed on domestic exports. With reexports_df, each commodity also gets
+    its latest re-export ratio and re-export growth, so sectors that are mostly re-exported
+    can be told apart.
+    """
+    from trade_tables import period_columns
+
+    analysis = commodities_df.copy()
+    analysis['YoY_Growth'] = analysis['Change_Q3_Q3_Percent'].fillna(0)
+    analysis['Market_Share'] = analysis['Share_Percent_Q3'].fillna(0)
+
+    # Latest quarter of the table (the release being analysed) and the two calendar years up to it
+    periods = period_columns(analysis)
+    latest = periods[-1]
+    recent = [p for p in periods if p[:4] in (str(int(latest[:4]) - 1), latest[:4])]
+    if recent:
+        analysis['Volatility'] = analysis[recent].std(axis=1).fillna(0)
+    else:
+        analysis['Volatility'] = analysis['YoY_Growth'].abs()
+    max_volatility = analysis['Volatility'].max()
+    if max_volatility > 0:
+        analysis['Volatility'] = (analysis['Volatility'] / max_volatility * 100).clip(0, 100)
+
+    analysis[f'Current_Value_{latest}'] = analysis[latest].fillna(0)
+    analysis['Opportunity_Score'] = (
+        analysis['YoY_Growth'].clip(-100, 100) * 0.4 +
+        analysis['Market_Share'].clip(0, 100) * 0.3 +
+        (100 - analysis['Volatility']) * 0.3
+    ).clip(0, 100)
+
+    if reexports_df is not None:
+        from reexport_decomposition import decompose_exports, latest_decomposition, sitc_codes
+
+        decomposition = latest_decomposition(decompose_exports(commodities_df, reexports_df))
+        decomposition = decomposition.set_index(sitc_codes(decomposition))
+        codes = sitc_codes(analysis)
+        analysis[f'Gross_Value_{latest}'] = codes.map(decomposition['Gross_Exports']).to_numpy()
+        analysis['Reexport_Ratio'] = codes.map(decomposition['Reexport_Ratio_Percent']).to_numpy()
+        analysis['Reexport_YoY_Growth'] = codes.map(decomposition['Reexport_YoY_Percent']).to_numpy()
+    return analysis
+
+
+def quarterly_totals(commodities_df):
+    """Total exports per quarter (Quarter, Export_Value, QoQ_Growth in %)"""
+    from trade_tables import period_columns
+
+    periods = period_columns(commodities_df)
+    totals = pd.DataFrame({'Quarter': periods, 'Export_Value': commodities_df[periods].sum().to_numpy()})
+    # As in the notebook: feeds the average growth rate and the volatility index
+    totals['QoQ_Growth'] = totals['Export_Value'].pct_change() * 100
+    return totals
+
+
+def _r2(values, fitted):
+    """Coefficient of determination (1.0 for a perfect fit of a constant series, else 0.0)"""
+    ss_res = ((values - fitted) ** 2).sum()
+    ss_tot = ((values - values.mean()) ** 2).sum()
+    if ss_tot == 0:
+        return 1.0 if ss_res == 0 else 0.0
+    return 1 - ss_res / ss_tot
+
+
+@memoize(version=MODEL_VERSION)
+def forecast_partners(wits_df, future_years=(2023, 2024, 2025)):
+    """
+    Per-partner demand forecast: average of a linear and a quadratic trend fitted with
+    numpy.polyfit over the WITS history (same model as the notebook's scikit-learn version),
+    with residual-bootstrap P10 / P50 / P90 columns for every predicted year
+    """
+    forecasts = []
+    for partner, data in wits_df.groupby('Partner Name', sort=False):
+        if len(data) < 3:
+            continue
+        data = data.sort_values('Year')
+        years = data['Year'].to_numpy(dtype=float)
+        values = data['Export (US$ Thousand)'].to_numpy(dtype=float) / 1000
+        if values.sum() < 0.1:
+            continue
+
+        linear = np.polyfit(years, values, 1)
+        quadratic = np.polyfit(years, values, 2)
+        lr_r2 = _r2(values, np.polyval(linear, years))
+        poly_r2 = _r2(values, np.polyval(quadratic, years))
+
+        future = np.asarray(future_years, dtype=float)
+        ensemble = np.maximum((np.polyval(linear, future) + np.polyval(quadratic, future)) / 2, 0)
+
+        current = values[-1]
+        predicted_2025 = ensemble[-1]
+        avg_r2 = (lr_r2 + poly_r2) / 2
+        forecasts.append({
+            'country': partner,
+            'current_2022': current,
+            'predicted_2023': ensemble[0],
+            'predicted_2024': ensemble[1],
+            'predicted_2025': predicted_2025,
+            'predicted_growth_percent': (predicted_2025 - current) / current * 100 if current > 0 else 0,
+            'cagr_2022_2025': ((predicted_2025 / current) ** (1 / 3) - 1) * 100 if current > 0 else 0,
+            'lr_r2': lr_r2,
+            'poly_r2': poly_r2,
+            'confidence_score': max(0, min(100, avg_r2 * 100)),
+            'volatility': values.std() / values.mean() * 100 if values.mean() > 0 else 0,
+            'trend_strength': abs(linear[0]),
+            'historical_years': len(values),
+            'avg_r2': avg_r2
+        })
+
+    forecast_df = pd.DataFrame(forecasts)
+    if not forecast_df.empty:
+        intervals = partner_intervals(wits_df, forecast_df['country'], future_years)
+        forecast_df = forecast_df.join(intervals, on='country')
+        forecast_df = forecast_df.sort_values('predicted_2025', ascending=False)
+    return forecast_df
+
+
+@memoize
+def strategic_market_tiers(growth_analysis):
+    """Tier 1 (high-growth powerhouses), tier 2 (emerging) and tier 3 (untapped) markets"""
+    growth = growth_analysis[(growth_analysis['Years_of_Data'] >= 3) & (growth_analysis['Avg_Growth_Rate'] > 0)].copy()
+    growth['Growth_Momentum'] = (
+        growth['Avg_Growth_Rate'] * 0.6 +
+        (1 / (growth['Growth_Volatility'] + 1)) * 20 * 0.2 +
+        np.log(growth['Last_Year_Value'] + 1) * 0.2
+    )
+
+    tier1 = growth[
+        (growth['Avg_Growth_Rate'] > 30) & (growth['Last_Year_Value'] > 20)
+    ].sort_values('Growth_Momentum', ascending=False).head(5)
+    tier2 = growth[
+        (growth['Avg_Growth_Rate'] > 50) & (growth['Last_Year_Value'] > 5) &
+        (growth['Last_Year_Value'] < 50) & (growth['Growth_Volatility'] < 100)
+    ].sort_values('Avg_Growth_Rate', ascending=False).head(5)
+    tier3 = growth[
+        (growth['Avg_Growth_Rate'] > 20) & (growth['Last_Year_Value'] < 10) &
+        (growth['Growth_Volatility'] < 80)
+    ].sort_values('Growth_Momentum', ascending=False).head(5)
+    return tier1, tier2, tier3
+
+
+class PipelineStatus:
+    """Progress of a pipeline run, written atomically to a JSON file the dashboard polls"""
+
+    def __init__(self, path=STATUS_PATH, pid=None):
+        self.path = Path(path)
+        self.state = {
+            'state': 'running',
+            'pid': pid or os.getpid(),
+            'started_at': datetime.now().isoformat(),
+            'stage': None,
+            'step': 0,
+            'total_steps': len(STAGES),
+            'message': 'Starting',
+            'version': None,
+            'error': None
+        }
+
+    def write(self):
+        self.state['updated_at'] = datetime.now().isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        tmp_path.replace(self.path)
+
+    def stage(self, name):
+        step = [s for s, _ in STAGES].index(name) + 1
+        message = dict(STAGES)[name]
+        self.state.update(stage=name, step=step, message=message)
+        self.write()
+        print(f"[{step}/{len(STAGES)}] {message}...", flush=True)
+
+    def finish(self, version):
+        self.state.update(state='succeeded', step=len(STAGES), message='Published', version=version,
+                          finished_at=datetime.now().isoformat())
+        self.write()
+
+    def fail(self, error):
+        self.state.update(state='failed', message='Failed', error=error, finished_at=datetime.now().isoformat())
+        self.write()
+
+
+def read_status(path=STATUS_PATH):
+    """Last written pipeline status (None if the pipeline never ran)"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def pipeline_running(path=STATUS_PATH):
+    """True while a pipeline process is still working on a run"""
+    status = read_status(path)
+    return bool(status and status['state'] == 'running' and _pid_alive(status['pid']))
+
+
+def _acquire_lock(path=LOCK_PATH):
+    """Exclusive run lock (a file holding the owner pid); stale locks of dead processes are taken over"""
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(path, 'r') as f:
+                    owner = int(f.read().strip() or 0)
+            except (FileNotFoundError, ValueError):
+                owner = 0
+            if owner and _pid_alive(owner):
+                raise RuntimeError(f"Pipeline already running (pid {owner})")
+            Path(path).unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return
+    raise RuntimeError("Could not acquire the pipeline lock")
+
+
+def stage_bundle(insights_dir=INSIGHTS_DIR, **analysis):
+    """
+    Write a complete insights bundle into a new staging directory inside insights_dir
+
+    analysis holds the create_insights_export inputs; the caller publishes the returned
+    directory with insights_snapshot.publish_bundle.
+    """
+    from export_insights_extractor import create_insights_export
+
+    Path(insights_dir).mkdir(parents=True, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=insights_dir)
+    try:
+        create_insights_export(**analysis, output_dir=staging, precompute=False)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return staging
+
+
+def run_pipeline(insights_dir=INSIGHTS_DIR, status_path=STATUS_PATH):
+    """
+    Rebuild the insights bundle and publish it
+
+    The bundle is written to a staging directory next to the published one and moved into
+    place with publish_bundle, so readers see either the previous bundle or the new one.
+    Returns the published version.
+    """
+    from anomaly_detector import AnomalyDetector
+    from dashboard_figures import precompute_figures
+    from data_validation import validate_inputs
+    from forecast_reconciliation import reconcile_partner_forecasts
+    from insights_snapshot import publish_bundle
+    from trade_tables import load_quarterly_table, load_wits_partners
+
+    status = PipelineStatus(status_path)
+    lock_path = Path(insights_dir) / Path(LOCK_PATH).name
+    _acquire_lock(lock_path)
+    staging = None
+    try:
+        status.stage('load')
+        commodities_df = load_quarterly_table('exports_commodity')
+        countries_df = load_quarterly_table('export_country')
+        reexports_df = load_quarterly_table('reexports_commodity')
+        wits_df = load_wits_partners()
+        growth_analysis = pd.read_csv(GROWTH_ANALYSIS_PATH)
+
+        status.stage('validate')
+        validate_inputs(growth_df=growth_analysis).raise_for_errors()
+
+        status.stage('opportunities')
+        opportunity_analysis = build_opportunity_analysis(commodities_df, reexports_df)
+
+        status.stage('forecast')
+        forecast_df = forecast_partners(wits_df)
+
+        status.stage('reconcile')
+        reconciled_df = reconcile_partner_forecasts(wits_df)
+
+        status.stage('markets')
+        tier1, tier2, tier3 = strategic_market_tiers(growth_analysis)
+
+        status.stage('anomalies')
+        detector = AnomalyDetector()
+        detector.update()
+        anomalies_df = detector.scores()
+
+        status.stage('export')
+        staging = stage_bundle(
+            insights_dir,
+            commodities_df=commodities_df,
+            opportunity_analysis=opportunity_analysis,
+            quarterly_data=quarterly_totals(commodities_df),
+            tier1_markets=tier1,
+            tier2_markets=tier2,
+            tier3_markets=tier3,
+            forecast_df=forecast_df,
+            countries_df=countries_df,
+            wits_df=wits_df,
+            anomalies_df=anomalies_df,
+            reexports_df=reexports_df,
+            reconciled_df=reconciled_df
+        )
+
+        status.stage('publish')
+        version = publish_bundle(staging, insights_dir)['version']
+        staging = None
+
+        status.stage('figures')
+        precompute_figures(insights_dir)
+
+        status.finish(version)
+        return version
+    except Exception as e:
+        status.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        Path(lock_path).unlink(missing_ok=True)
+
+
+def launch_background(log_path=LOG_PATH, status_path=STATUS_PATH):
+    """
+    Start the pipeline in a detached worker process (returns None if one is already running)
+
+    The caller never waits on it: progress is read back with read_status().
+    """
+    if pipeline_running(status_path):
+        return None
+    Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+    # Mark the run as started before the worker exists, so pollers never see the previous
+    # outcome and the worker's own progress is never overwritten by this initial state
+    status = PipelineStatus(status_path)
+    status.write()
+    try:
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve())],
+                cwd=REPO_ROOT, stdout=log, stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL, start_new_session=True
+            )
+    except OSError as e:
+        status.fail(f"{type(e).__name__}: {e}")
+        raise
+    # Hand the run over to the worker's pid, unless the worker already wrote its own status
+    current = read_status(status_path)
+    if current and current.get('pid') == status.state['pid'] and current.get('started_at') == status.state['started_at']:
+        status.state['pid'] = process.pid
+        status.write()
+    # Reap the worker when it exits, so a crashed run does not linger as a live (zombie) pid
+    threading.Thread(target=process.wait, name='insights-pipeline-reaper', daemon=True).start()
+    return process
+
+
+def main():
+    """Run the full pipeline in the foreground"""
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+    print("🔄 RWANDA EXPORT INSIGHTS PIPELINE")
+    print("=" * 60)
+    start = time.perf_counter()
+    try:
+        version = run_pipeline()
+    except Exception:
+        traceback.print_exc()
+        sys.exit(1)
+    print(f"\n✅ Insights version {version} published in {time.perf_counter() - start:.1f}s")
+    stats = get_memo_cache().stats()
+    hits = sum(entry['hits'] for entry in stats.values())
+    misses = sum(entry['misses'] for entry in stats.values())
+    saved = sum(entry['seconds_saved'] for entry in stats.values())
+    print(f"   Memo cache: {hits} hits, {misses} misses ({saved:.2f}s of analysis reused)")
+
+
+if __name__ == "__main__":
+    main()
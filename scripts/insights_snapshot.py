@@ -0,0 +1,202 @@
+"""
+Rwanda Export Insights Snapshot
+Process-wide, versioned snapshot of the insights bundle (JSON + CSVs) that a background
+watcher hot-swaps atomically when a new pipeline run is published
+"""
+
+import hashlib
+import json
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from arrow_store import read_table
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def artifact_signature(directory, json_name='export_insights.json'):
+    """(name, size, mtime_ns) of the insights JSON and every CSV in the directory"""
+    directory = Path(directory)
+    paths = sorted(directory.glob('*.csv')) + [directory / json_name]
+    signature = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        signature.append((path.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def write_manifest(directory='data/insights', json_name='export_insights.json', generated_at=None):
+    """
+    Record the published artifacts (size + sha256) and a content version
+
+    Publishers write this last; readers that key on it never see a half-written bundle.
+    """
+    directory = Path(directory)
+    files = {}
+    for name, size, _ in artifact_signature(directory, json_name):
+        with open(directory / name, 'rb') as f:
+            files[name] = {'size': size, 'sha256': hashlib.sha256(f.read()).hexdigest()}
+
+    version = hashlib.sha1(json.dumps(files, sort_keys=True).encode()).hexdigest()[:12]
+    manifest = {
+        'version': version,
+        'generated_at': generated_at or datetime.now().isoformat(),
+        'files': files
+    }
+    tmp_path = directory / (MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    tmp_path.replace(directory / MANIFEST_NAME)
+    return manifest
+
+
+def publish_bundle(staging, directory='data/insights'):
+    """
+    Move a complete bundle (written with its manifest to a staging directory on the same
+    filesystem) into place: one atomic rename per file, manifest last
+    """
+    staging, directory = Path(staging), Path(directory)
+    with open(staging / MANIFEST_NAME, 'r') as f:
+        manifest = json.load(f)
+
+    for name in manifest['files']:
+        (staging / name).replace(directory / name)
+    (staging / MANIFEST_NAME).replace(directory / MANIFEST_NAME)
+    shutil.rmtree(staging, ignore_errors=True)
+    return manifest
+
+
+class InsightsSnapshot:
+    """One loaded version of the insights bundle; shared by every session, never mutated"""
+
+    def __init__(self, version, insights, tables, source):
+        self.version = version
+        self.insights = insights
+        self.tables = tables
+        self.source = source
+        self.loaded_at = datetime.now()
+
+    def table(self, name):
+        """CSV by file name or path (None if it is not part of the bundle)"""
+        frame = self.tables.get(Path(name).name)
+        # Shallow copy: callers may add columns without touching the shared frame
+        return None if frame is None else frame.copy(deep=False)
+
+
+class SnapshotStore:
+    """Holds the current snapshot and swaps in a new one when the artifacts change"""
+
+    def __init__(self, directory='data/insights', json_name='export_insights.json', poll_interval=5.0):
+        self.directory = Path(directory)
+        self.json_name = json_name
+        self.poll_interval = poll_interval
+        self._snapshot = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def current(self):
+        """The current snapshot (loaded on first use)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    def probe(self):
+        """
+        Version key of the artifacts on disk and whether it is safe to load
+
+        With an up-to-date manifest that matches the files the key is its version. Otherwise
+        the key is the file signature, which is only trusted once it is unchanged between two probes.
+        """
+        signature = artifact_signature(self.directory, self.json_name)
+        manifest_path = self.directory / MANIFEST_NAME
+        try:
+            manifest_mtime = manifest_path.stat().st_mtime_ns
+            newest = max((mtime for _, _, mtime in signature), default=0)
+            if manifest_mtime >= newest:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                # Only trusted while the files on disk are the ones it lists
+                sizes = {name: size for name, size, _ in signature}
+                if all(sizes.get(name) == meta['size'] for name, meta in manifest['files'].items()):
+                    return manifest['version'], True
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+
+        key = hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+        settled = key == self._pending
+        self._pending = key
+        return key, settled
+
+    def refresh(self, force=False):
+        """Load and swap in a new snapshot if the artifacts changed; returns True on swap"""
+        key, settled = self.probe()
+        current = self._snapshot
+        if current is not None and not force and (key == current.version or not settled):
+            return False
+
+        snapshot = self._load(key)
+        with self._lock:
+            if self._snapshot is None or force or self._snapshot.version != snapshot.version:
+                self._snapshot = snapshot
+                return True
+        return False
+
+    def _load(self, version):
+        insights = None
+        try:
+            with open(self.directory / self.json_name, 'r') as f:
+                insights = json.load(f)
+        except FileNotFoundError:
+            pass
+
+        tables = {}
+        for path in sorted(self.directory.glob('*.csv')):
+            # Mapped Arrow copy shared by every session (plain read_csv without pyarrow)
+            tables[path.name] = read_table(path)
+
+        source = 'manifest' if (self.directory / MANIFEST_NAME).exists() else 'files'
+        return InsightsSnapshot(version, insights, tables, source)
+
+    def start_watcher(self):
+        """Start the background thread that polls for new artifacts (idempotent)"""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name='insights-snapshot-watcher', daemon=True)
+            self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except (OSError, ValueError) as e:
+                # Partially written artifacts: keep serving the current snapshot
+                print(f"⚠️  Insights snapshot refresh skipped: {e}")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory='data/insights', poll_interval=5.0):
+    """Process-wide SnapshotStore for an insights directory"""
+    key = str(Path(directory).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SnapshotStore(directory, poll_interval=poll_interval)
+        return _stores[key]
@@ -0,0 +1,338 @@
+"""
+Rwanda Export Materialized Aggregates
+Named aggregate definitions with stored results that are refreshed incrementally,
+recomputing only the periods whose source rows were added, revised or removed since the last refresh
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from trade_tables import QUARTERLY_TABLES, WITS_PARTNERS_PATH, clean_quarterly_table, period_columns
+
+
+class AggregateDefinition:
+    """Named aggregate over a single source table"""
+
+    def __init__(self, name, source, group_by, measures, layout='long', period_column='Year',
+                 grain='period', filters=None, description=''):
+        """
+        Parameters:
+        -----------
+        source : str
+            Path of the source CSV (recorded in the manifest)
+        group_by : list
+            Grouping columns, excluding the period
+        measures : dict
+            {output_column: (source_column, aggregation)} as accepted by ``groupby.agg``
+        layout : 'long' or 'wide'
+            'long' sources carry a period column (WITS ``Year``); 'wide' sources carry one
+            column per quarter (NISR tables) and are melted into ``Period``/``Value``
+        grain : 'period' or 'year'
+            'year' rolls quarterly periods up to calendar years
+        filters : dict, optional
+            {column: allowed value(s)} applied before aggregation
+        """
+        self.name = name
+        self.source = source
+        self.group_by = list(group_by)
+        self.measures = measures
+        self.layout = layout
+        self.period_column = period_column if layout == 'long' else 'Period'
+        self.grain = grain
+        self.filters = filters or {}
+        self.description = description
+
+    @property
+    def output_period_column(self):
+        return 'Year' if self.grain == 'year' else self.period_column
+
+    def load_source(self):
+        """Read the source table from disk (wide tables through the mapped matrix cache)"""
+        if self.layout == 'wide':
+            from matrix_cache import get_matrix_cache
+
+            return get_matrix_cache().matrix(self.source).frame()
+        return pd.read_csv(self.source)
+
+    def source_periods(self, frame):
+        """All source periods present in the frame, in order"""
+        if self.layout == 'wide':
+            return period_columns(frame)
+        return sorted(frame[self.period_column].dropna().unique().tolist())
+
+    def output_period(self, period):
+        """Map a source period onto the period of the stored aggregate"""
+        if self.grain == 'year':
+            return int(str(period)[:4])
+        return period
+
+    def period_signatures(self, frame):
+        """
+        {source period (as str): content hash} of the rows feeding each period
+
+        Compared with the signatures stored at the last refresh, they tell which periods were
+        added, revised or removed, whether the source is a file or an in-memory frame.
+        """
+        columns = '|'.join(str(c) for c in frame.columns).encode()
+        if self.layout == 'wide':
+            periods = period_columns(frame)
+            labels = frame[[c for c in frame.columns if c not in periods]]
+            label_hash = pd.util.hash_pandas_object(labels, index=False).to_numpy().tobytes()
+            return {str(p): hashlib.sha1(columns + label_hash + pd.util.hash_pandas_object(
+                        frame[p], index=False).to_numpy().tobytes()).hexdigest()
+                    for p in periods}
+        row_hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        period_values = frame[self.period_column].to_numpy()
+        return {str(p): hashlib.sha1(columns + row_hashes[period_values == p].tobytes()).hexdigest()
+                for p in self.source_periods(frame)}
+
+    def period_from_key(self, key):
+        """Source period of a period_signatures key (long sources keep numeric years)"""
+        return int(key) if self.layout == 'long' and key.isdigit() else key
+
+    def new_slice(self, frame, touched=None):
+        """
+        Long-format slice holding every source period that feeds one of the touched output
+        periods (all periods when touched is None)
+        """
+        periods = self.source_periods(frame)
+        if touched is not None:
+            periods = [p for p in periods if self.output_period(p) in touched]
+
+        if not periods:
+            return None
+
+        if self.layout == 'wide':
+            frame = clean_quarterly_table(frame)
+            id_vars = [col for col in frame.columns if col not in period_columns(frame)]
+            data = frame.melt(id_vars=id_vars, value_vars=periods,
+                              var_name='Period', value_name='Value')
+        else:
+            data = frame[frame[self.period_column].isin(periods)]
+
+        for column, allowed in self.filters.items():
+            allowed = allowed if isinstance(allowed, (list, tuple, set)) else [allowed]
+            data = data[data[column].isin(allowed)]
+
+        if self.grain == 'year':
+            data = data.assign(Year=data[self.period_column].map(self.output_period))
+
+        return data
+
+    def aggregate(self, data):
+        """Aggregate a long-format slice into stored rows"""
+        keys = self.group_by + [self.output_period_column]
+        result = data.groupby(keys, dropna=False).agg(**self.measures).reset_index()
+        return result.round(2)
+
+
+DEFAULT_DEFINITIONS = [
+    AggregateDefinition(
+        'wits_yearly', WITS_PARTNERS_PATH, [],
+        {
+            'Total_Exports_M': ('Export_Value_Millions', 'sum'),
+            'Export_Transactions': ('Export_Value_Millions', 'count'),
+            'Unique_Partners': ('Partner Name', 'nunique'),
+            'Total_Products': ('No Of exported HS6 digit Products', 'sum')
+        },
+        description='WITS exports per year (rwanda_exports_yearly_summary)'
+    ),
+    AggregateDefinition(
+        'wits_regional', WITS_PARTNERS_PATH, ['Region'],
+        {
+            'Export_Value_Millions': ('Export_Value_Millions', 'sum'),
+            'Partner Name': ('Partner Name', 'nunique')
+        },
+        description='WITS exports per region and year (rwanda_exports_regional_analysis)'
+    ),
+    AggregateDefinition(
+        'bloc_quarterly', QUARTERLY_TABLES['regional_blocks']['path'], ['Regional_Block', 'Flow_Type'],
+        {'Value': ('Value', 'sum')}, layout='wide',
+        description='Trade per regional bloc, flow and quarter'
+    ),
+    AggregateDefinition(
+        'bloc_annual', QUARTERLY_TABLES['regional_blocks']['path'], ['Regional_Block', 'Flow_Type'],
+        {'Value': ('Value', 'sum'), 'Quarters': ('Period', 'nunique')}, layout='wide', grain='year',
+        description='Trade per regional bloc, flow and calendar year'
+    ),
+    AggregateDefinition(
+        'continent_quarterly', QUARTERLY_TABLES['continents']['path'], ['Flow_Type', 'Continent'],
+        {'Value': ('Value', 'sum')}, layout='wide',
+        description='Trade per continent, flow and quarter'
+    ),
+    AggregateDefinition(
+        'continent_annual', QUARTERLY_TABLES['continents']['path'], ['Flow_Type', 'Continent'],
+        {'Value': ('Value', 'sum'), 'Quarters': ('Period', 'nunique')}, layout='wide', grain='year',
+        description='Trade per continent, flow and calendar year'
+    )
+]
+
+
+def _source_signature(path):
+    """Cheap change marker for a source file (size + mtime)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _to_json_value(value):
+    """Convert numpy scalars to plain JSON values"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class MaterializedAggregateStore:
+    """Stored aggregate results plus a manifest of sources, watermarks and per-period signatures"""
+
+    def __init__(self, root='data/aggregates', definitions=None):
+        self.root = Path(root)
+        self.definitions = {d.name: d for d in (definitions or DEFAULT_DEFINITIONS)}
+        self.manifest_path = self.root / 'manifest.json'
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def result_path(self, name):
+        return self.root / f"{name}.csv"
+
+    def get(self, name):
+        """Stored result of an aggregate (None if it was never materialized)"""
+        try:
+            return pd.read_csv(self.result_path(name))
+        except FileNotFoundError:
+            return None
+
+    def watermark(self, name):
+        return self.manifest.get(name, {}).get('watermark')
+
+    def refresh(self, names=None, frames=None, full=False):
+        """
+        Bring aggregates up to date with their sources
+
+        Parameters:
+        -----------
+        names : list, optional
+            Aggregates to refresh (all definitions by default)
+        frames : dict, optional
+            {name: DataFrame} in-memory sources that replace reading ``definition.source``
+        full : bool
+            Ignore the stored results and recompute from the complete source
+
+        Returns a {name: status} summary.
+        """
+        frames = frames or {}
+        summary = {}
+
+        for name in names or list(self.definitions):
+            definition = self.definitions[name]
+            entry = self.manifest.get(name, {})
+            stored = None if full else self.get(name)
+            signature = None if name in frames else _source_signature(definition.source)
+
+            if stored is not None and signature is not None and signature == entry.get('source_signature'):
+                summary[name] = {'status': 'unchanged', 'periods_refreshed': []}
+                continue
+
+            frame = frames[name] if name in frames else definition.load_source()
+            periods = definition.source_periods(frame)
+            signatures = definition.period_signatures(frame)
+            previous = entry.get('period_signatures') if stored is not None else None
+
+            # Any period whose rows differ from the last refresh is recomputed, so revised
+            # history is picked up as well as newly arrived periods
+            if previous is None:
+                changed = None
+            else:
+                changed = [key for key in signatures.keys() | previous.keys()
+                           if signatures.get(key) != previous.get(key)]
+
+            if changed == []:
+                status, added = 'up-to-date', []
+            else:
+                period_col = definition.output_period_column
+                touched = None if changed is None else {
+                    definition.output_period(definition.period_from_key(key)) for key in changed
+                }
+                data = definition.new_slice(frame, touched)
+                result = definition.aggregate(data) if data is not None else None
+                if stored is not None:
+                    stored = stored[~stored[period_col].isin(touched)]
+                    result = stored if result is None else pd.concat([stored, result], ignore_index=True)
+                if result is None:
+                    result = pd.DataFrame(columns=definition.group_by + [period_col] + list(definition.measures))
+                result = result.sort_values(definition.group_by + [period_col]).reset_index(drop=True)
+                self._write_result(name, result)
+                added = sorted(touched) if touched is not None else sorted(result[period_col].unique().tolist())
+                watermark = entry.get('watermark')
+                if changed is None:
+                    status = 'rebuilt'
+                elif all(key not in previous and (watermark is None or definition.period_from_key(key) > watermark)
+                         for key in changed):
+                    status = 'folded'
+                else:
+                    status = 'revised'
+
+            self.manifest[name] = {
+                'source': definition.source,
+                'description': definition.description,
+                'group_by': definition.group_by,
+                'period_column': definition.output_period_column,
+                'watermark': _to_json_value(periods[-1]) if periods else None,
+                'source_signature': signature,
+                'period_signatures': signatures,
+                'refreshed_at': datetime.now().isoformat()
+            }
+            summary[name] = {'status': status, 'periods_refreshed': [_to_json_value(p) for p in added]}
+
+        self._save_manifest()
+        return summary
+
+    def _write_result(self, name, result):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.result_path(name)
+        tmp_path = path.with_suffix('.csv.tmp')
+        result.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def main():
+    """Refresh all materialized aggregates"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Refresh materialized export aggregates')
+    parser.add_argument('names', nargs='*', help='Aggregates to refresh (default: all)')
+    parser.add_argument('--root', default='data/aggregates', help='Directory holding stored aggregates')
+    parser.add_argument('--full', action='store_true', help='Recompute from scratch, ignoring stored results')
+    args = parser.parse_args()
+
+    print("🔄 REFRESHING MATERIALIZED AGGREGATES")
+    print("=" * 60)
+
+    store = MaterializedAggregateStore(args.root)
+    summary = store.refresh(args.names or None, full=args.full)
+
+    for name, result in summary.items():
+        refreshed = ', '.join(str(p) for p in result['periods_refreshed']) or '-'
+        print(f"   • {name:<22} {result['status']:<11} watermark={store.watermark(name)}  refreshed: {refreshed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Rwanda Export Matrix Cache
+The numeric period block of each wide quarterly table stored once as a .npy file and memory-mapped
+read-only, with its entity labels and periods alongside, rebuilt when the source CSV changes
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from arrow_store import read_csv_frame
+from trade_tables import QUARTERLY_TABLES, clean_quarterly_table, period_columns
+
+MATRIX_DIR = 'data/cache/matrix'
+# Bump when the stored layout or the cleaning it bakes in changes
+FORMAT_VERSION = 1
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_slug(source):
+    """Cache folder of a source: <folder>_<stem>, safe for any file name"""
+    source = Path(source)
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in f"{source.parent.name}_{source.stem}")
+
+
+class QuarterlyMatrix:
+    """A wide quarterly table as a mapped float matrix (rows x periods) plus its labels"""
+
+    def __init__(self, entry_dir, label_columns=None):
+        """
+        Parameters:
+        -----------
+        entry_dir : Path
+            Cache entry holding values.npy, labels.pkl and meta.json
+        label_columns : list, optional
+            Columns identifying a row (defaults to the non-numeric non-period columns)
+        """
+        self.path = Path(entry_dir)
+        with open(self.path / 'meta.json', 'r') as f:
+            self.meta = json.load(f)
+        self.values = np.load(self.path / 'values.npy', mmap_mode='r')
+        self.periods = list(self.meta['periods'])
+        self.labels = pd.read_pickle(self.path / 'labels.pkl')
+        if label_columns is None:
+            label_columns = [col for col in self.labels.columns
+                             if not pd.api.types.is_numeric_dtype(self.labels[col])]
+        self.label_columns = list(label_columns)
+        if len(self.label_columns) > 1:
+            self.entities = pd.MultiIndex.from_frame(self.labels[self.label_columns])
+        elif self.label_columns:
+            self.entities = pd.Index(self.labels[self.label_columns[0]])
+        else:
+            self.entities = pd.RangeIndex(len(self.labels))
+        self.period_index = {period: j for j, period in enumerate(self.periods)}
+        self.nbytes = self.values.nbytes
+        # Held for the life of the matrix: frames built on it see a live reference, so pandas
+        # copy-on-write copies a column before writing instead of hitting the read-only map
+        self._values_frame = pd.DataFrame(self.values, columns=self.periods, copy=False)
+
+    def column(self, period):
+        """Values of one period across all rows (a view of the mapped matrix)"""
+        return self.values[:, self.period_index[period]]
+
+    def row(self, entity):
+        """Values of one entity across all periods"""
+        return self.values[self.entities.get_loc(entity)]
+
+    def frame(self):
+        """
+        The cleaned wide table, its period columns built on the mapped pages
+
+        Columns keep the source order. Writes go through pandas copy-on-write, so callers may
+        modify the result without touching the shared matrix.
+        """
+        frame = pd.concat([self.labels, self._values_frame], axis=1)
+        return frame[self.meta['columns']]
+
+
+class MatrixCache:
+    """Matrices of CSV sources, rebuilt when a source's contents change and mapped once per process"""
+
+    def __init__(self, directory=MATRIX_DIR):
+        self.directory = Path(directory)
+        self._matrices = {}
+        self._lock = threading.Lock()
+
+    def _read_current(self, folder):
+        try:
+            with open(folder / 'current.json', 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_current(self, folder, current):
+        tmp_path = folder / f"current.json.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(current, f, indent=2)
+        tmp_path.replace(folder / 'current.json')
+
+    def build(self, source, entry_dir, sha256):
+        """Parse and clean a source once and write its matrix entry"""
+        frame = clean_quarterly_table(read_csv_frame(source))
+        periods = period_columns(frame)
+        others = [col for col in frame.columns if col not in periods]
+
+        tmp_dir = entry_dir.with_name(f"{entry_dir.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        # Column-major, so every period column is one contiguous run of the mapped file
+        np.save(tmp_dir / 'values.npy', np.asfortranarray(frame[periods].to_numpy(dtype=float)))
+        frame[others].reset_index(drop=True).to_pickle(tmp_dir / 'labels.pkl')
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump({'source': str(source), 'sha256': sha256, 'version': FORMAT_VERSION,
+                       'rows': len(frame), 'periods': periods, 'columns': [str(c) for c in frame.columns]},
+                      f, indent=2)
+        try:
+            tmp_dir.replace(entry_dir)
+        except OSError:
+            # Another process published the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def entry(self, source, force=False):
+        """
+        Entry directory for the current contents of a source, building it when needed
+
+        A matching size and mtime skip hashing; otherwise the source is hashed and only a
+        content change triggers a rebuild (a touched or re-checked-out file does not).
+        """
+        source = Path(source)
+        stat = source.stat()
+        folder = self.directory / _source_slug(source)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        current = self._read_current(folder)
+        if (not force and current and current.get('version') == FORMAT_VERSION
+                and current.get('size') == stat.st_size and current.get('mtime_ns') == stat.st_mtime_ns
+                and (folder / current['entry']).exists()):
+            return folder / current['entry']
+
+        sha256 = _file_sha256(source)
+        name = f"{sha256[:16]}-v{FORMAT_VERSION}"
+        entry_dir = folder / name
+        if force or not entry_dir.exists():
+            if force:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            self.build(source, entry_dir, sha256)
+        self._write_current(folder, {'entry': name, 'version': FORMAT_VERSION, 'size': stat.st_size,
+                                     'mtime_ns': stat.st_mtime_ns, 'sha256': sha256})
+
+        # Earlier entries go; processes still mapping them keep their pages until they let go
+        for old in folder.iterdir():
+            if old.is_dir() and old.name != name and not old.name.endswith('.tmp'):
+                shutil.rmtree(old, ignore_errors=True)
+        return entry_dir
+
+    def matrix(self, source, label_columns=None):
+        """QuarterlyMatrix of a CSV source, mapped once per process per entry"""
+        entry_dir = self.entry(source)
+        key = (str(Path(source).resolve()), tuple(label_columns or ()))
+        with self._lock:
+            cached = self._matrices.get(key)
+            if cached is None or cached.path != entry_dir:
+                cached = QuarterlyMatrix(entry_dir, label_columns)
+                self._matrices[key] = cached
+            return cached
+
+    def clear(self):
+        """Remove every stored matrix"""
+        with self._lock:
+            self._matrices.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_matrix_cache(directory=MATRIX_DIR):
+    """Process-wide MatrixCache for a directory"""
+    key = str(Path(directory).resolve())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = MatrixCache(directory)
+        return _caches[key]
+
+
+def load_matrix(name, path=None, directory=MATRIX_DIR):
+    """QuarterlyMatrix of a registered quarterly table"""
+    return get_matrix_cache(directory).matrix(path or QUARTERLY_TABLES[name]['path'],
+                                              QUARTERLY_TABLES[name]['label_columns'])
+
+
+def main():
+    """Build (or rebuild) the matrices of every registered quarterly table"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Build the memory-mapped quarterly matrices')
+    parser.add_argument('--directory', default=MATRIX_DIR, help='Cache directory')
+    parser.add_argument('--force', action='store_true', help='Rebuild even when the sources are unchanged')
+    args = parser.parse_args()
+    os.chdir(Path(__file__).resolve().parent.parent)
+
+    print("🧮 QUARTERLY MATRIX CACHE")
+    print("=" * 60)
+    cache = MatrixCache(args.directory)
+    for name, spec in QUARTERLY_TABLES.items():
+        start = time.perf_counter()
+        cache.entry(spec['path'], force=args.force)
+        matrix = cache.matrix(spec['path'], spec['label_columns'])
+        elapsed = time.perf_counter() - start
+        print(f"   • {name:<22} {matrix.values.shape[0]:>4} x {matrix.values.shape[1]:<3} "
+              f"{matrix.nbytes / 1024:>7,.1f} KB  {elapsed * 1000:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
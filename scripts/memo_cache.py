@@ -0,0 +1,266 @@
+"""
+Rwanda Export Memo Cache
+Disk memoization of pure analysis functions, keyed on a content hash of their input frames and
+parameters, with compressed values, size-bounded LRU eviction and hit/miss statistics
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MEMO_DIR = 'data/cache/memo'
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def _update_digest(digest, value):
+    """Feed a value's content (not its identity) into a hashlib digest"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode())
+        else:
+            digest.update(repr((value.name, str(value.dtype))).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts): fall back to the pickled frame
+            digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        if value.dtype.hasobject:
+            digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}".encode())
+        for item in value:
+            _update_digest(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _update_digest(digest, key)
+            _update_digest(digest, value[key])
+    elif value is None or isinstance(value, (str, bytes, bool, int, float, np.generic)):
+        digest.update(f"{type(value).__name__}:{value!r}".encode())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def content_hash(*values):
+    """sha256 hex digest of the contents of the given values"""
+    digest = hashlib.sha256()
+    for value in values:
+        _update_digest(digest, value)
+    return digest.hexdigest()
+
+
+def _function_identity(func, version=None):
+    """Module, qualified name and a hash of the source, so editing a function invalidates its entries"""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ''
+    module = func.__module__
+    if module == '__main__':
+        # A script run directly shares entries with the same module imported elsewhere
+        module = Path(inspect.getfile(func)).stem
+    return f"{module}.{func.__qualname__}", hashlib.sha1(f"{source}|{version}".encode()).hexdigest()
+
+
+class MemoCache:
+    """Compressed pickled results on disk, evicted least-recently-used beyond max_bytes"""
+
+    def __init__(self, directory=MEMO_DIR, max_bytes=MAX_BYTES, compress_level=6):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def path(self, name, key):
+        return self.directory / name / f"{key}.pkl.z"
+
+    def _count(self, name, field, amount=1):
+        with self._lock:
+            entry = self._stats.setdefault(name, {'hits': 0, 'misses': 0, 'writes': 0,
+                                                   'evictions': 0, 'seconds_saved': 0.0})
+            entry[field] += amount
+
+    def load(self, name, key):
+        """(True, value) for a stored entry, else (False, None); a hit refreshes its LRU position"""
+        path = self.path(name, key)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            value, seconds = pickle.loads(zlib.decompress(payload))
+        except FileNotFoundError:
+            return False, None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, ValueError):
+            # Truncated or foreign file: treat as a miss and let the store overwrite it
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(name, 'seconds_saved', seconds)
+        return True, value
+
+    def store(self, name, key, value, seconds=0.0):
+        """Write an entry atomically (silently skipped on read-only deployments)"""
+        path = self.path(name, key)
+        try:
+            payload = zlib.compress(pickle.dumps((value, seconds), protocol=pickle.HIGHEST_PROTOCOL),
+                                    self.compress_level)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            tmp_path.replace(path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return
+        self._count(name, 'writes')
+        self.evict()
+
+    def entries(self):
+        """(path, size, last used) of every stored entry"""
+        if not self.directory.exists():
+            return []
+        result = []
+        for path in self.directory.glob('*/*.pkl.z'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            result.append((path, stat.st_size, stat.st_mtime))
+        return result
+
+    def evict(self):
+        """Delete least-recently-used entries until the store fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+            self._count(path.parent.name, 'evictions')
+        return evicted
+
+    def clear(self, name=None):
+        """Remove all entries (or those of one function)"""
+        removed = 0
+        for path, _, _ in self.entries():
+            if name is None or path.parent.name == name:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self):
+        """Per-function hit/miss counters of this process plus entries and bytes on disk"""
+        with self._lock:
+            stats = {name: dict(counters) for name, counters in self._stats.items()}
+        for path, size, _ in self.entries():
+            entry = stats.setdefault(path.parent.name, {'hits': 0, 'misses': 0, 'writes': 0,
+                                                        'evictions': 0, 'seconds_saved': 0.0})
+            entry['entries'] = entry.get('entries', 0) + 1
+            entry['bytes'] = entry.get('bytes', 0) + size
+        for entry in stats.values():
+            lookups = entry['hits'] + entry['misses']
+            entry['hit_rate'] = entry['hits'] / lookups if lookups else None
+            entry.setdefault('entries', 0)
+            entry.setdefault('bytes', 0)
+        return stats
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_memo_cache(directory=MEMO_DIR):
+    """Process-wide MemoCache for a directory"""
+    key = str(Path(directory).resolve())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = MemoCache(directory)
+        return _caches[key]
+
+
+def memoize(func=None, *, directory=MEMO_DIR, version=None):
+    """
+    Decorator caching a pure function's result on disk, keyed on its arguments' contents
+
+    Arguments are bound to the signature first, so f(df, 3) and f(df, top_n=3) share an entry.
+    The key includes the function's source; pass version= to invalidate entries when a helper
+    the function calls changes. Every call returns a fresh copy (a cached value is unpickled
+    per hit), so callers may mutate results freely.
+    """
+    def decorate(func):
+        name, code_hash = _function_identity(func, version)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_memo_cache(directory)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = content_hash(code_hash, bound.arguments)
+
+            found, value = cache.load(name, key)
+            if found:
+                cache._count(name, 'hits')
+                return value
+            cache._count(name, 'misses')
+            start = time.perf_counter()
+            value = func(*args, **kwargs)
+            cache.store(name, key, value, time.perf_counter() - start)
+            return value
+
+        wrapper.memo_name = name
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def main():
+    """Show or clear the memo cache"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect the analysis memo cache')
+    parser.add_argument('--directory', default=MEMO_DIR, help='Cache directory')
+    parser.add_argument('--clear', nargs='?', const='', default=None, metavar='FUNCTION',
+                        help='Remove every entry (or only those of one function)')
+    args = parser.parse_args()
+
+    print("🗄️  ANALYSIS MEMO CACHE")
+    print("=" * 60)
+    cache = MemoCache(args.directory)
+    if args.clear is not None:
+        removed = cache.clear(args.clear or None)
+        print(f"   • Removed {removed} entries")
+        return
+
+    stats = cache.stats()
+    if not stats:
+        print(f"   • {args.directory} is empty")
+        return
+    for name, entry in sorted(stats.items()):
+        print(f"   • {name:<55} {entry['entries']:>4} entries  {entry['bytes'] / 1024:>9,.1f} KB")
+    total = sum(entry['bytes'] for entry in stats.values())
+    print(f"\n   Total {total / 1024 / 1024:,.2f} MB of {cache.max_bytes / 1024 / 1024:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Rwanda Export Paged Tables
+Server-side search, column filters, sorting and pagination over snapshot tables, so the
+dashboard only sends the visible window to the browser
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class _IterStream(io.RawIOBase):
+    """Read-only binary stream over an iterator of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+class PagedTable:
+    """A read-only table with cached sort orders and query results"""
+
+    def __init__(self, frame, max_queries=64):
+        self.frame = frame.reset_index(drop=True)
+        self.max_queries = max_queries
+        self._search_text = None
+        self._orders = {}
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def columns(self):
+        return self.frame.columns.tolist()
+
+    def _search(self, text):
+        """Rows where any column contains the text (case-insensitive)"""
+        if self._search_text is None:
+            joined = self.frame.fillna('').astype(str).agg('\x1f'.join, axis=1)
+            self._search_text = joined.str.lower()
+        return self._search_text.str.contains(text.lower(), regex=False).to_numpy()
+
+    def _order(self, column, ascending):
+        """Row positions sorted by a column (computed once per column and direction)"""
+        key = (column, ascending)
+        if key not in self._orders:
+            self._orders[key] = self.frame[column].sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            ).index.to_numpy()
+        return self._orders[key]
+
+    def select(self, search='', filters=None, sort_by=None, ascending=True):
+        """
+        Row positions of the filtered, sorted result
+
+        Parameters:
+        -----------
+        search : str
+            Case-insensitive substring matched against every column
+        filters : dict, optional
+            {column: list of allowed values} or {column: (low, high)} for numeric ranges
+        sort_by : str, optional
+            Column to sort by
+        """
+        filters = filters or {}
+        key = (search, tuple(sorted((k, tuple(v)) for k, v in filters.items())), sort_by, ascending)
+        with self._lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+
+        mask = np.ones(len(self.frame), dtype=bool)
+        if search:
+            mask &= self._search(search)
+        for column, allowed in filters.items():
+            values = self.frame[column]
+            if isinstance(allowed, tuple) and len(allowed) == 2 and pd.api.types.is_numeric_dtype(values):
+                mask &= values.between(*allowed).to_numpy()
+            elif allowed:
+                mask &= values.isin(list(allowed)).to_numpy()
+
+        if sort_by:
+            order = self._order(sort_by, ascending)
+            positions = order[mask[order]]
+        else:
+            positions = np.flatnonzero(mask)
+
+        with self._lock:
+            self._queries[key] = positions
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+        return positions
+
+    def page(self, positions, page=1, page_size=25, columns=None):
+        """The rows of one page (1-based) and the page count"""
+        page_count = max(1, -(-len(positions) // page_size))
+        page = min(max(1, page), page_count)
+        window = positions[(page - 1) * page_size:page * page_size]
+        frame = self.frame.iloc[window]
+        return (frame[columns] if columns else frame), page_count
+
+    def iter_csv(self, positions, columns=None, chunk_size=10_000):
+        """CSV text of the full result, yielded in chunks (header first)"""
+        columns = columns or self.columns
+        yield self.frame.iloc[:0][columns].to_csv(index=False)
+        for start in range(0, len(positions), chunk_size):
+            chunk = self.frame.iloc[positions[start:start + chunk_size]][columns]
+            yield chunk.to_csv(index=False, header=False)
+
+    def csv_stream(self, positions, columns=None, chunk_size=10_000):
+        """Binary file-like object streaming the full result as CSV"""
+        chunks = (text.encode('utf-8') for text in self.iter_csv(positions, columns, chunk_size))
+        return io.BufferedReader(_IterStream(chunks))
+
+
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def get_paged_table(snapshot, name, max_tables=16):
+    """Process-wide PagedTable for a snapshot table (None if the table is missing)"""
+    key = (snapshot.version, name)
+    with _tables_lock:
+        if key in _tables:
+            _tables.move_to_end(key)
+            return _tables[key]
+
+    frame = snapshot.table(name)
+    table = None if frame is None else PagedTable(frame)
+    with _tables_lock:
+        _tables[key] = table
+        while len(_tables) > max_tables:
+            _tables.popitem(last=False)
+    return table
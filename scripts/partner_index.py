@@ -0,0 +1,146 @@
+"""
+Rwanda Export Partner Index
+Precomputed bitmap indexes over the WITS partner data (partner, region, year, value band) so
+that every cross-filter interaction is a bitwise set intersection instead of a DataFrame scan
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from trade_hierarchy import wits_country_rows
+from trade_tables import WITS_PARTNERS_PATH, load_wits_partners
+
+# Export value bands (US$ millions) used as the fourth explorer dimension
+VALUE_BANDS = [0, 1, 10, 50, 100, np.inf]
+VALUE_BAND_LABELS = ['< $1M', '$1M - $10M', '$10M - $50M', '$50M - $100M', '> $100M']
+
+DIMENSIONS = {
+    'partner': 'Partner Name',
+    'region': 'Region',
+    'year': 'Year',
+    'value_band': 'Value_Band'
+}
+
+
+class PartnerIndex:
+    """Per-dimension codes with packed bitmaps (one per value) or a sorted-code index"""
+
+    def __init__(self, wits_df, measure='Export_Value_Millions', exclude_aggregates=True, max_bitmap_labels=256):
+        """
+        Parameters:
+        -----------
+        max_bitmap_labels : int
+            Dimensions with more distinct values (e.g. partners at product level) use a
+            sorted-code index instead of one bitmap per value
+        """
+        if exclude_aggregates:
+            wits_df = wits_country_rows(wits_df)
+        df = wits_df.reset_index(drop=True)
+        df = df.assign(Value_Band=pd.cut(df[measure], VALUE_BANDS, labels=VALUE_BAND_LABELS, right=False))
+
+        self.n_rows = len(df)
+        self.measure = measure
+        self.values = df[measure].fillna(0).to_numpy(dtype=float)
+        self.frame = df
+        self.codes = {}
+        self.labels = {}
+        self.bitmaps = {}
+        self.postings = {}
+
+        for dim, column in DIMENSIONS.items():
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                codes = df[column].cat.codes.to_numpy()
+                labels = df[column].cat.categories.tolist()
+            else:
+                codes, labels = pd.factorize(df[column], sort=True)
+                labels = labels.tolist()
+            codes = codes.astype(np.int32)
+            self.codes[dim] = codes
+            self.labels[dim] = [str(label) for label in labels]
+            if len(labels) <= max_bitmap_labels:
+                # (labels x rows) membership, packed 8 rows per byte
+                self.bitmaps[dim] = np.stack([np.packbits(codes == c) for c in range(len(labels))]) \
+                    if len(labels) else np.zeros((0, (self.n_rows + 7) // 8), dtype=np.uint8)
+            else:
+                # High-cardinality dimension: rows sorted by code plus per-code offsets
+                order = np.argsort(codes, kind='stable')
+                offsets = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+                self.postings[dim] = (order, offsets)
+
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def code_of(self, dim, labels):
+        """Codes of the given labels in a dimension (unknown labels are ignored)"""
+        lookup = {label: code for code, label in enumerate(self.labels[dim])}
+        return [lookup[str(label)] for label in labels if str(label) in lookup]
+
+    def bitmap(self, selections, exclude=None):
+        """
+        Packed row bitmap matching every selection: OR within a dimension, AND across
+        dimensions. The `exclude` dimension is ignored (cross-filter view of that dimension).
+        """
+        result = self._all
+        for dim, labels in selections.items():
+            if dim == exclude or not labels:
+                continue
+            result = result & self._dimension_bitmap(dim, self.code_of(dim, labels))
+        return result
+
+    def _dimension_bitmap(self, dim, codes):
+        """Packed bitmap of rows holding any of the codes"""
+        if not codes:
+            return np.zeros_like(self._all)
+        if dim in self.bitmaps:
+            return np.bitwise_or.reduce(self.bitmaps[dim][codes], axis=0)
+        order, offsets = self.postings[dim]
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for code in codes:
+            mask[order[offsets[code]:offsets[code + 1]]] = True
+        return np.packbits(mask)
+
+    def rows(self, selections, exclude=None):
+        """Row positions matching the selections"""
+        return np.flatnonzero(np.unpackbits(self.bitmap(selections, exclude), count=self.n_rows))
+
+    def facet(self, dim, selections):
+        """
+        Measure total and row count per value of one dimension, filtered by the selections
+        on all other dimensions
+        """
+        rows = self.rows(selections, exclude=dim)
+        rows = rows[self.codes[dim][rows] >= 0]
+        codes = self.codes[dim][rows]
+        size = len(self.labels[dim])
+        return pd.DataFrame({
+            'label': self.labels[dim],
+            'value': np.bincount(codes, weights=self.values[rows], minlength=size),
+            'count': np.bincount(codes, minlength=size)
+        })
+
+    def summary(self, selections):
+        """Totals of the fully filtered selection"""
+        rows = self.rows(selections)
+        return {
+            'rows': len(rows),
+            'value': float(self.values[rows].sum()),
+            'partners': int(np.unique(self.codes['partner'][rows]).size)
+        }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_partner_index(path=WITS_PARTNERS_PATH):
+    """Process-wide PartnerIndex, rebuilt only when the WITS file changes"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _indexes_lock:
+        if key not in _indexes:
+            for old in [k for k in _indexes if k[0] == key[0]]:
+                del _indexes[old]
+            _indexes[key] = PartnerIndex(load_wits_partners(path))
+        return _indexes[key]
@@ -0,0 +1,386 @@
+"""
+Rwanda Export Pipeline Runner
+Dependency-aware refresh from the raw NISR/WITS files to the published insights: every stage declares
+its input and output files, stages whose inputs hash the same as on their last run are skipped, and
+independent stages run in parallel worker processes
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = 'data/pipeline'
+STATE_PATH = 'data/pipeline/state.json'
+VALIDATION_PATH = 'data/pipeline/validation.json'
+WITS_DIR = 'data/wits'
+WITS_RAW_FILES = [f"{WITS_DIR}/WITS-Partner_{year}.xlsx - Partner.csv" for year in range(2018, 2023)]
+WITS_OUTPUTS = [
+    f"{WITS_DIR}/rwanda_export_partners_2018_2022_combined.csv",
+    f"{WITS_DIR}/rwanda_exports_yearly_summary_2018_2022.csv",
+    f"{WITS_DIR}/rwanda_exports_regional_analysis_2018_2022.csv",
+    f"{WITS_DIR}/rwanda_exports_growth_analysis_2018_2022.csv"
+]
+
+
+def _work_path(name):
+    return f"{WORK_DIR}/{name}.pkl"
+
+
+def _write_pickle(obj, path):
+    """Pickle an intermediate result atomically"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    pd.to_pickle(obj, tmp_path)
+    tmp_path.replace(path)
+
+
+# Stage bodies run in worker processes: module-level functions that read their declared
+# inputs from disk and write their declared outputs
+
+def parse_annex_tables():
+    from annex_parser import parse_annex, write_tables
+
+    write_tables(parse_annex())
+
+
+def combine_wits():
+    from combine_wits_partner_data import load_and_combine_wits_data, save_combined_data
+
+    combined_df = load_and_combine_wits_data(WITS_DIR)
+    if combined_df is None:
+        raise RuntimeError(f"No WITS partner files could be loaded from {WITS_DIR}")
+    save_combined_data(combined_df, WITS_DIR)
+
+
+def validate_inputs():
+    from data_validation import validate_inputs
+
+    report = validate_inputs()
+    # No timings in the stored report: unchanged inputs keep producing an identical file
+    path = Path(VALIDATION_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(report.to_dict(), indent=2))
+    tmp_path.replace(path)
+    report.raise_for_errors()
+
+
+def analyze_commodities():
+    from insights_pipeline import build_opportunity_analysis, quarterly_totals
+    from trade_tables import load_quarterly_table
+
+    commodities_df = load_quarterly_table('exports_commodity')
+    reexports_df = load_quarterly_table('reexports_commodity')
+    _write_pickle(build_opportunity_analysis(commodities_df, reexports_df), _work_path('opportunity_analysis'))
+    _write_pickle(quarterly_totals(commodities_df), _work_path('quarterly_totals'))
+
+
+def forecast_wits_partners():
+    from insights_pipeline import forecast_partners
+    from trade_tables import load_wits_partners
+
+    _write_pickle(forecast_partners(load_wits_partners()), _work_path('partner_forecast'))
+
+
+def reconcile_forecasts():
+    from forecast_reconciliation import reconcile_partner_forecasts
+    from trade_tables import load_wits_partners
+
+    _write_pickle(reconcile_partner_forecasts(load_wits_partners()), _work_path('reconciled_forecast'))
+
+
+def classify_markets():
+    from insights_pipeline import GROWTH_ANALYSIS_PATH, strategic_market_tiers
+
+    _write_pickle(strategic_market_tiers(pd.read_csv(GROWTH_ANALYSIS_PATH)), _work_path('market_tiers'))
+
+
+def score_anomalies():
+    from anomaly_detector import AnomalyDetector
+
+    AnomalyDetector().update()
+
+
+def export_insights():
+    from anomaly_detector import AnomalyDetector
+    from insights_pipeline import INSIGHTS_DIR, LOCK_PATH, _acquire_lock, stage_bundle
+    from insights_snapshot import publish_bundle
+    from trade_tables import load_quarterly_table, load_wits_partners
+
+    tier1, tier2, tier3 = pd.read_pickle(_work_path('market_tiers'))
+    staging = stage_bundle(
+        INSIGHTS_DIR,
+        commodities_df=load_quarterly_table('exports_commodity'),
+        opportunity_analysis=pd.read_pickle(_work_path('opportunity_analysis')),
+        quarterly_data=pd.read_pickle(_work_path('quarterly_totals')),
+        tier1_markets=tier1,
+        tier2_markets=tier2,
+        tier3_markets=tier3,
+        forecast_df=pd.read_pickle(_work_path('partner_forecast')),
+        countries_df=load_quarterly_table('export_country'),
+        wits_df=load_wits_partners(),
+        anomalies_df=AnomalyDetector().scores(),
+        reexports_df=load_quarterly_table('reexports_commodity'),
+        reconciled_df=pd.read_pickle(_work_path('reconciled_forecast'))
+    )
+    # Same lock as the dashboard's background rebuild, so two publishes never interleave
+    _acquire_lock(LOCK_PATH)
+    try:
+        publish_bundle(staging, INSIGHTS_DIR)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        Path(LOCK_PATH).unlink(missing_ok=True)
+
+
+def build_figures():
+    from dashboard_figures import precompute_figures
+    from insights_pipeline import INSIGHTS_DIR
+
+    precompute_figures(INSIGHTS_DIR)
+
+
+class PipelineStage:
+    """A named step with the files it reads and the files it writes"""
+
+    def __init__(self, name, func, inputs, outputs, description=''):
+        """
+        Parameters:
+        -----------
+        func : callable
+            Module-level function (it is pickled into a worker process)
+        inputs : list
+            Files whose contents decide whether the stage has to run again
+        outputs : list
+            Files (or directories) the stage writes; a missing output forces a run
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.description = description
+
+
+def _default_stages():
+    from annex_parser import ANNEX_SHEETS, annex_sources
+    from trade_tables import QUARTERLY_TABLES, WITS_PARTNERS_PATH
+    from insights_pipeline import GROWTH_ANALYSIS_PATH, INSIGHTS_DIR
+
+    try:
+        annex_inputs = sorted({source for _, source in annex_sources()})
+    except (FileNotFoundError, ImportError):
+        annex_inputs = []
+    annex_outputs = [spec['output'] for spec in ANNEX_SHEETS.values()]
+
+    commodity_path = QUARTERLY_TABLES['exports_commodity']['path']
+    reexport_path = QUARTERLY_TABLES['reexports_commodity']['path']
+    quarterly_paths = [table['path'] for table in QUARTERLY_TABLES.values()]
+    manifest_path = f"{INSIGHTS_DIR}/manifest.json"
+    analysis_outputs = [_work_path('opportunity_analysis'), _work_path('quarterly_totals')]
+
+    validation_inputs = quarterly_paths + [WITS_PARTNERS_PATH, GROWTH_ANALYSIS_PATH]
+
+    return [
+        PipelineStage('annex', parse_annex_tables, annex_inputs, annex_outputs,
+                      'Parsing the NISR annex workbook'),
+        PipelineStage('wits_combine', combine_wits, WITS_RAW_FILES, WITS_OUTPUTS,
+                      'Combining yearly WITS partner files'),
+        PipelineStage('validate', validate_inputs, validation_inputs, [VALIDATION_PATH],
+                      'Validating input tables'),
+        # The analysis stages list the validation report as an input, so they wait for it and
+        # are blocked when it fails
+        PipelineStage('commodity_analysis', analyze_commodities, [commodity_path, reexport_path, VALIDATION_PATH],
+                      analysis_outputs, 'Scoring commodity opportunities'),
+        PipelineStage('anomalies', score_anomalies, quarterly_paths + [VALIDATION_PATH],
+                      ['data/anomalies/scores.csv'], 'Scoring new quarters for anomalies'),
+        PipelineStage('partner_forecast', forecast_wits_partners, [WITS_PARTNERS_PATH, VALIDATION_PATH],
+                      [_work_path('partner_forecast')], 'Forecasting partner demand'),
+        PipelineStage('reconciliation', reconcile_forecasts, [WITS_PARTNERS_PATH, VALIDATION_PATH],
+                      [_work_path('reconciled_forecast')], 'Reconciling partner, region and world forecasts'),
+        PipelineStage('market_tiers', classify_markets, [GROWTH_ANALYSIS_PATH, VALIDATION_PATH],
+                      [_work_path('market_tiers')], 'Classifying strategic market tiers'),
+        PipelineStage('insights_export', export_insights,
+                      analysis_outputs + [_work_path('partner_forecast'), _work_path('reconciled_forecast'),
+                                          _work_path('market_tiers'),
+                                          commodity_path, reexport_path, QUARTERLY_TABLES['export_country']['path'],
+                                          WITS_PARTNERS_PATH, 'data/anomalies/scores.csv'],
+                      [manifest_path], 'Extracting and publishing the insights bundle'),
+        PipelineStage('figures', build_figures, [manifest_path], [f"{INSIGHTS_DIR}/figures"],
+                      'Precomputing dashboard figures')
+    ]
+
+
+def file_digest(path):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _run_stage(func):
+    """Worker entry point: run a stage body and return its wall time"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+class PipelineRunner:
+    """Runs the stage graph, skipping stages whose inputs did not change since their last run"""
+
+    def __init__(self, stages=None, state_path=STATE_PATH, workers=None):
+        self.stages = {stage.name: stage for stage in (stages or _default_stages())}
+        self.state_path = Path(state_path)
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        try:
+            with open(self.state_path, 'r') as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.state = {}
+
+        producers = {output: stage.name for stage in self.stages.values() for output in stage.outputs}
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if producers.get(path, stage.name) != stage.name}
+            for stage in self.stages.values()
+        }
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _input_hashes(self, stage):
+        """{input: sha256} of the stage inputs that exist (None for missing ones)"""
+        return {path: file_digest(path) if os.path.exists(path) else None for path in stage.inputs}
+
+    def plan(self, stage, force=False):
+        """
+        Decide whether a stage runs: returns (action, input hashes) with action one of
+        'run', 'up-to-date' or 'no-inputs' (sources absent but outputs present, kept as they are)
+        """
+        hashes = self._input_hashes(stage)
+        outputs_present = all(os.path.exists(path) for path in stage.outputs)
+        if any(value is None for value in hashes.values()):
+            if outputs_present and not self.dependencies[stage.name]:
+                return 'no-inputs', hashes
+            missing = [path for path, value in hashes.items() if value is None]
+            raise FileNotFoundError(f"{stage.name}: missing inputs {missing}")
+        if not force and outputs_present and self.state.get(stage.name, {}).get('inputs') == hashes:
+            return 'up-to-date', hashes
+        return 'run', hashes
+
+    def run(self, force=False, only=None):
+        """
+        Bring every stage up to date, running ready stages in parallel
+
+        Parameters:
+        -----------
+        force : bool
+            Run every stage regardless of its input hashes
+        only : list, optional
+            Force just these stages (their dependents still re-check their inputs)
+
+        Returns {stage: {'status', 'seconds'}} in completion order; 'failed' and 'blocked'
+        entries carry an 'error'.
+        """
+        forced = set(self.stages) if force else set(only or [])
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.dependencies[name]
+                    if any(results.get(dep, {}).get('status') in ('failed', 'blocked') for dep in deps):
+                        results[name] = {'status': 'blocked', 'seconds': 0.0,
+                                         'error': f"upstream failed: {', '.join(sorted(deps))}"}
+                        del pending[name]
+                        continue
+                    if not all(dep in results for dep in deps):
+                        continue
+                    stage = pending.pop(name)
+                    try:
+                        action, hashes = self.plan(stage, force=name in forced)
+                    except FileNotFoundError as e:
+                        results[name] = {'status': 'failed', 'seconds': 0.0, 'error': str(e)}
+                        print(f"   ❌ {name}: {e}", flush=True)
+                        continue
+                    if action != 'run':
+                        results[name] = {'status': action, 'seconds': 0.0}
+                        print(f"   ⏭️  {name}: {action}", flush=True)
+                        continue
+                    print(f"   ▶️  {name}: {stage.description}...", flush=True)
+                    running[pool.submit(_run_stage, stage.func)] = (stage, hashes)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, hashes = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        results[stage.name] = {'status': 'failed', 'seconds': 0.0,
+                                               'error': f"{type(e).__name__}: {e}"}
+                        print(f"   ❌ {stage.name}: {type(e).__name__}: {e}", flush=True)
+                        continue
+                    results[stage.name] = {'status': 'ran', 'seconds': seconds}
+                    self.state[stage.name] = {'inputs': hashes, 'seconds': round(seconds, 3),
+                                              'ran_at': datetime.now().isoformat()}
+                    self._save_state()
+                    print(f"   ✅ {stage.name}: {seconds:.2f}s", flush=True)
+        return results
+
+
+def print_summary(results, elapsed):
+    """Per-stage timing table"""
+    print(f"\n⏱️  STAGE SUMMARY")
+    for name, result in results.items():
+        seconds = f"{result['seconds']:.2f}s" if result['status'] == 'ran' else '-'
+        print(f"   • {name:<20} {result['status']:<11} {seconds:>8}")
+    busy = sum(result['seconds'] for result in results.values())
+    print(f"   Wall time {elapsed:.2f}s for {busy:.2f}s of stage work")
+
+
+def main():
+    """Refresh everything that is out of date"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Dependency-aware refresh of the export insights')
+    parser.add_argument('--force', action='store_true', help='Run every stage, ignoring input hashes')
+    parser.add_argument('--stage', nargs='+', default=None, help='Force specific stages to run')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel worker processes')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+    print("🔄 RWANDA EXPORT PIPELINE RUNNER")
+    print("=" * 60)
+    runner = PipelineRunner(workers=args.workers)
+    unknown = set(args.stage or []) - set(runner.stages)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(runner.stages)})")
+
+    start = time.perf_counter()
+    results = runner.run(force=args.force, only=args.stage)
+    print_summary(results, time.perf_counter() - start)
+    if any(result['status'] in ('failed', 'blocked') for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
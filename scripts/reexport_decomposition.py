@@ -0,0 +1,180 @@
+"""
+Rwanda Export Re-export Decomposition
+Aligns the domestic export and re-export commodity tables by SITC code and quarter and splits gross
+exports into their domestic and re-exported parts, with re-export ratios and growth per commodity
+"""
+
+import numpy as np
+import pandas as pd
+
+from trade_tables import period_columns
+
+KEY_COLUMN = 'SITC_Code'
+DESCRIPTION_COLUMN = 'Commodity_Description'
+# Memoized analyses that call into this module key on their own source only: bump when the
+# alignment or the ratio / growth definitions change
+DECOMPOSITION_VERSION = 1
+
+
+def sitc_codes(frame):
+    """SITC codes as stripped strings, so 5 and '5' (or '05' read back as 5) do not split a row"""
+    return frame[KEY_COLUMN].astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+
+
+def align_flows(exports_df, reexports_df):
+    """
+    Domestic export and re-export matrices on a common (SITC code x period) grid
+
+    Codes are the union of both tables; a code missing from one table had no such flow and
+    counts as 0. Periods are the union too; a quarter one table does not carry stays NaN.
+    Returns (labels, periods, exports, reexports), labels holding the code and description
+    of every matrix row.
+    """
+    export_codes, reexport_codes = sitc_codes(exports_df), sitc_codes(reexports_df)
+    codes = pd.Index(pd.unique(np.concatenate([export_codes.to_numpy(), reexport_codes.to_numpy()])))
+    periods = sorted(set(period_columns(exports_df)) | set(period_columns(reexports_df)))
+
+    def place(frame, frame_codes):
+        values = np.zeros((len(codes), len(periods)))
+        rows = codes.get_indexer(frame_codes)
+        frame_periods = period_columns(frame)
+        cols = pd.Index(periods).get_indexer(frame_periods)
+        values[:, np.setdiff1d(np.arange(len(periods)), cols)] = np.nan
+        # Duplicate codes (detailed tables split across pages) add up; a code whose cells are
+        # all blank for a quarter stays NaN rather than turning into a 0 flow
+        block = frame[frame_periods].to_numpy(dtype=float)
+        grid = np.zeros((len(codes), len(frame_periods)))
+        present = np.zeros((len(codes), len(frame_periods)))
+        np.add.at(grid, rows, np.nan_to_num(block))
+        np.add.at(present, rows, ~np.isnan(block))
+        listed = np.zeros(len(codes), dtype=bool)
+        listed[rows] = True
+        grid[listed[:, None] & (present == 0)] = np.nan
+        values[:, cols] = grid
+        return values
+
+    exports = place(exports_df, export_codes)
+    reexports = place(reexports_df, reexport_codes)
+
+    def first_seen(column):
+        # Labels as the tables spell them (exports first), one per aligned code
+        seen = pd.concat([
+            pd.Series(exports_df[column].to_numpy(), index=export_codes.to_numpy()),
+            pd.Series(reexports_df[column].to_numpy(), index=reexport_codes.to_numpy())
+        ])
+        return seen[~seen.index.duplicated()].reindex(codes).to_numpy()
+
+    labels = pd.DataFrame({KEY_COLUMN: first_seen(KEY_COLUMN), DESCRIPTION_COLUMN: first_seen(DESCRIPTION_COLUMN)})
+    return labels, periods, exports, reexports
+
+
+def _lag_positions(periods, quarters):
+    """Column of the period `quarters` earlier for every period (-1 when it is not in the table)"""
+    position = {period: j for j, period in enumerate(periods)}
+    lagged = []
+    for period in periods:
+        index = int(period[:4]) * 4 + int(period[-1]) - 1 - quarters
+        lagged.append(position.get(f"{index // 4}Q{index % 4 + 1}", -1))
+    return np.array(lagged, dtype=int)
+
+
+def _growth(values, lags):
+    """Percent change against the lagged column; NaN without a lagged quarter or from a zero base"""
+    previous = np.where(lags >= 0, values[:, np.maximum(lags, 0)], np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (values - previous) / previous * 100
+    return np.where(previous > 0, growth, np.nan)
+
+
+def decompose_exports(exports_df, reexports_df):
+    """
+    Long table of domestic exports, re-exports and their growth per commodity and quarter
+
+    NISR publishes domestic exports and re-exports as separate flows, so gross exports are
+    their sum and the re-export ratio is re-exports / gross (percent). Growth columns compare
+    against the previous quarter (QoQ) and the same quarter a year earlier (YoY).
+    """
+    labels, periods, domestic, reexports = align_flows(exports_df, reexports_df)
+    gross = domestic + reexports
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(gross > 0, reexports / gross * 100, np.nan)
+
+    qoq, yoy = _lag_positions(periods, 1), _lag_positions(periods, 4)
+    ratio_previous = np.where(yoy >= 0, ratio[:, np.maximum(yoy, 0)], np.nan)
+
+    n_codes, n_periods = domestic.shape
+    result = pd.DataFrame({
+        KEY_COLUMN: np.repeat(labels[KEY_COLUMN].to_numpy(), n_periods),
+        DESCRIPTION_COLUMN: np.repeat(labels[DESCRIPTION_COLUMN].to_numpy(), n_periods),
+        'Period': np.tile(periods, n_codes),
+        'Domestic_Exports': domestic.ravel(),
+        'Re_Exports': reexports.ravel(),
+        'Gross_Exports': gross.ravel(),
+        'Reexport_Ratio_Percent': ratio.ravel(),
+        'Domestic_QoQ_Percent': _growth(domestic, qoq).ravel(),
+        'Domestic_YoY_Percent': _growth(domestic, yoy).ravel(),
+        'Reexport_QoQ_Percent': _growth(reexports, qoq).ravel(),
+        'Reexport_YoY_Percent': _growth(reexports, yoy).ravel(),
+        'Ratio_YoY_Change_pp': (ratio - ratio_previous).ravel()
+    })
+    numeric = result.columns[3:]
+    result[numeric] = result[numeric].round(2)
+    return result
+
+
+def latest_decomposition(decomposition, period=None):
+    """One row per commodity for a quarter (the latest by default), largest re-export ratio first"""
+    period = period or decomposition['Period'].max()
+    latest = decomposition[decomposition['Period'] == period]
+    return latest.sort_values('Reexport_Ratio_Percent', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def decomposition_totals(decomposition, period=None):
+    """All-commodity domestic, re-export and gross totals for a quarter (the latest by default)"""
+    period = period or decomposition['Period'].max()
+    totals = decomposition.groupby('Period')[['Domestic_Exports', 'Re_Exports', 'Gross_Exports']].sum(min_count=1)
+    current = totals.loc[period]
+    year_earlier = f"{int(period[:4]) - 1}{period[4:]}"
+    previous = totals.loc[year_earlier] if year_earlier in totals.index else None
+
+    def yoy(column):
+        if previous is None or not previous[column] > 0:
+            return None
+        return round(float((current[column] - previous[column]) / previous[column] * 100), 2)
+
+    return {
+        'period': period,
+        'domestic_millions': round(float(current['Domestic_Exports']), 2),
+        'reexports_millions': round(float(current['Re_Exports']), 2),
+        'gross_millions': round(float(current['Gross_Exports']), 2),
+        'reexport_ratio_percent': round(float(current['Re_Exports'] / current['Gross_Exports'] * 100), 2)
+        if current['Gross_Exports'] > 0 else None,
+        'domestic_yoy_percent': yoy('Domestic_Exports'),
+        'reexports_yoy_percent': yoy('Re_Exports')
+    }
+
+
+def main():
+    """Print the latest quarter's decomposition"""
+    import os
+    from pathlib import Path
+
+    from trade_tables import load_quarterly_table
+
+    os.chdir(Path(__file__).resolve().parent.parent)
+
+    print("🔀 RE-EXPORT DECOMPOSITION")
+    print("=" * 60)
+    decomposition = decompose_exports(load_quarterly_table('exports_commodity'),
+                                      load_quarterly_table('reexports_commodity'))
+    totals = decomposition_totals(decomposition)
+    print(f"   {totals['period']}: gross ${totals['gross_millions']:,.2f}M = domestic "
+          f"${totals['domestic_millions']:,.2f}M + re-exports ${totals['reexports_millions']:,.2f}M "
+          f"({totals['reexport_ratio_percent']}% re-exported)\n")
+    for _, row in latest_decomposition(decomposition).iterrows():
+        print(f"   • {str(row[DESCRIPTION_COLUMN])[:45]:<45} {row['Reexport_Ratio_Percent']:>6.1f}% re-exported  "
+              f"domestic YoY {row['Domestic_YoY_Percent']:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
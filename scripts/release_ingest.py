@@ -0,0 +1,345 @@
+"""
+Rwanda Export Release Ingestion
+Watches a drop directory for new NISR quarterly release files, validates each against the stored
+table, appends only the new periods and reruns just the pipeline stages the new quarter affects
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trade_tables import QUARTERLY_TABLES, clean_quarterly_table, label_columns, next_period, period_columns
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DROP_DIR = 'data/incoming'
+
+# Latest-quarter columns published next to the periods; the names keep the Q3 release's
+# spelling that the analysis code reads, the values always describe the latest quarter
+SHARE_COLUMN = 'Share_Percent_Q3'
+QOQ_COLUMN = 'Change_Q3_Q2_Percent'
+YOY_COLUMN = 'Change_Q3_Q3_Percent'
+DERIVED_COLUMNS = [SHARE_COLUMN, QOQ_COLUMN, YOY_COLUMN]
+
+# Flow of the single-flow tables, as spelled in the continents table
+TABLE_FLOWS = {'export_country': 'Exports', 'exports_commodity': 'Exports', 'reexports_commodity': 'Re-Exports'}
+RELEASE_PREFIX = re.compile(r'^\d{4}Q[1-4]_')
+
+
+def match_release_file(path):
+    """Registered table a release file updates (None for unknown files)"""
+    from annex_parser import ANNEX_SHEETS
+
+    name = RELEASE_PREFIX.sub('', Path(path).name)
+    for table, spec in QUARTERLY_TABLES.items():
+        if RELEASE_PREFIX.sub('', Path(spec['path']).name) == name:
+            return table
+    for sheet, spec in ANNEX_SHEETS.items():
+        if name.endswith(f" - {sheet}.csv") and spec['name'] in QUARTERLY_TABLES:
+            return spec['name']
+    return None
+
+
+def read_release(path, table):
+    """Release file as a clean wide table (annex sheets go through the annex parser)"""
+    from annex_parser import ANNEX_SHEETS, parse_annex
+
+    if table in {spec['name'] for spec in ANNEX_SHEETS.values()}:
+        return parse_annex(path, workers=1)[table]
+    return clean_quarterly_table(pd.read_csv(path))
+
+
+def _keys(frame, labels):
+    return frame[labels].astype(str).apply(lambda col: col.str.strip()).agg(' | '.join, axis=1)
+
+
+def validate_release(table, stored, release, tolerance=0.05):
+    """
+    Check a release against the stored table
+
+    Errors (the release is rejected): missing label columns, duplicated rows, non-contiguous
+    periods, no new period, a gap before the new periods, new periods without any value.
+    Warnings: revised overlapping values (beyond tolerance, US$ M), rows added or dropped.
+    Returns a report dict with 'errors', 'warnings' and 'new_periods'.
+    """
+    report = {'table': table, 'errors': [], 'warnings': [], 'new_periods': [], 'revised_values': 0}
+    labels = label_columns(table)
+    missing = [col for col in labels if col not in release.columns]
+    if missing:
+        report['errors'].append(f"missing label columns: {missing}")
+        return report
+
+    periods = period_columns(release)
+    if not periods:
+        report['errors'].append("no period columns")
+        return report
+    expected = [periods[0]]
+    while len(expected) < len(periods):
+        expected.append(next_period(expected[-1]))
+    if periods != expected:
+        report['errors'].append(f"period columns are not consecutive quarters: {periods}")
+
+    keys = _keys(release, labels)
+    if keys.duplicated().any():
+        report['errors'].append(f"duplicated rows: {sorted(keys[keys.duplicated()].unique())[:5]}")
+
+    stored_periods = period_columns(stored)
+    latest = stored_periods[-1] if stored_periods else None
+    new_periods = [p for p in periods if latest is None or p > latest]
+    report['new_periods'] = new_periods
+    if not new_periods:
+        report['errors'].append(f"no period after the stored {latest}")
+    elif latest is not None and new_periods[0] != next_period(latest):
+        report['errors'].append(f"gap between the stored {latest} and the new {new_periods[0]}")
+    elif release[new_periods].isna().all().any():
+        report['errors'].append(f"new periods without values: {list(release[new_periods].columns[release[new_periods].isna().all()])}")
+    if report['errors']:
+        return report
+
+    stored_keys = _keys(stored, labels)
+    added = sorted(set(keys) - set(stored_keys))
+    dropped = sorted(set(stored_keys) - set(keys))
+    if added:
+        report['warnings'].append(f"{len(added)} new rows: {added[:5]}")
+    if dropped:
+        report['warnings'].append(f"{len(dropped)} rows missing from the release: {dropped[:5]}")
+
+    overlap = [p for p in periods if p in stored_periods]
+    if overlap:
+        old = stored.set_index(stored_keys)[overlap]
+        new = release.set_index(keys)[overlap]
+        common = old.index.intersection(new.index)
+        diff = (new.loc[common].to_numpy(dtype=float) - old.loc[common].to_numpy(dtype=float))
+        revised = np.abs(np.nan_to_num(diff)) > tolerance
+        report['revised_values'] = int(revised.sum())
+        if revised.any():
+            report['warnings'].append(
+                f"{int(revised.sum())} overlapping values revised (max change {np.nanmax(np.abs(diff)):.2f})"
+            )
+    return report
+
+
+def world_totals(continents_df, period):
+    """{flow: WORLD value} for a period of the continents table"""
+    world = continents_df[continents_df['Continent'].astype(str).str.strip() == 'WORLD']
+    return dict(zip(world['Flow_Type'], world[period])) if period in world else {}
+
+
+def recompute_derived(frame, table, continents_df=None):
+    """
+    Refresh the latest-quarter share and change columns of a table that carries them
+
+    Share is against the WORLD total of the table's flow (continents table), falling back to the
+    column sum; changes are against the previous quarter and the same quarter a year earlier.
+    """
+    if not any(col in frame.columns for col in DERIVED_COLUMNS):
+        return frame
+    periods = period_columns(frame)
+    latest = periods[-1]
+    values = frame[latest].astype(float)
+
+    total = None
+    if continents_df is not None:
+        total = world_totals(continents_df, latest).get(TABLE_FLOWS.get(table))
+    total = total if total else values.sum()
+
+    def change(base):
+        if base not in frame:
+            return np.nan
+        base = frame[base].astype(float)
+        return ((values / base.where(base != 0) - 1) * 100).round(2)
+
+    frame = frame.copy()
+    frame[SHARE_COLUMN] = (values / total * 100).round(2)
+    frame[QOQ_COLUMN] = change(periods[-2] if len(periods) > 1 else None)
+    frame[YOY_COLUMN] = change(f"{int(latest[:4]) - 1}{latest[4:]}")
+    return frame
+
+
+def append_periods(table, stored, release, new_periods, continents_df=None):
+    """
+    Stored table with the release's new period columns joined on the label columns
+
+    Stored history is kept as it is; rows that first appear in the release are added
+    with empty history.
+    """
+    labels = label_columns(table)
+    stored_keys, release_keys = _keys(stored, labels), _keys(release, labels)
+    new_values = release.set_index(release_keys)[new_periods]
+
+    merged = stored.copy()
+    merged[new_periods] = new_values.reindex(stored_keys).to_numpy()
+    added = release[~release_keys.isin(stored_keys)]
+    if not added.empty:
+        merged = pd.concat([merged, added[labels + new_periods]], ignore_index=True)
+
+    periods = period_columns(merged)
+    extra = [col for col in merged.columns if col not in labels and col not in periods]
+    merged = merged[labels + periods + extra]
+    return recompute_derived(merged, table, continents_df)
+
+
+def _write_csv(frame, path):
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    frame.to_csv(tmp_path, index=False)
+    tmp_path.replace(path)
+
+
+class ReleaseIngestor:
+    """Ingests release files dropped into a directory, then refreshes what depends on them"""
+
+    def __init__(self, drop_dir=DROP_DIR, settle_seconds=5.0, tolerance=0.05):
+        """
+        Parameters:
+        -----------
+        settle_seconds : float
+            A file is picked up once it has not been modified for this long, so partially
+            copied files are left alone
+        tolerance : float
+            Changes to already stored values (US$ M) above this are reported as revisions
+        """
+        self.drop_dir = Path(drop_dir)
+        self.settle_seconds = settle_seconds
+        self.tolerance = tolerance
+
+    def pending(self):
+        """Settled release files waiting in the drop directory"""
+        if not self.drop_dir.exists():
+            return []
+        now = time.time()
+        return sorted(p for p in self.drop_dir.glob('*.csv')
+                      if now - p.stat().st_mtime >= self.settle_seconds)
+
+    def _archive(self, path, outcome, report):
+        target_dir = self.drop_dir / outcome
+        target_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target = target_dir / f"{stamp}_{path.name}"
+        shutil.move(str(path), target)
+        with open(target.with_name(target.name + '.report.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+
+    def ingest(self, paths=None, recompute=True, dry_run=False):
+        """
+        Validate and append a batch of release files, then run the incremental pipeline once
+
+        The continents table goes first so the other tables' shares use the new WORLD totals.
+        Rejected files move to <drop_dir>/rejected and ingested ones to <drop_dir>/ingested,
+        each with a JSON report. Returns {'files': [reports], 'stages': pipeline results}.
+        """
+        paths = [Path(p) for p in (paths if paths is not None else self.pending())]
+        matched = [(p, match_release_file(p)) for p in paths]
+        order = list(QUARTERLY_TABLES)
+        order.insert(0, order.pop(order.index('continents')))
+        matched.sort(key=lambda item: order.index(item[1]) if item[1] in order else len(order))
+
+        reports = []
+        for path, table in matched:
+            if table is None:
+                report = {'file': path.name, 'table': None, 'errors': ['not a registered release table'],
+                          'warnings': [], 'new_periods': []}
+            else:
+                stored_path = QUARTERLY_TABLES[table]['path']
+                stored = clean_quarterly_table(pd.read_csv(stored_path))
+                try:
+                    release = read_release(path, table)
+                except Exception as e:
+                    release, report = None, {'table': table, 'errors': [f"unreadable: {type(e).__name__}: {e}"],
+                                             'warnings': [], 'new_periods': []}
+                if release is not None:
+                    report = validate_release(table, stored, release, self.tolerance)
+                report['file'] = path.name
+                if not report['errors'] and not dry_run:
+                    continents = clean_quarterly_table(pd.read_csv(QUARTERLY_TABLES['continents']['path']))
+                    updated = append_periods(table, stored, release, report['new_periods'], continents)
+                    _write_csv(updated, stored_path)
+                    report['stored'] = stored_path
+            reports.append(report)
+            # Files named on the command line stay where they are
+            if not dry_run and path.resolve().parent == self.drop_dir.resolve():
+                self._archive(path, 'rejected' if report['errors'] else 'ingested', report)
+
+        stages = None
+        if recompute and not dry_run and any(not r['errors'] for r in reports):
+            from materialized_aggregates import MaterializedAggregateStore
+            from pipeline_runner import PipelineRunner
+
+            MaterializedAggregateStore().refresh()
+            stages = PipelineRunner().run()
+        return {'files': reports, 'stages': stages}
+
+    def watch(self, interval=10.0, recompute=True):
+        """Poll the drop directory forever, ingesting each batch as it settles"""
+        self.drop_dir.mkdir(parents=True, exist_ok=True)
+        print(f"👀 Watching {self.drop_dir}/ every {interval:.0f}s (Ctrl+C to stop)", flush=True)
+        while True:
+            if self.pending():
+                print_report(self.ingest(recompute=recompute))
+            time.sleep(interval)
+
+
+def print_report(result):
+    for report in result['files']:
+        icon = '❌' if report['errors'] else '✅'
+        periods = ', '.join(report['new_periods']) or '-'
+        print(f"   {icon} {report['file']} -> {report['table']} (new periods: {periods})")
+        for message in report['errors']:
+            print(f"      error: {message}")
+        for message in report['warnings']:
+            print(f"      warning: {message}")
+    if result['stages']:
+        from pipeline_runner import print_summary
+        print_summary(result['stages'], sum(r['seconds'] for r in result['stages'].values()))
+
+
+def main():
+    """Ingest the releases waiting in the drop directory (or keep watching it)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ingest new NISR quarterly release files')
+    parser.add_argument('files', nargs='*', help='Release files (default: everything settled in the drop directory)')
+    parser.add_argument('--drop-dir', default=DROP_DIR, help='Directory new release files are copied into')
+    parser.add_argument('--watch', action='store_true', help='Keep polling the drop directory')
+    parser.add_argument('--interval', type=float, default=10.0, help='Polling interval in seconds')
+    parser.add_argument('--no-recompute', action='store_true', help='Only append the new periods')
+    parser.add_argument('--dry-run', action='store_true', help='Validate only; nothing is written or moved')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+    print("📥 NISR RELEASE INGESTION")
+    print("=" * 60)
+    ingestor = ReleaseIngestor(args.drop_dir, settle_seconds=0 if args.files else 5.0)
+    if args.watch:
+        ingestor.watch(args.interval, recompute=not args.no_recompute)
+        return
+
+    start = time.perf_counter()
+    result = ingestor.ingest(args.files or None, recompute=not args.no_recompute, dry_run=args.dry_run)
+    if not result['files']:
+        print(f"   • Nothing waiting in {args.drop_dir}/")
+        return
+    print_report(result)
+    stages = result['stages'] or {}
+    failed_stages = [name for name, stage in stages.items() if stage['status'] == 'failed']
+    blocked = sum(stage['status'] == 'blocked' for stage in stages.values())
+    if failed_stages:
+        print(f"\n❌ New periods stored, but recomputing failed after {time.perf_counter() - start:.1f}s: "
+              f"{', '.join(failed_stages)} ({blocked} dependent stages blocked)")
+    else:
+        print(f"\n✅ Done in {time.perf_counter() - start:.1f}s")
+    if failed_stages or any(report['errors'] for report in result['files']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
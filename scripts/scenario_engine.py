@@ -0,0 +1,268 @@
+"""
+Rwanda Export Market-Loss Scenario Engine
+Vectorized Monte Carlo simulation of export revenue at risk from partner loss,
+demand shocks and price shocks
+"""
+
+import numpy as np
+import pandas as pd
+
+from memo_cache import memoize
+from trade_hierarchy import wits_country_rows
+from trade_tables import period_columns
+
+PERCENTILES = [5, 50, 90, 95, 99]
+# Before taking logs, each series is floored at this share of its typical (median positive)
+# level, so a near-zero period reads as a large drop instead of a -7 log change
+VOLATILITY_FLOOR_SHARE = 0.05
+# Period-on-period log changes are winsorized here (a period at most halves or doubles)
+MAX_LOG_CHANGE = np.log(2)
+# Memoized scenario results key on their own source only: bump when the engine changes
+SCENARIO_VERSION = 3
+# Student-t price draws are clipped here (in scaled units) so their exponential has a finite mean
+MAX_PRICE_SHOCK = 6.0
+
+
+def price_multipliers(rng, size, scale, tail_df, mean_shift=0.0):
+    """
+    Fat-tailed price multipliers with mean exp(mean_shift)
+
+    exp of a Student-t draw has no finite mean, so the draw is clipped and the batch is
+    rescaled to mean 1 before the shift: with mean_shift=0 the price scenario is centered
+    on the baseline revenue, like the demand shock.
+    """
+    shock = np.clip(rng.standard_t(tail_df, size), -MAX_PRICE_SHOCK, MAX_PRICE_SHOCK) * scale
+    multipliers = np.exp(shock)
+    return multipliers / multipliers.mean() * np.exp(mean_shift)
+
+
+def log_change_volatility(values):
+    """
+    Std of period-on-period log changes for every row of a partner x period table
+
+    Values are floored relative to each series' own level and the log changes winsorized,
+    so partners with a near-empty period do not get volatilities of 5 (an exp(5)-fold swing).
+    """
+    level = values.where(values > 0).median(axis=1)
+    floor = (level * VOLATILITY_FLOOR_SHARE).clip(lower=1e-3).fillna(1e-3)
+    logs = np.log(values.clip(lower=floor, axis=0))
+    changes = logs.diff(axis=1).iloc[:, 1:].clip(-MAX_LOG_CHANGE, MAX_LOG_CHANGE)
+    return changes.std(axis=1).fillna(0)
+
+
+def partner_exposure_from_quarterly(countries_df, period=None, include_rest_of_world=True):
+    """
+    Partner export values and volatilities from the NISR quarterly country table
+
+    Returns a DataFrame indexed by partner with columns value (US$ M), share (%) and
+    volatility (std of quarter-on-quarter log changes, see log_change_volatility). When the
+    table does not cover all exports, the uncovered share is added as a 'Rest of World' partner.
+    """
+    periods = period_columns(countries_df)
+    period = period or periods[-1]
+    values = countries_df.set_index('Country')[periods].astype(float)
+
+    exposure = pd.DataFrame({'value': values[period]})
+    exposure['volatility'] = log_change_volatility(values)
+
+    covered_share = countries_df['Share_Percent_Q3'].sum() if 'Share_Percent_Q3' in countries_df else 100
+    if include_rest_of_world and 0 < covered_share < 100:
+        total = exposure['value'].sum() / (covered_share / 100)
+        exposure.loc['Rest of World'] = [total - exposure['value'].sum(), exposure['volatility'].median()]
+
+    exposure['share'] = exposure['value'] / exposure['value'].sum() * 100
+    return exposure.sort_values('value', ascending=False)
+
+
+def partner_exposure_from_wits(wits_df, year=None):
+    """
+    Partner export values and volatilities from the combined WITS partner data
+
+    Regional aggregate rows (World, Sub-Saharan Africa, ...) are excluded (see wits_country_rows).
+    Volatility is the std of year-on-year log changes (see log_change_volatility).
+    """
+    countries = wits_country_rows(wits_df)
+    pivot = countries.pivot_table(index='Partner Name', columns='Year',
+                                  values='Export_Value_Millions', aggfunc='sum')
+    year = year or pivot.columns.max()
+
+    exposure = pd.DataFrame({'value': pivot[year]}).dropna()
+    exposure = exposure[exposure['value'] > 0]
+    exposure['volatility'] = log_change_volatility(pivot).reindex(exposure.index).fillna(0)
+    exposure['share'] = exposure['value'] / exposure['value'].sum() * 100
+    return exposure.sort_values('value', ascending=False)
+
+
+class MarketLossScenarioEngine:
+    """Monte Carlo revenue-at-risk engine over a partner exposure table"""
+
+    def __init__(self, exposure, n_draws=100_000, seed=42, batch_size=25_000):
+        """
+        Parameters:
+        -----------
+        exposure : DataFrame
+            Indexed by partner with 'value' and 'volatility' columns
+            (see partner_exposure_from_quarterly / partner_exposure_from_wits)
+        n_draws : int
+            Monte Carlo draws per scenario
+        batch_size : int
+            Draws simulated per vectorized batch, bounding memory at batch_size x partners
+        """
+        self.partners = exposure.index.tolist()
+        self.values = exposure['value'].to_numpy(dtype=float)
+        self.volatility = exposure['volatility'].to_numpy(dtype=float)
+        self.baseline = float(self.values.sum())
+        self.n_draws = int(n_draws)
+        self.batch_size = int(batch_size)
+        self.seed = seed
+
+    def _simulate(self, draw_batch):
+        """Run draw_batch(rng, size) over all batches and return simulated revenues"""
+        rng = np.random.default_rng(self.seed)
+        revenues = np.empty(self.n_draws)
+        for start in range(0, self.n_draws, self.batch_size):
+            size = min(self.batch_size, self.n_draws - start)
+            revenues[start:start + size] = draw_batch(rng, size)
+        return revenues
+
+    def partner_loss(self, loss_probability=0.05, recovery_rate=0.0):
+        """
+        Each partner is independently lost with the given probability (scalar or per
+        partner); a lost partner keeps only recovery_rate of its revenue
+        """
+        p = np.broadcast_to(np.asarray(loss_probability, dtype=float), self.values.shape)
+
+        def draw(rng, size):
+            lost = rng.random((size, len(self.values))) < p
+            return self.baseline - (lost @ self.values) * (1 - recovery_rate)
+
+        return self._simulate(draw)
+
+    def demand_shock(self, common_sigma=0.10, idiosyncratic_scale=1.0, mean_shift=0.0):
+        """
+        Log-normal demand multipliers: one common factor shared by all partners plus a
+        partner-specific term scaled by each partner's historical volatility
+        """
+        sigma = self.volatility * idiosyncratic_scale
+
+        def draw(rng, size):
+            common = rng.standard_normal((size, 1)) * common_sigma
+            specific = rng.standard_normal((size, len(self.values))) * sigma
+            log_mult = mean_shift + common + specific - 0.5 * (common_sigma ** 2 + sigma ** 2)
+            return np.exp(log_mult) @ self.values
+
+        return self._simulate(draw)
+
+    def price_shock(self, sigma=0.15, tail_df=4, mean_shift=0.0):
+        """
+        Export-wide price multiplier with fat (Student-t) tails, applied to all revenue
+        (mean multiplier exp(mean_shift), see price_multipliers)
+        """
+        scale = sigma * np.sqrt((tail_df - 2) / tail_df) if tail_df > 2 else sigma
+
+        def draw(rng, size):
+            return self.baseline * price_multipliers(rng, size, scale, tail_df, mean_shift)
+
+        return self._simulate(draw)
+
+    def combined(self, loss_probability=0.05, common_sigma=0.10, price_sigma=0.15, tail_df=4):
+        """Partner loss, demand shock and price shock drawn jointly"""
+        p = np.broadcast_to(np.asarray(loss_probability, dtype=float), self.values.shape)
+        sigma = self.volatility
+        price_scale = price_sigma * np.sqrt((tail_df - 2) / tail_df) if tail_df > 2 else price_sigma
+
+        def draw(rng, size):
+            k = len(self.values)
+            kept = rng.random((size, k)) >= p
+            common = rng.standard_normal((size, 1)) * common_sigma
+            specific = rng.standard_normal((size, k)) * sigma
+            demand = np.exp(common + specific - 0.5 * (common_sigma ** 2 + sigma ** 2))
+            price = price_multipliers(rng, size, price_scale, tail_df)
+            return ((kept * demand) @ self.values) * price
+
+        return self._simulate(draw)
+
+    def top_partner_loss(self, n_partners=1):
+        """Deterministic loss of the n largest partners (share of revenue lost, %)"""
+        return float(np.sort(self.values)[::-1][:n_partners].sum() / self.baseline * 100)
+
+    def summarize(self, revenues):
+        """Revenue-at-risk statistics for a simulated revenue distribution"""
+        loss = (1 - revenues / self.baseline) * 100
+        loss_pcts = np.percentile(loss, PERCENTILES)
+        var_95 = loss_pcts[PERCENTILES.index(95)]
+        tail = loss[loss >= var_95]
+
+        return {
+            'expected_loss_percent': float(loss.mean()),
+            'loss_percentiles': {f"p{q}": float(v) for q, v in zip(PERCENTILES, loss_pcts)},
+            'value_at_risk_95_millions': float(var_95 / 100 * self.baseline),
+            'expected_shortfall_95_percent': float(tail.mean()) if tail.size else float(var_95),
+            'probability_loss_over_10_percent': float((loss > 10).mean()),
+            'probability_loss_over_25_percent': float((loss > 25).mean())
+        }
+
+    def run_all(self, **params):
+        """Run the standard scenario set and return summaries keyed by scenario name"""
+        loss_probability = params.get('loss_probability', 0.05)
+        scenarios = {
+            'partner_loss': self.partner_loss(loss_probability),
+            'demand_shock': self.demand_shock(params.get('common_sigma', 0.10)),
+            'price_shock': self.price_shock(params.get('price_sigma', 0.15)),
+            'combined': self.combined(loss_probability, params.get('common_sigma', 0.10),
+                                      params.get('price_sigma', 0.15))
+        }
+        return {name: self.summarize(revenues) for name, revenues in scenarios.items()}
+
+    def concentration(self):
+        """Market concentration figures used alongside the scenarios"""
+        shares = self.values / self.baseline * 100
+        return {
+            'hhi': float((shares ** 2).sum()),
+            'top1_share_percent': self.top_partner_loss(1),
+            'top3_share_percent': self.top_partner_loss(3),
+            'partners': len(self.values)
+        }
+
+
+@memoize(version=SCENARIO_VERSION)
+def run_market_loss_scenarios(exposure, n_draws=100_000, seed=42, **params):
+    """One-call helper returning the scenario summaries plus concentration metrics"""
+    engine = MarketLossScenarioEngine(exposure, n_draws=n_draws, seed=seed)
+    return {
+        'baseline_millions': engine.baseline,
+        'draws': engine.n_draws,
+        'seed': seed,
+        'concentration': engine.concentration(),
+        'scenarios': engine.run_all(**params)
+    }
+
+
+def main():
+    """Run the standard scenarios on the latest quarterly country data"""
+    import time
+    from trade_tables import load_quarterly_table
+
+    countries_df = load_quarterly_table('export_country')
+    exposure = partner_exposure_from_quarterly(countries_df)
+
+    print("🎲 MARKET-LOSS SCENARIO SIMULATION")
+    print("=" * 60)
+    start = time.perf_counter()
+    results = run_market_loss_scenarios(exposure)
+    elapsed = time.perf_counter() - start
+
+    conc = results['concentration']
+    print(f"   • Baseline revenue: ${results['baseline_millions']:.1f}M across {conc['partners']} partners")
+    print(f"   • HHI: {conc['hhi']:.0f} | Top 3 share: {conc['top3_share_percent']:.1f}%")
+    print(f"   • {results['draws']:,} draws per scenario in {elapsed:.2f}s\n")
+
+    for name, summary in results['scenarios'].items():
+        pct = summary['loss_percentiles']
+        print(f"   {name:<14} expected loss {summary['expected_loss_percent']:5.1f}% | "
+              f"P95 {pct['p95']:5.1f}% | P99 {pct['p99']:5.1f}% | "
+              f"VaR95 ${summary['value_at_risk_95_millions']:.1f}M")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Rwanda Export Seasonality Decomposition
+Classical decomposition (trend, seasonal indices, residuals) of many quarterly series in one
+batched pass, with results cached per series content hash in memory and in the on-disk memo cache
+"""
+
+import hashlib
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from memo_cache import get_memo_cache
+from trade_tables import period_columns
+
+SEASONS = 4
+# Bump when the decomposition or the summary records change, so stored series summaries are not reused
+CACHE_VERSION = 1
+# Centered 2x4 moving average: half weight on the two outer quarters
+TREND_WEIGHTS = np.array([1, 2, 2, 2, 1]) / 8
+
+SUMMARY_COLUMNS = ['peak_quarter', 'trough_quarter', 'seasonal_strength', 'seasonal_amplitude',
+                   'trend_direction', 'trend_slope_percent', 'mean_level'] + \
+                  [f'seasonal_index_Q{q}' for q in range(1, SEASONS + 1)]
+
+
+def quarter_numbers(periods):
+    """Quarter number (1-4) of each YYYYQn period"""
+    return np.array([int(str(p)[-1]) for p in periods])
+
+
+def centered_moving_average(values):
+    """2x4 centered moving average along axis 1 (NaN for the first and last two quarters)"""
+    trend = np.full(values.shape, np.nan)
+    if values.shape[1] >= len(TREND_WEIGHTS):
+        half = len(TREND_WEIGHTS) // 2
+        trend[:, half:-half] = sliding_window_view(values, len(TREND_WEIGHTS), axis=1) @ TREND_WEIGHTS
+    return trend
+
+
+def decompose_matrix(values, periods):
+    """
+    Additive decomposition of a (series x period) matrix
+
+    Parameters:
+    -----------
+    values : ndarray
+        One row per series, one column per consecutive quarter
+    periods : list
+        YYYYQn label of every column
+
+    Returns a dict of arrays: trend, seasonal, residual (series x period), seasonal_indices
+    (series x 4, Q1..Q4), seasonal_strength, trend_slope_percent and mean_level (per series).
+    """
+    values = np.asarray(values, dtype=float)
+    quarters = quarter_numbers(periods)
+    trend = centered_moving_average(values)
+    detrended = values - trend
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        indices = np.stack([np.nanmean(detrended[:, quarters == q], axis=1) if (quarters == q).any()
+                            else np.full(len(values), np.nan)
+                            for q in range(1, SEASONS + 1)], axis=1)
+        indices = indices - np.nanmean(indices, axis=1, keepdims=True)
+        mean_level = np.nanmean(values, axis=1)
+
+    seasonal = indices[:, quarters - 1]
+    residual = detrended - seasonal
+
+    # Seasonal strength: share of detrended variance explained by the seasonal component
+    valid = ~np.isnan(residual)
+    count = valid.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        residual_var = _masked_var(residual, valid, count)
+        total_var = _masked_var(residual + seasonal, valid, count)
+        strength = np.where(total_var > 0, np.clip(1 - residual_var / total_var, 0, 1), 0.0)
+        strength = np.where(count >= SEASONS, strength, np.nan)
+
+        # Least-squares slope of the trend component, as % of the mean level per quarter
+        t = np.broadcast_to(np.arange(values.shape[1], dtype=float), values.shape)
+        has_trend = ~np.isnan(trend)
+        n_trend = has_trend.sum(axis=1)
+        t_mean = np.where(has_trend, t, 0).sum(axis=1) / n_trend
+        y_mean = np.where(has_trend, trend, 0).sum(axis=1) / n_trend
+        dt = np.where(has_trend, t - t_mean[:, None], 0)
+        dy = np.where(has_trend, trend - y_mean[:, None], 0)
+        slope = (dt * dy).sum(axis=1) / (dt ** 2).sum(axis=1)
+        slope_percent = np.where((n_trend >= 2) & (mean_level != 0), slope / np.abs(mean_level) * 100, np.nan)
+
+    return {
+        'trend': trend,
+        'seasonal': seasonal,
+        'residual': residual,
+        'seasonal_indices': indices,
+        'seasonal_strength': strength,
+        'trend_slope_percent': slope_percent,
+        'mean_level': mean_level
+    }
+
+
+def _masked_var(x, mask, count):
+    """Row variance over the masked entries"""
+    x = np.where(mask, x, 0.0)
+    mean = x.sum(axis=1) / count
+    return (np.where(mask, x - mean[:, None], 0.0) ** 2).sum(axis=1) / count
+
+
+def trend_direction(slope_percent, stable_band=1.0):
+    """'increasing' / 'decreasing' / 'stable' label for trend slopes (% per quarter)"""
+    slope_percent = np.asarray(slope_percent, dtype=float)
+    return np.where(np.isnan(slope_percent), 'unknown',
+                    np.where(slope_percent > stable_band, 'increasing',
+                             np.where(slope_percent < -stable_band, 'decreasing', 'stable')))
+
+
+def series_hash(periods, row):
+    """Content hash of a single series (its periods and values)"""
+    digest = hashlib.sha1('|'.join(map(str, periods)).encode())
+    digest.update(np.ascontiguousarray(row, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class SeasonalityEngine:
+    """Batched decomposition with a per-series result cache (in memory, backed by the memo cache on disk)"""
+
+    def __init__(self, stable_band=1.0, max_entries=100_000, persistent=True):
+        """
+        Parameters:
+        -----------
+        stable_band : float
+            Trend slopes within +/- this many percent of the mean level per quarter are 'stable'
+        max_entries : int
+            Cached series kept in memory before the in-memory cache is cleared
+        persistent : bool
+            Also store series summaries in the memo cache, so later processes reuse them
+        """
+        self.stable_band = stable_band
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._cache = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def decompose(self, values, periods):
+        """
+        Decompose a (series x period) matrix, computing only series not seen before
+
+        Returns per-series summary records (dicts), in row order.
+        """
+        values = np.asarray(values, dtype=float)
+        keys = [series_hash(periods, row) for row in values]
+        missing = [i for i, key in enumerate(keys) if key not in self._cache]
+        self.hits += len(keys) - len(missing)
+        if len(self._cache) + len(missing) > self.max_entries:
+            self._cache.clear()
+
+        store = get_memo_cache() if self.persistent else None
+        if store is not None:
+            not_stored = []
+            for i in missing:
+                found, record = store.load('seasonality.series', self._store_key(keys[i]))
+                if found:
+                    self._cache[keys[i]] = record
+                else:
+                    not_stored.append(i)
+            self.disk_hits += len(missing) - len(not_stored)
+            missing = not_stored
+        self.misses += len(missing)
+
+        if missing:
+            result = decompose_matrix(values[missing], periods)
+            directions = trend_direction(result['trend_slope_percent'], self.stable_band)
+            for j, i in enumerate(missing):
+                self._cache[keys[i]] = self._summary(result, directions, j)
+                if store is not None:
+                    store.store('seasonality.series', self._store_key(keys[i]), self._cache[keys[i]])
+
+        return [self._cache[key] for key in keys]
+
+    def _store_key(self, key):
+        """Memo cache key of a series: its content hash plus the engine settings that shape the record"""
+        return hashlib.sha1(f"{key}|{self.stable_band}|{CACHE_VERSION}".encode()).hexdigest()
+
+    def decompose_table(self, df, label_columns=None):
+        """
+        Decompose every row of a wide quarterly table (one column per YYYYQn period)
+
+        Returns a DataFrame with the label columns followed by SUMMARY_COLUMNS.
+        """
+        periods = period_columns(df)
+        labels = label_columns if label_columns is not None else \
+            [col for col in df.columns if col not in periods and not pd.api.types.is_numeric_dtype(df[col])]
+        records = self.decompose(df[periods].to_numpy(dtype=float), periods)
+        summary = pd.DataFrame(records, columns=SUMMARY_COLUMNS, index=df.index)
+        return pd.concat([df[labels], summary], axis=1)
+
+    def cache_info(self):
+        return {'entries': len(self._cache), 'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses}
+
+    @staticmethod
+    def _summary(result, directions, j):
+        indices = result['seasonal_indices'][j]
+        defined = not np.isnan(indices).any()
+        record = {
+            'peak_quarter': f"Q{int(np.argmax(indices)) + 1}" if defined else None,
+            'trough_quarter': f"Q{int(np.argmin(indices)) + 1}" if defined else None,
+            'seasonal_strength': round(float(result['seasonal_strength'][j]), 3),
+            'seasonal_amplitude': round(float(np.ptp(indices)), 2) if defined else np.nan,
+            'trend_direction': str(directions[j]),
+            'trend_slope_percent': round(float(result['trend_slope_percent'][j]), 2),
+            'mean_level': round(float(result['mean_level'][j]), 2)
+        }
+        for q in range(SEASONS):
+            record[f'seasonal_index_Q{q + 1}'] = round(float(indices[q]), 2)
+        return record
+
+
+# Process-wide engine so repeated extractions reuse cached decompositions
+default_engine = SeasonalityEngine()
+
+
+def decompose_table(df, label_columns=None):
+    """Decompose a wide quarterly table with the shared cached engine"""
+    return default_engine.decompose_table(df, label_columns)
+
+
+def decompose_long(df, period_column='Quarter', value_column='Export_Value'):
+    """Decompose a single long-format quarterly series (e.g. the notebook's total_by_quarter)"""
+    series = df.set_index(period_column)[value_column].sort_index()
+    wide = pd.DataFrame([series.to_numpy(dtype=float)], columns=[str(p) for p in series.index])
+    return default_engine.decompose(wide.to_numpy(), period_columns(wide))[0]
+
+
+def main():
+    """Decompose every commodity series and show the most seasonal sectors"""
+    import time
+    from trade_tables import load_quarterly_table
+
+    commodities = load_quarterly_table('exports_commodity')
+
+    print("📈 SEASONALITY DECOMPOSITION")
+    print("=" * 60)
+    start = time.perf_counter()
+    summary = decompose_table(commodities, ['SITC_Code', 'Commodity_Description'])
+    elapsed = time.perf_counter() - start
+
+    total = decompose_table(commodities[period_columns(commodities)].sum().to_frame().T, [])
+    print(f"   • {len(summary)} series decomposed in {elapsed * 1000:.1f}ms")
+    print(f"   • Total exports: trend {total['trend_direction'].iloc[0]} "
+          f"({total['trend_slope_percent'].iloc[0]:+.2f}%/quarter), "
+          f"peak quarter {total['peak_quarter'].iloc[0]}\n")
+
+    for _, row in summary.sort_values('seasonal_amplitude', ascending=False).iterrows():
+        print(f"   • {row['Commodity_Description'][:40]:<40} peak {row['peak_quarter']} | "
+              f"strength {row['seasonal_strength']:.2f} | amplitude ${row['seasonal_amplitude']:.1f}M | "
+              f"trend {row['trend_direction']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Rwanda Export Static Report
+Offline HTML copy of the dashboard pages, rendered headlessly from the insights bundle with the
+shared figure builders; pages are built in parallel and shared assets are written once
+"""
+
+import html
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+REPORT_CSS = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, Arial, sans-serif; margin: 0; color: #1f2937; }
+header { background: #1f77b4; color: white; padding: 1.2rem 2rem; }
+header h1 { margin: 0; font-size: 1.6rem; }
+header p { margin: 0.3rem 0 0; opacity: 0.85; }
+nav { background: #f0f2f6; padding: 0.6rem 2rem; }
+nav a { margin-right: 1.2rem; color: #1f77b4; text-decoration: none; font-weight: 600; }
+main { padding: 1rem 2rem 3rem; }
+section.page { margin-bottom: 3rem; }
+h2 { color: #1f77b4; border-bottom: 2px solid #1f77b4; padding-bottom: 0.3rem; }
+.metrics { display: flex; flex-wrap: wrap; gap: 1rem; margin: 1rem 0; }
+.metric { background: #f0f2f6; border-left: 5px solid #1f77b4; padding: 0.8rem 1.2rem; min-width: 12rem; }
+.metric .label { font-size: 0.85rem; color: #6b7280; }
+.metric .value { font-size: 1.4rem; font-weight: 700; }
+table.report-table { border-collapse: collapse; width: 100%; font-size: 0.85rem; margin: 0.5rem 0 1.5rem; }
+table.report-table th { background: #1f77b4; color: white; text-align: left; padding: 0.4rem; }
+table.report-table td { border-bottom: 1px solid #e5e7eb; padding: 0.4rem; vertical-align: top; }
+footer { color: #6b7280; font-size: 0.8rem; padding: 1rem 2rem; border-top: 1px solid #e5e7eb; }
+@media print {
+  nav { display: none; }
+  section.page { page-break-after: always; }
+  .figure { page-break-inside: avoid; }
+}
+"""
+
+
+def _executive_metrics(insights):
+    trends = insights.get('market_trends', {})
+    seasonal = trends.get('seasonal_patterns', {}) or {}
+    return [
+        ('Top Opportunities', len(insights.get('top_opportunities', []))),
+        ('High Priority Policies', len([p for p in insights.get('policy_recommendations', []) if p['priority'] == 'HIGH'])),
+        ('Youth/SME Sectors', len(insights.get('youth_sme_opportunities', []))),
+        ('Tier 1 Markets', len(insights.get('strategic_markets', {}).get('tier1_powerhouses', []))),
+        ('Overall Trend', str(trends.get('total_exports_trend', 'N/A')).upper()),
+        ('Average Growth Rate', f"{trends.get('growth_rate_avg', 0):.1f}%"),
+        ('Peak Quarter', seasonal.get('peak_quarter') or 'N/A'),
+        ('Volatility Index', trends.get('volatility_index', 'N/A'))
+    ]
+
+
+def _forecast_metrics(insights):
+    summary = insights.get('predictions', {}).get('summary', {})
+    return [
+        ('Markets Forecasted', summary.get('total_countries', 0)),
+        ('Predicted 2025 Exports', f"${summary.get('total_predicted_2025', 0):,.1f}M"),
+        ('Growth vs 2022', f"{summary.get('overall_growth_percent', 0):+.1f}%"),
+        ('Average Confidence', f"{summary.get('avg_confidence', 0):.1f}%")
+    ]
+
+
+# Report pages in dashboard order, then the analyses only the bundle carries:
+# ('metrics', fn) | ('figure', name, heading) | ('table', csv, heading[, row query])
+REPORT_PAGES = {
+    'executive_summary': ("📊 Executive Summary", [
+        ('metrics', _executive_metrics),
+        ('table', 'export_insights_opportunity_matrix.csv', "🏆 Opportunity Matrix")
+    ]),
+    'top_opportunities': ("🎯 Top Export Opportunities", [
+        ('figure', 'opportunity_score_bar', "Opportunity Scores"),
+        ('figure', 'opportunity_matrix_scatter', "📊 Opportunity Matrix: Growth vs Market Share"),
+        ('table', 'export_insights_opportunities.csv', "📋 Detailed Opportunity Analysis")
+    ]),
+    'strategic_markets': ("🌍 Strategic Market Opportunities", [
+        ('figure', 'tier1_growth_bar', "High Growth Powerhouse Markets"),
+        ('table', 'export_insights_strategic_tier1_powerhouses.csv', None),
+        ('table', 'export_insights_strategic_tier2_emerging.csv', "Emerging Market Opportunities"),
+        ('figure', 'tier3_growth_bar', "Untapped Potential Markets"),
+        ('table', 'export_insights_strategic_tier3_untapped.csv', None)
+    ]),
+    'predictive_forecasts': ("🔮 Predictive Forecasts: 2023-2025", [
+        ('metrics', _forecast_metrics),
+        ('figure', 'forecast_world_band', "World Exports: Reconciled Forecast and P10-P90 Band"),
+        ('table', 'export_insights_forecast_reconciled.csv', "Reconciled Forecasts by Region",
+         "level != 'partner'"),
+        ('figure', 'forecast_current_vs_predicted', "Top 15 Forecasted Markets for 2025"),
+        ('figure', 'forecast_growth_bar', None),
+        ('table', 'export_insights_forecast_top15.csv', "📋 Detailed Forecast Data"),
+        ('figure', 'forecast_high_growth_scatter', "🚀 High-Confidence Growth Markets"),
+        ('figure', 'forecast_emerging_scatter', "Emerging Market Opportunities"),
+        ('figure', 'forecast_tier_allocation_pie', "🎯 Strategic Market Tiers")
+    ]),
+    'policy_recommendations': ("📜 Policy Recommendations", [
+        ('figure', 'policy_priority_pie', "📊 Policy Priority Distribution"),
+        ('table', 'export_insights_policy_recommendations.csv', "Recommendations")
+    ]),
+    'youth_sme': ("👥 Youth & SME Opportunities", [
+        ('figure', 'youth_sme_investment_scatter', "📊 Investment vs Revenue Potential Matrix"),
+        ('table', 'export_insights_youth_sme_opportunities.csv', "Opportunities by Sector")
+    ]),
+    'risk_and_anomalies': ("⚠️ Revenue Risk, Anomalies & Re-exports", [
+        ('table', 'export_insights_risk_scenarios.csv', "🎲 Market-Loss Scenarios (Revenue at Risk)"),
+        ('table', 'export_insights_anomalies.csv', "🚨 Flagged Anomalies (Latest Quarter)"),
+        ('table', 'export_insights_reexport_decomposition.csv', "🔁 Domestic Exports vs Re-exports")
+    ])
+}
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return html.escape(str(value))
+
+
+def _table_html(frame):
+    header = ''.join(f"<th>{html.escape(str(c))}</th>" for c in frame.columns)
+    rows = ''.join(
+        '<tr>' + ''.join(f"<td>{_format_value(v)}</td>" for v in row) + '</tr>'
+        for row in frame.fillna('').itertuples(index=False)
+    )
+    return f'<table class="report-table"><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>'
+
+
+def render_page(slug, insights_dir='data/insights'):
+    """
+    HTML body (<section>) of one report page; runs in a worker process
+
+    Figures come from the same figure cache as the dashboard, so a page costs a JSON load
+    when the figures were precomputed for the current bundle.
+    """
+    import plotly.io as pio
+
+    from dashboard_figures import get_figure_cache
+    from insights_snapshot import get_store
+
+    snapshot = get_store(insights_dir).current()
+    cache = get_figure_cache(os.path.join(insights_dir, 'figures'))
+    title, sections = REPORT_PAGES[slug]
+
+    parts = [f'<section class="page" id="{slug}"><h2>{html.escape(title)}</h2>']
+    for section in sections:
+        kind = section[0]
+        if kind == 'metrics':
+            cards = ''.join(
+                f'<div class="metric"><div class="label">{html.escape(label)}</div>'
+                f'<div class="value">{html.escape(str(value))}</div></div>'
+                for label, value in section[1](snapshot.insights or {})
+            )
+            parts.append(f'<div class="metrics">{cards}</div>')
+            continue
+
+        heading = section[2]
+        if kind == 'figure':
+            fig = cache.get(section[1], snapshot)
+            if fig is None:
+                continue
+            body = pio.to_html(fig, include_plotlyjs=False, full_html=False, config={'displaylogo': False})
+            body = f'<div class="figure">{body}</div>'
+        else:
+            frame = snapshot.table(section[1])
+            if frame is not None and len(section) > 3:
+                frame = frame.query(section[3])
+            if frame is None or frame.empty:
+                continue
+            body = _table_html(frame)
+        if heading:
+            parts.append(f"<h3>{html.escape(heading)}</h3>")
+        parts.append(body)
+    parts.append('</section>')
+    return slug, '\n'.join(parts), snapshot.version
+
+
+def _document(title, pages_html, nav, version, head_assets):
+    links = ''.join(f'<a href="{href}">{html.escape(label)}</a>' for label, href in nav)
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+{head_assets}
+</head>
+<body>
+<header><h1>🇷🇼 Rwanda Export Strategy Report</h1><p>{html.escape(title)}</p></header>
+<nav>{links}</nav>
+<main>
+{pages_html}
+</main>
+<footer>Generated {generated} from insights version {version} · NISR Hackathon 2025</footer>
+</body>
+</html>
+"""
+
+
+def build_report(output_dir='data/report', insights_dir='data/insights', pages=None,
+                 single_file=False, workers=None):
+    """
+    Render the report pages in parallel worker processes and write them out
+
+    Parameters:
+    -----------
+    pages : list, optional
+        Page slugs (default: every page in REPORT_PAGES)
+    single_file : bool
+        One self-contained report.html (CSS and plotly.js inlined once) instead of one file
+        per page sharing report.css and plotly.min.js
+
+    Returns the list of files written.
+    """
+    from plotly.offline import get_plotlyjs
+
+    pages = list(pages or REPORT_PAGES)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    insights_dir = os.path.abspath(insights_dir)
+
+    workers = workers or min(len(pages), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(render_page, pages, [insights_dir] * len(pages)))
+    bodies = {slug: body for slug, body, _ in results}
+    version = results[0][2] if results else None
+
+    if single_file:
+        head = f"<style>{REPORT_CSS}</style>\n<script>{get_plotlyjs()}</script>"
+        nav = [(REPORT_PAGES[slug][0], f"#{slug}") for slug in pages]
+        path = output_dir / 'report.html'
+        path.write_text(_document("Dashboard Report", '\n'.join(bodies[s] for s in pages), nav, version, head),
+                        encoding='utf-8')
+        return [path]
+
+    # Shared assets, written once for every page
+    (output_dir / 'report.css').write_text(REPORT_CSS, encoding='utf-8')
+    (output_dir / 'plotly.min.js').write_text(get_plotlyjs(), encoding='utf-8')
+    head = '<link rel="stylesheet" href="report.css">\n<script src="plotly.min.js"></script>'
+    nav = [('Contents', 'index.html')] + [(REPORT_PAGES[slug][0], f"{slug}.html") for slug in pages]
+
+    written = []
+    for slug in pages:
+        path = output_dir / f"{slug}.html"
+        path.write_text(_document(REPORT_PAGES[slug][0], bodies[slug], nav, version, head), encoding='utf-8')
+        written.append(path)
+    contents = '<section class="page"><h2>Contents</h2><ul>' + ''.join(
+        f'<li><a href="{slug}.html">{html.escape(REPORT_PAGES[slug][0])}</a></li>' for slug in pages
+    ) + '</ul></section>'
+    index = output_dir / 'index.html'
+    index.write_text(_document("Contents", contents, nav, version, head), encoding='utf-8')
+    return [index] + written
+
+
+def main():
+    """Write the offline report"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export the dashboard pages as a static HTML report')
+    parser.add_argument('--output', default='data/report', help='Output directory')
+    parser.add_argument('--insights', default='data/insights', help='Insights bundle directory')
+    parser.add_argument('--pages', nargs='+', choices=list(REPORT_PAGES), help='Pages to include (default: all)')
+    parser.add_argument('--single-file', action='store_true', help='One self-contained report.html')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per page)')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+    print("🖨️  STATIC DASHBOARD REPORT")
+    print("=" * 60)
+    start = time.perf_counter()
+    written = build_report(args.output, args.insights, args.pages, args.single_file, args.workers)
+    for path in written:
+        print(f"   • {path} ({path.stat().st_size / 1024:,.0f} KB)")
+    print(f"\n✅ Report written in {time.perf_counter() - start:.1f}s — open {written[0]} in a browser "
+          f"(use the browser's Print to PDF for a PDF copy)")
+
+
+if __name__ == "__main__":
+    main()
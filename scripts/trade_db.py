@@ -0,0 +1,393 @@
+"""
+Rwanda Trade Database
+Embedded SQLite store over the data/ directory: every source is loaded once into normalized,
+indexed tables and only reloaded when its content changes
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from trade_tables import QUARTERLY_TABLES, WITS_PARTNERS_PATH, clean_quarterly_table, period_columns
+
+DEFAULT_DB_PATH = 'data/trade.db'
+
+# How each wide quarterly table maps onto (entity, code, flow)
+QUARTERLY_LAYOUT = {
+    'export_country': {'entity': 'Country', 'flow': 'Export'},
+    'exports_commodity': {'entity': 'Commodity_Description', 'code': 'SITC_Code', 'flow': 'Export'},
+    'reexports_commodity': {'entity': 'Commodity_Description', 'code': 'SITC_Code', 'flow': 'Re-export'},
+    'regional_blocks': {'entity': 'Regional_Block', 'flow_column': 'Flow_Type'},
+    'continents': {'entity': 'Continent', 'flow_column': 'Flow_Type'},
+    'total_trade': {'entity': 'Partner', 'flow_column': 'Trade_Type'}
+}
+
+# NISR tables spell the same flow several ways
+FLOW_NAMES = {
+    'Exports': 'Export',
+    'Imports': 'Import',
+    'Re-Exports': 'Re-export',
+    'Re-exports': 'Re-export'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    signature TEXT,
+    sha256 TEXT,
+    row_count INTEGER,
+    loaded_at TEXT
+);
+CREATE TABLE IF NOT EXISTS quarterly_values (
+    source TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    code TEXT,
+    flow TEXT NOT NULL,
+    period TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_quarterly_lookup ON quarterly_values (table_name, flow, entity, period);
+CREATE INDEX IF NOT EXISTS idx_quarterly_period ON quarterly_values (table_name, period);
+CREATE INDEX IF NOT EXISTS idx_quarterly_source ON quarterly_values (source);
+CREATE TABLE IF NOT EXISTS wits_partners (
+    source TEXT NOT NULL,
+    partner TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    region TEXT,
+    export_thousand REAL,
+    export_millions REAL,
+    partner_share REAL,
+    products REAL,
+    yoy_growth_rate REAL
+);
+CREATE INDEX IF NOT EXISTS idx_wits_partner_year ON wits_partners (partner, year);
+CREATE INDEX IF NOT EXISTS idx_wits_region_year ON wits_partners (region, year);
+CREATE INDEX IF NOT EXISTS idx_wits_year ON wits_partners (year);
+CREATE TABLE IF NOT EXISTS insights_sections (
+    source TEXT NOT NULL,
+    section TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (source, section)
+);
+"""
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _table_name(prefix, path):
+    """SQL-safe table name for a generic CSV source, e.g. insights_opportunity_matrix"""
+    stem = Path(path).stem.lower()
+    for noise in ('export_insights_', 'rwanda_exports_', '_2018_2022'):
+        stem = stem.replace(noise, '')
+    safe = ''.join(ch if ch.isalnum() else '_' for ch in stem).strip('_')
+    return f"{prefix}_{safe}"
+
+
+class TradeDatabase:
+    """Indexed SQLite view of the raw, WITS, processed and insights data"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, data_dir='data'):
+        self.path = path
+        self.data_dir = Path(data_dir)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def _registry_path(self, path):
+        """A registry path (data/...) resolved under this database's data_dir"""
+        return (self.data_dir / Path(path).relative_to('data')).resolve()
+
+    def discover_sources(self):
+        """List (path, kind, table_name) for every source file under data_dir"""
+        sources = []
+        quarterly_paths = {}
+        for name, spec in QUARTERLY_TABLES.items():
+            quarterly_paths[self._registry_path(spec['path'])] = name
+        wits_partners_path = self._registry_path(WITS_PARTNERS_PATH)
+
+        for path in sorted(self.data_dir.glob('raw/*.csv')) + sorted(self.data_dir.glob('processed/*.csv')):
+            name = quarterly_paths.get(path.resolve())
+            if name:
+                sources.append((str(path), 'quarterly', name))
+
+        for path in sorted(self.data_dir.glob('wits/*.csv')):
+            if path.resolve() == wits_partners_path:
+                sources.append((str(path), 'wits_partners', 'wits_partners'))
+            else:
+                sources.append((str(path), 'table', _table_name('wits', path)))
+
+        for path in sorted(self.data_dir.glob('insights/*.csv')):
+            sources.append((str(path), 'table', _table_name('insights', path)))
+        # Only the insights bundle: manifest.json and pipeline_status.json are bookkeeping
+        insights_json = self.data_dir / 'insights' / 'export_insights.json'
+        if insights_json.exists():
+            sources.append((str(insights_json), 'insights_json', 'insights_sections'))
+
+        return sources
+
+    def rebuild(self, force=False):
+        """
+        Reload every source whose content changed since the last rebuild
+
+        Unchanged files are detected by size/mtime first and by SHA-256 when the
+        mtime moved, so touching a file does not trigger a reload.
+        Returns {path: 'loaded' | 'unchanged'}.
+        """
+        known = {row[0]: row for row in self.conn.execute(
+            "SELECT path, kind, table_name, signature, sha256 FROM sources")}
+        report = {}
+
+        for path, kind, table_name in self.discover_sources():
+            signature = _signature(path)
+            previous = known.get(path)
+            if not force and previous and previous[3] == signature:
+                report[path] = 'unchanged'
+                continue
+
+            sha = _sha256(path)
+            if not force and previous and previous[4] == sha:
+                self.conn.execute("UPDATE sources SET signature = ? WHERE path = ?", (signature, path))
+                report[path] = 'unchanged'
+                continue
+
+            with self.conn:
+                rows = self._load_source(path, kind, table_name)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, kind, table_name, signature, sha, rows, datetime.now().isoformat())
+                )
+            report[path] = 'loaded'
+
+        # Forget sources that were deleted from disk
+        current = {path for path, _, _ in self.discover_sources()}
+        for path, row in known.items():
+            if path not in current:
+                with self.conn:
+                    self._drop_source(path, row[1], row[2])
+                    self.conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+                report[path] = 'removed'
+
+        self.conn.commit()
+        return report
+
+    def _drop_source(self, path, kind, table_name):
+        if kind == 'quarterly':
+            self.conn.execute("DELETE FROM quarterly_values WHERE source = ?", (path,))
+        elif kind == 'wits_partners':
+            self.conn.execute("DELETE FROM wits_partners WHERE source = ?", (path,))
+        elif kind == 'insights_json':
+            self.conn.execute("DELETE FROM insights_sections WHERE source = ?", (path,))
+        else:
+            self.conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+
+    def _load_source(self, path, kind, table_name):
+        self._drop_source(path, kind, table_name)
+
+        if kind == 'quarterly':
+            return self._load_quarterly(path, table_name)
+        if kind == 'wits_partners':
+            return self._load_wits_partners(path)
+        if kind == 'insights_json':
+            with open(path, 'r') as f:
+                insights = json.load(f)
+            rows = [(path, section, json.dumps(payload)) for section, payload in insights.items()]
+            self.conn.executemany("INSERT INTO insights_sections VALUES (?, ?, ?)", rows)
+            return len(rows)
+
+        try:
+            df = pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            return 0
+        df.to_sql(table_name, self.conn, if_exists='replace', index=False)
+        return len(df)
+
+    def _load_quarterly(self, path, table_name):
+        layout = QUARTERLY_LAYOUT[table_name]
+        df = clean_quarterly_table(pd.read_csv(path))
+        periods = period_columns(df)
+
+        frame = pd.DataFrame({
+            'entity': df[layout['entity']].astype(str).str.strip(),
+            'code': df[layout['code']].astype(str) if 'code' in layout else None,
+            'flow': (df[layout['flow_column']].replace(FLOW_NAMES) if 'flow_column' in layout
+                     else layout['flow'])
+        })
+        long = frame.join(df[periods]).melt(
+            id_vars=['entity', 'code', 'flow'], var_name='period', value_name='value'
+        )
+        long.insert(0, 'table_name', table_name)
+        long.insert(0, 'source', path)
+
+        self.conn.executemany(
+            "INSERT INTO quarterly_values VALUES (?, ?, ?, ?, ?, ?, ?)",
+            long.astype(object).where(long.notna(), None).itertuples(index=False, name=None)
+        )
+        return len(long)
+
+    def _load_wits_partners(self, path):
+        df = pd.read_csv(path)
+        frame = pd.DataFrame({
+            'source': path,
+            'partner': df['Partner Name'].str.strip(),
+            'year': df['Year'].astype(int),
+            'region': df.get('Region'),
+            'export_thousand': pd.to_numeric(df['Export (US$ Thousand)'], errors='coerce'),
+            'export_millions': pd.to_numeric(df['Export (US$ Thousand)'], errors='coerce') / 1000,
+            'partner_share': pd.to_numeric(df['Export Partner Share (%)'], errors='coerce'),
+            'products': pd.to_numeric(df['No Of exported HS6 digit Products'], errors='coerce'),
+            'yoy_growth_rate': pd.to_numeric(df.get('YoY_Growth_Rate'), errors='coerce')
+        })
+        self.conn.executemany(
+            "INSERT INTO wits_partners VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        )
+        return len(frame)
+
+    # ------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------
+
+    def query(self, sql, params=(), as_frame=True):
+        """Run ad hoc SQL; returns a DataFrame (or a list of tuples with as_frame=False)"""
+        if as_frame:
+            return pd.read_sql_query(sql, self.conn, params=params)
+        return self.conn.execute(sql, params).fetchall()
+
+    def exports_to(self, partner, period):
+        """
+        Export value (US$ million) to a partner in a period - an index lookup
+
+        Quarterly periods ('2024Q3') are answered from the NISR country table,
+        years (2021) from the WITS partner data.
+        """
+        if isinstance(period, str) and 'Q' in period:
+            row = self.conn.execute(
+                "SELECT value FROM quarterly_values "
+                "WHERE table_name = 'export_country' AND flow = 'Export' AND entity = ? AND period = ?",
+                (partner, period)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT SUM(export_millions) FROM wits_partners WHERE partner = ? AND year = ?",
+                (partner, int(period))
+            ).fetchone()
+        return row[0] if row else None
+
+    def series(self, table_name, entity, flow='Export'):
+        """Quarterly time series of one entity as a DataFrame (period, value)"""
+        return self.query(
+            "SELECT period, value FROM quarterly_values "
+            "WHERE table_name = ? AND flow = ? AND entity = ? ORDER BY period",
+            (table_name, flow, entity)
+        )
+
+    def period_slice(self, table_name, period, flow='Export'):
+        """All entities of a quarterly table in a single period"""
+        return self.query(
+            "SELECT entity, code, value FROM quarterly_values "
+            "WHERE table_name = ? AND flow = ? AND period = ? ORDER BY value DESC",
+            (table_name, flow, period)
+        )
+
+    def read_table(self, table_name, columns='*', where=None, params=()):
+        """Read (part of) a generic table such as insights_opportunity_matrix"""
+        sql = f'SELECT {columns} FROM "{table_name}"'
+        if where:
+            sql += f" WHERE {where}"
+        return self.query(sql, params)
+
+    def insights_section(self, section, source=None):
+        """One top-level section of the insights JSON"""
+        sql = "SELECT payload FROM insights_sections WHERE section = ?"
+        params = [section]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        row = self.conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def tables(self):
+        """Names of all queryable tables"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+
+
+def main():
+    """Command line entry point: rebuild, query, exports-to, tables"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rwanda trade database (SQLite)')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Database file')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rebuild = sub.add_parser('rebuild', help='Reload sources that changed')
+    rebuild.add_argument('--force', action='store_true', help='Reload every source')
+
+    query = sub.add_parser('query', help='Run ad hoc SQL')
+    query.add_argument('sql')
+
+    exports = sub.add_parser('exports-to', help='Export value to a partner in a period')
+    exports.add_argument('partner')
+    exports.add_argument('period')
+
+    sub.add_parser('tables', help='List tables')
+    args = parser.parse_args()
+
+    with TradeDatabase(args.db) as db:
+        if args.command == 'rebuild':
+            print("🔄 REBUILDING TRADE DATABASE")
+            print("=" * 60)
+            report = db.rebuild(force=args.force)
+            for path, status in report.items():
+                marker = '✅' if status == 'loaded' else '•'
+                print(f"   {marker} {status:<9} {path}")
+            loaded = sum(1 for status in report.values() if status == 'loaded')
+            print(f"\n📊 {loaded} of {len(report)} sources reloaded into {args.db}")
+        elif args.command == 'query':
+            with pd.option_context('display.max_rows', 200, 'display.width', 200):
+                print(db.query(args.sql))
+        elif args.command == 'exports-to':
+            value = db.exports_to(args.partner, args.period)
+            if value is None:
+                print(f"❌ No exports to {args.partner} in {args.period}")
+            else:
+                print(f"{args.partner} {args.period}: ${value:,.2f}M")
+        elif args.command == 'tables':
+            for name in db.tables():
+                print(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Rwanda Export Trade Hierarchy
+Partner hierarchy (country -> bloc / continent / WITS region -> world) with multi-membership, rolled up
+with one sparse membership product for all periods, checked against the published aggregates
+"""
+
+import numpy as np
+import pandas as pd
+
+from combine_wits_partner_data import assign_region
+from trade_tables import period_columns
+
+WORLD = 'WORLD'
+
+# NISR spellings of partner names -> the WITS spelling used as the canonical node name
+COUNTRY_ALIASES = {
+    'Congo, The Democratic Republic Of': 'Congo, Dem. Rep.',
+    'Congo': 'Congo, Rep.',
+    'Hong Kong': 'Hong Kong, China',
+    'Egypt': 'Egypt, Arab Rep.',
+    'Ethiopia': 'Ethiopia(excludes Eritrea)',
+    'Tanzania, United Republic Of': 'Tanzania',
+    'Korea, Republic Of': 'Korea, Rep.',
+    'World': WORLD
+}
+
+# Members of the blocs in 2024Q3_Regional blocks.csv (plus the EAC), WITS spellings.
+# Rwanda is a member of most of them but never its own partner, so it is left out.
+BLOC_MEMBERS = {
+    'CEPGL': ['Burundi', 'Congo, Dem. Rep.'],
+    'EAC': ['Burundi', 'Congo, Dem. Rep.', 'Kenya', 'Somalia', 'South Sudan', 'Tanzania', 'Uganda'],
+    'COMESA': ['Burundi', 'Comoros', 'Congo, Dem. Rep.', 'Djibouti', 'Egypt, Arab Rep.', 'Eritrea', 'Eswatini',
+               'Ethiopia(excludes Eritrea)', 'Kenya', 'Libya', 'Madagascar', 'Malawi', 'Mauritius', 'Seychelles',
+               'Somalia', 'Sudan', 'Tunisia', 'Uganda', 'Zambia', 'Zimbabwe'],
+    'SADC': ['Angola', 'Botswana', 'Comoros', 'Congo, Dem. Rep.', 'Eswatini', 'Lesotho', 'Madagascar', 'Malawi',
+             'Mauritius', 'Mozambique', 'Namibia', 'Seychelles', 'South Africa', 'Tanzania', 'Zambia', 'Zimbabwe'],
+    'ECOWAS': ['Benin', 'Burkina Faso', 'Cape Verde', "Cote d'Ivoire", 'Gambia, The', 'Ghana', 'Guinea',
+               'Guinea-Bissau', 'Liberia', 'Mali', 'Niger', 'Nigeria', 'Senegal', 'Sierra Leone', 'Togo'],
+    'EU': ['Austria', 'Belgium', 'Bulgaria', 'Croatia', 'Cyprus', 'Czech Republic', 'Denmark', 'Estonia', 'Finland',
+           'France', 'Germany', 'Greece', 'Hungary', 'Ireland', 'Italy', 'Latvia', 'Lithuania', 'Luxembourg', 'Malta',
+           'Netherlands', 'Poland', 'Portugal', 'Romania', 'Slovak Republic', 'Slovenia', 'Spain', 'Sweden'],
+    'COMMON WEALTH': ['Antigua and Barbuda', 'Australia', 'Bahamas, The', 'Bangladesh', 'Barbados', 'Belize',
+                      'Botswana', 'Brunei', 'Cameroon', 'Canada', 'Cyprus', 'Dominica', 'Eswatini', 'Fiji', 'Gabon',
+                      'Gambia, The', 'Ghana', 'Grenada', 'Guyana', 'India', 'Jamaica', 'Kenya', 'Kiribati', 'Lesotho',
+                      'Malawi', 'Malaysia', 'Maldives', 'Malta', 'Mauritius', 'Mozambique', 'Namibia', 'Nauru',
+                      'New Zealand', 'Nigeria', 'Pakistan', 'Papua New Guinea', 'Samoa', 'Seychelles', 'Sierra Leone',
+                      'Singapore', 'Solomon Islands', 'South Africa', 'Sri Lanka', 'St. Kitts and Nevis', 'St. Lucia',
+                      'St. Vincent and the Grenadines', 'Tanzania', 'Togo', 'Tonga', 'Trinidad and Tobago', 'Tuvalu',
+                      'Uganda', 'United Kingdom', 'Vanuatu', 'Zambia']
+}
+
+# WITS regions (assign_region) -> NISR continents of 2024Q3_Trade by continents.csv
+REGION_CONTINENTS = {
+    'Africa': 'AFRICA',
+    'Americas': 'AMERICA',
+    'Asia & Middle East': 'ASIA',
+    'Europe & Central Asia': 'EUROPE',
+    'Oceania': 'OCEANIA'
+}
+
+# World Bank regional totals the WITS partner files list next to the countries they contain
+WITS_AGGREGATE_ROWS = ['Sub-Saharan Africa', 'East Asia & Pacific', 'Europe & Central Asia',
+                       'Latin America & Caribbean', 'Middle East & North Africa', 'North America', 'South Asia']
+
+
+def _value_columns(frame, label_column):
+    """Period columns of a wide table, else its numeric columns (e.g. WITS years)"""
+    return period_columns(frame) or [col for col in frame.columns
+                                      if col != label_column and pd.api.types.is_numeric_dtype(frame[col])]
+
+
+def canonical_name(name):
+    """Canonical node name of a partner label (NISR spellings mapped onto WITS ones)"""
+    name = str(name).strip()
+    return COUNTRY_ALIASES.get(name, name)
+
+
+class TradeHierarchy:
+    """
+    Partner nodes joined by membership edges, each edge tagged with the grouping it belongs to
+
+    A node may have several parents (a country in CEPGL, COMESA and the EAC), so the groupings
+    overlap; within one grouping the membership is what the published aggregates use.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.groupings = []
+        self.positions = {}
+        self._edges = []
+        self._closure = None
+
+    def node(self, name, grouping='country'):
+        """Position of a node, created on first use (grouping: 'country' for leaves)"""
+        name = canonical_name(name)
+        if name not in self.positions:
+            self.positions[name] = len(self.names)
+            self.names.append(name)
+            self.groupings.append(grouping)
+        elif grouping != 'country' and self.groupings[self.positions[name]] == 'country':
+            # First seen as a member, now declared as a group
+            self.groupings[self.positions[name]] = grouping
+        return self.positions[name]
+
+    def add_membership(self, member, group, grouping):
+        """Declare member (a country or a lower-level group) part of group"""
+        self._edges.append((self.node(member), self.node(group, grouping)))
+        self._closure = None
+
+    def add_grouping(self, grouping, groups):
+        """Add a whole grouping at once: {group: [members]}"""
+        for group, members in groups.items():
+            self.node(group, grouping)
+            for member in members:
+                self.add_membership(member, group, grouping)
+        return self
+
+    def closure(self):
+        """
+        (node, ancestor) position pairs of every node and every group it rolls into, directly
+        or through intermediate groups; a group reached along two paths (country -> continent
+        -> WORLD and country -> WITS region -> WORLD) appears once
+        """
+        if self._closure is None:
+            parents = {}
+            for child, parent in self._edges:
+                parents.setdefault(child, set()).add(parent)
+            reached = {}
+
+            def ancestors_of(node, path=()):
+                if node not in reached:
+                    if node in path:
+                        raise ValueError(f"Membership cycle through {self.names[node]}")
+                    found = set()
+                    for parent in parents.get(node, ()):
+                        found.add(parent)
+                        found |= ancestors_of(parent, path + (node,))
+                    reached[node] = found
+                return reached[node]
+
+            pairs = sorted((node, ancestor) for node in parents for ancestor in ancestors_of(node))
+            pairs = np.array(pairs, dtype=int).reshape(-1, 2)
+            self._closure = (pairs[:, 0], pairs[:, 1])
+        return self._closure
+
+    def ancestors(self, name):
+        """Every group a node rolls into"""
+        nodes, ancestors = self.closure()
+        position = self.positions.get(canonical_name(name))
+        return [self.names[a] for a in ancestors[nodes == position]]
+
+    def members(self, group, countries_only=True):
+        """Every node rolling into a group (countries only by default)"""
+        nodes, ancestors = self.closure()
+        position = self.positions.get(canonical_name(group))
+        found = [self.names[n] for n in nodes[ancestors == position]]
+        return [n for n in found if self.groupings[self.positions[n]] == 'country'] if countries_only else found
+
+    def is_group(self, name):
+        position = self.positions.get(canonical_name(name))
+        return position is not None and self.groupings[position] != 'country'
+
+    def membership_matrix(self, row_nodes):
+        """
+        Sparse (COO) membership of frame rows in groups: (group positions, row positions)
+
+        row_nodes holds the node position of every row (-1 for unknown names). Rows whose node
+        is an ancestor of another row's node are aggregates of those rows and are left out so
+        nothing is counted twice; their positions are returned third.
+        """
+        nodes, ancestors = self.closure()
+        row_nodes = np.asarray(row_nodes)
+        known = row_nodes >= 0
+        present = np.zeros(len(self.names), dtype=bool)
+        present[row_nodes[known]] = True
+        covering = np.zeros(len(self.names), dtype=bool)
+        covering[ancestors[present[nodes]]] = True
+        overlapping = np.flatnonzero(known & covering[np.maximum(row_nodes, 0)])
+
+        rows = np.flatnonzero(known & ~covering[np.maximum(row_nodes, 0)])
+        starts = np.searchsorted(nodes, row_nodes[rows], side='left')
+        ends = np.searchsorted(nodes, row_nodes[rows], side='right')
+        counts = ends - starts
+        row_index = np.repeat(rows, counts)
+        # Offsets into the sorted closure for every (row, ancestor) pair
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(counts.sum())
+        return ancestors[offsets], row_index, overlapping
+
+    def rollup(self, frame, label_column, value_columns=None, groupings=None):
+        """
+        Bottom-up aggregates of a partner table for every group, all periods in one product
+
+        Returns a frame indexed by (Grouping, Group) with the value columns. Rows whose names
+        are not in the hierarchy and rows that aggregate other rows of the frame are excluded;
+        their labels are listed in attrs['unmapped'] and attrs['overlapping'].
+        """
+        value_columns = value_columns or _value_columns(frame, label_column)
+        labels = frame[label_column].map(canonical_name)
+        row_nodes = labels.map(self.positions).fillna(-1).astype(int).to_numpy()
+        groups, rows, overlapping = self.membership_matrix(row_nodes)
+
+        values = np.nan_to_num(frame[value_columns].to_numpy(dtype=float))
+        used = np.unique(groups)
+        totals = np.zeros((len(used), len(value_columns)))
+        np.add.at(totals, np.searchsorted(used, groups), values[rows])
+
+        index = pd.MultiIndex.from_arrays([[self.groupings[g] for g in used], [self.names[g] for g in used]],
+                                          names=['Grouping', 'Group'])
+        result = pd.DataFrame(totals, index=index, columns=value_columns).sort_index()
+        if groupings is not None:
+            result = result[result.index.get_level_values('Grouping').isin(list(groupings))]
+        result.attrs['unmapped'] = labels[row_nodes < 0].tolist()
+        result.attrs['overlapping'] = labels.iloc[overlapping].tolist()
+        return result
+
+
+def default_hierarchy(partner_names=()):
+    """
+    Hierarchy of the NISR and WITS partner tables
+
+    Groupings: 'bloc' (multi-membership), 'continent' and 'wits_region' (assign_region) for the
+    countries, both rolling into WORLD, and 'wb_region' for the World Bank regional totals the
+    WITS files carry (named so they are recognised as aggregates). partner_names adds WITS
+    partners beyond the ones the blocs already list.
+    """
+    hierarchy = TradeHierarchy()
+    hierarchy.node(WORLD, 'world')
+    hierarchy.add_grouping('bloc', BLOC_MEMBERS)
+
+    countries = {canonical_name(name) for name in partner_names}
+    countries |= {name for members in BLOC_MEMBERS.values() for name in members}
+    countries |= set(COUNTRY_ALIASES.values())
+    for name in sorted(countries - {WORLD} - set(WITS_AGGREGATE_ROWS) - set(REGION_CONTINENTS)):
+        region = assign_region(name)
+        if region not in REGION_CONTINENTS:
+            continue
+        hierarchy.add_membership(name, REGION_CONTINENTS[region], 'continent')
+        hierarchy.add_membership(name, region, 'wits_region')
+    for region, continent in REGION_CONTINENTS.items():
+        hierarchy.add_membership(continent, WORLD, 'world')
+        hierarchy.add_membership(region, WORLD, 'world')
+    for name in WITS_AGGREGATE_ROWS:
+        hierarchy.node(name, 'wb_region')
+    return hierarchy
+
+
+def find_aggregate_rows(frame, label_column, value_columns=None, hierarchy=None, tolerance=0.01):
+    """
+    Rows of a partner table that aggregate other rows (summing them all double counts)
+
+    A row is flagged when its name is a group of the hierarchy (WORLD, a continent, a WITS
+    or World Bank region), or, for unnamed totals, when in every period with data it equals
+    the sum of the other remaining rows within tolerance (relative). Returns the flagged
+    rows with the reason and their share of the column totals.
+    """
+    hierarchy = hierarchy or default_hierarchy(frame[label_column])
+    value_columns = value_columns or _value_columns(frame, label_column)
+    values = np.nan_to_num(frame[value_columns].to_numpy(dtype=float))
+    labels = frame[label_column].astype(str)
+
+    named = labels.map(hierarchy.is_group).to_numpy(dtype=bool)
+    remaining = np.where(named[:, None], 0.0, values)
+    others = remaining.sum(axis=0)[None, :] - remaining
+    has_data = remaining > 0
+    matches = np.abs(remaining - others) <= tolerance * np.maximum(others, 1e-9)
+    totals = ~named & has_data.any(axis=1) & (matches | ~has_data).all(axis=1)
+
+    flagged = named | totals
+    gross = values.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(gross > 0, values / gross * 100, np.nan)
+    result = pd.DataFrame({
+        label_column: labels[flagged].to_numpy(),
+        'Reason': np.where(named[flagged], 'named aggregate', 'total of the other rows'),
+        'Grouping': [hierarchy.groupings[hierarchy.positions[canonical_name(n)]] if hierarchy.is_group(n) else ''
+                     for n in labels[flagged]],
+        'Share_Of_Column_Total_Percent': np.nanmean(share[flagged], axis=1).round(2) if flagged.any() else []
+    })
+    result.attrs['double_counted_percent'] = round(float(values[flagged].sum() / gross.sum() * 100), 2) \
+        if gross.sum() > 0 else 0.0
+    return result
+
+
+def check_consistency(bottom_up, published, tolerance=0.05):
+    """
+    Compare bottom-up aggregates with the published ones
+
+    Both frames are indexed by group name with one column per period. Status per group and
+    period: 'consistent' (within tolerance, in millions), 'partial coverage' (the listed
+    members explain less than the published total, e.g. a top-partners table) or 'exceeds
+    published' (members add up to more than the aggregate: double counting or a wrong
+    membership).
+    """
+    groups = bottom_up.index.intersection(published.index)
+    periods = [p for p in bottom_up.columns if p in published.columns]
+    computed = bottom_up.loc[groups, periods].to_numpy(dtype=float)
+    reported = published.loc[groups, periods].to_numpy(dtype=float)
+    difference = computed - reported
+
+    status = np.where(np.abs(difference) <= tolerance, 'consistent',
+                      np.where(difference < 0, 'partial coverage', 'exceeds published'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coverage = np.where(reported > 0, computed / reported * 100, np.nan)
+    return pd.DataFrame({
+        'Group': np.repeat(groups.to_numpy(), len(periods)),
+        'Period': np.tile(periods, len(groups)),
+        'Published': reported.ravel(),
+        'Bottom_Up': computed.ravel().round(2),
+        'Difference': difference.ravel().round(2),
+        'Coverage_Percent': coverage.ravel().round(1),
+        'Status': status.ravel()
+    })
+
+
+def nisr_consistency(tables, hierarchy=None, tolerance=0.05):
+    """
+    Bottom-up checks of the NISR quarterly tables (cleaned wide frames by registry name)
+
+    Country exports roll up into the blocs and continents of their tables and into WORLD;
+    the continents of every flow roll up into that flow's WORLD row.
+    """
+    hierarchy = hierarchy or default_hierarchy(tables['export_country']['Country'])
+    checks = []
+
+    countries = tables['export_country']
+    rollup = hierarchy.rollup(countries, 'Country').droplevel('Grouping')
+    blocs = tables['regional_blocks']
+    bloc_exports = blocs[blocs['Flow_Type'] == 'Export'].drop_duplicates('Regional_Block')
+    continents = tables['continents']
+    continent_exports = continents[continents['Flow_Type'] == 'Exports']
+    for level, published in (('bloc', bloc_exports.set_index('Regional_Block')),
+                             ('continent', continent_exports.set_index('Continent'))):
+        # A published group none of the listed countries belongs to has a bottom-up of 0
+        known = [group for group in published.index if hierarchy.is_group(group)]
+        bottom_up = rollup.reindex(rollup.index.union(known), fill_value=0.0)
+        found = check_consistency(bottom_up, published[period_columns(published)], tolerance)
+        checks.append(found.assign(Check=f"countries -> {level} (exports)"))
+
+    for flow, rows in continents.groupby('Flow_Type', sort=False):
+        parts = rows[rows['Continent'] != WORLD]
+        totals = hierarchy.rollup(parts, 'Continent', groupings=['world']).droplevel('Grouping')
+        found = check_consistency(totals, rows.set_index('Continent')[period_columns(rows)], tolerance)
+        checks.append(found.assign(Check=f"continents -> WORLD ({flow.lower()})"))
+
+    result = pd.concat(checks, ignore_index=True)
+    return result[['Check'] + [c for c in result.columns if c != 'Check']]
+
+
+def wits_wide(wits_df, value_column='Export (US$ Thousand)'):
+    """WITS partners (long, one row per partner-year) as a partner x year table"""
+    wide = wits_df.pivot_table(index='Partner Name', columns='Year', values=value_column, aggfunc='sum')
+    wide.columns = [str(c) for c in wide.columns]
+    return wide.reset_index()
+
+
+def wits_country_rows(wits_df):
+    """
+    WITS partner rows of countries only
+
+    The rows find_aggregate_rows flags (World, the World Bank regions, unnamed totals) are
+    dropped, so every consumer excludes the same aggregates. 'Other Asia, nes' is a reporting
+    partner (not a total of other rows) and is kept.
+    """
+    aggregates = find_aggregate_rows(wits_wide(wits_df), 'Partner Name')['Partner Name']
+    return wits_df[~wits_df['Partner Name'].isin(aggregates)]
+
+
+def main():
+    """Report bottom-up consistency of the NISR tables and aggregate rows in the WITS partners"""
+    import os
+    from pathlib import Path
+
+    from trade_tables import QUARTERLY_TABLES, load_quarterly_table, load_wits_partners
+
+    os.chdir(Path(__file__).resolve().parent.parent)
+
+    print("🌍 TRADE HIERARCHY CONSISTENCY")
+    print("=" * 60)
+    tables = {name: load_quarterly_table(name) for name in QUARTERLY_TABLES}
+    report = nisr_consistency(tables)
+    latest = report[report['Period'] == report['Period'].max()]
+    for check, rows in latest.groupby('Check', sort=False):
+        print(f"\n{check} ({rows['Period'].iloc[0]}):")
+        for _, row in rows.iterrows():
+            print(f"   • {row['Group']:<14} published {row['Published']:>9,.2f}  bottom-up {row['Bottom_Up']:>9,.2f}"
+                  f"  ({row['Coverage_Percent']:>5.1f}%)  {row['Status']}")
+    exceeded = report[report['Status'] == 'exceeds published']
+    print(f"\n   {len(report)} group-periods checked, {len(exceeded)} where members exceed the published total")
+
+    wits = wits_wide(load_wits_partners())
+    aggregates = find_aggregate_rows(wits, 'Partner Name')
+    print(f"\n🔁 WITS partner rows that aggregate other rows "
+          f"({aggregates.attrs['double_counted_percent']}% of the summed values):")
+    for _, row in aggregates.iterrows():
+        print(f"   • {row['Partner Name']:<28} {row['Reason']:<24} {row['Share_Of_Column_Total_Percent']:>6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
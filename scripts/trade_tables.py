@@ -0,0 +1,94 @@
+"""
+Rwanda Trade Tables
+Shared registry of the NISR quarterly tables and WITS partner files used across the pipeline
+"""
+
+import re
+import pandas as pd
+
+from arrow_store import read_table
+
+# Quarterly NISR tables are "wide": label columns followed by one column per period (e.g. 2024Q3)
+PERIOD_PATTERN = re.compile(r'^\d{4}Q[1-4]$')
+
+QUARTERLY_TABLES = {
+    'export_country': {
+        'path': 'data/raw/2024Q3_ExportCountry.csv',
+        'label_columns': ['Country']
+    },
+    'exports_commodity': {
+        'path': 'data/raw/2024Q3_ExportsCommodity.csv',
+        'label_columns': ['SITC_Code', 'Commodity_Description']
+    },
+    'reexports_commodity': {
+        'path': 'data/raw/2024Q3_ReexportsCommodity.csv',
+        'label_columns': ['SITC_Code', 'Commodity_Description']
+    },
+    'regional_blocks': {
+        'path': 'data/raw/2024Q3_Regional blocks.csv',
+        'label_columns': ['Regional_Block', 'Flow_Type']
+    },
+    'continents': {
+        'path': 'data/raw/2024Q3_Trade by continents.csv',
+        'label_columns': ['Flow_Type', 'Continent']
+    },
+    'total_trade': {
+        # Generated from the raw annex sheet by annex_parser.py
+        'path': 'data/processed/analysis_ready_total_trade_world_updated.csv',
+        'label_columns': ['Trade_Type', 'Partner']
+    }
+}
+
+WITS_PARTNERS_PATH = 'data/wits/rwanda_export_partners_2018_2022_combined.csv'
+
+
+def period_columns(df):
+    """Return the period columns (YYYYQn) of a wide quarterly table, in chronological order"""
+    return sorted(str(col) for col in df.columns if PERIOD_PATTERN.match(str(col)))
+
+
+def next_period(period):
+    """Quarter following a 'YYYYQn' period"""
+    year, quarter = int(period[:4]), int(period[-1])
+    return f"{year + quarter // 4}Q{quarter % 4 + 1}"
+
+
+def label_columns(name):
+    """Return the label (non-period) columns of a registered quarterly table"""
+    return list(QUARTERLY_TABLES[name]['label_columns'])
+
+
+def clean_quarterly_table(df):
+    """
+    Normalize a wide quarterly table: period columns become numeric, and repeated
+    header rows, footnote rows (no period values) and duplicated rows are dropped
+    """
+    periods = period_columns(df)
+    df = df.copy()
+    df[periods] = df[periods].apply(
+        lambda col: pd.to_numeric(col.astype(str).str.replace(',', '').str.strip(), errors='coerce')
+        if not pd.api.types.is_numeric_dtype(col) else col
+    )
+    df = df[df[periods].notna().any(axis=1)]
+    return df.drop_duplicates().reset_index(drop=True)
+
+
+def load_quarterly_table(name, path=None):
+    """
+    Load a registered wide quarterly table
+
+    Served from the memory-mapped matrix cache (parsed once per source version); falls back
+    to parsing the CSV where the cache cannot be written.
+    """
+    from matrix_cache import load_matrix
+
+    path = path or QUARTERLY_TABLES[name]['path']
+    try:
+        return load_matrix(name, path).frame()
+    except PermissionError:
+        return clean_quarterly_table(pd.read_csv(path))
+
+
+def load_wits_partners(path=None):
+    """Load the combined WITS partner dataset (long format, one row per partner-year)"""
+    return read_table(path or WITS_PARTNERS_PATH)